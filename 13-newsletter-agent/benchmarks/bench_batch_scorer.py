@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch keyword scoring against per-article scoring.
+
+Rates, categorizes and counts topics for a synthetic corpus built from the recorded
+articles, once article by article (a keyword matcher per criterion, as the tools
+used to) and once from a single hit matrix per corpus, and checks that both give
+the same results.
+
+Usage:
+    python benchmarks/bench_batch_scorer.py [--articles 10000] [--repeat 3] [--workers 4]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from newsletter_agent.batch_scorer import best_groups, get_batch_scorer, parallel_counts
+from newsletter_agent.keyword_matcher import get_group_matcher, get_matcher
+from newsletter_agent.rating_system import RATING_KEYWORDS, rate_articles_content
+
+# Category and topic keywords as defined by categorize_articles and get_trending_topics
+CATEGORY_KEYWORDS = {
+    "gaming_ai": ["game", "gaming", "nintendo", "xbox", "playstation", "unity", "unreal", "game engine",
+                  "game development", "game design", "npc", "character", "procedural generation",
+                  "level design", "player experience"],
+    "ai_models": ["model", "llm", "gpt", "claude", "gemini", "mistral", "llama", "feature",
+                  "large language model", "diffusion model", "stable diffusion", "midjourney", "dall-e",
+                  "text-to-image", "generative ai", "gen ai", "deep learning"],
+    "tech_regulation": ["regulation", "law", "policy", "breakthrough", "research", "robotics", "ethics",
+                        "privacy", "bias", "fairness", "safety", "security", "content moderation",
+                        "copyright", "legal"],
+    "business": ["funding", "investment", "million", "billion", "startup", "acquisition", "venture capital",
+                 "series a", "series b", "raised", "valuation", "partnership", "collaboration", "deal", "merger"],
+}
+
+
+def build_corpus(size: int):
+    """Synthetic articles made of random words from the recorded fixtures."""
+    words = []
+    for name in ["futuretools_articles.json", "sample_articles.json"]:
+        with open(os.path.join(ROOT_DIR, name), "r", encoding="utf-8") as f:
+            words.extend(" ".join(f"{a.get('title', '')} {a.get('summary', '')}" for a in json.load(f)).split())
+
+    random.seed(0)
+    return [{"id": f"bench-{n}",
+             "title": " ".join(random.choices(words, k=random.randint(4, 12))),
+             "summary": " ".join(random.choices(words, k=random.randint(20, 80)))}
+            for n in range(size)]
+
+
+def rate_loop(articles):
+    """Per-article keyword counts for the rating criteria."""
+    matchers = [get_matcher(keywords) for keywords in RATING_KEYWORDS.values()]
+    return [[matcher.count(a.get("title", ""), a.get("summary", "")) for matcher in matchers] for a in articles]
+
+
+def categorize_loop(articles):
+    """Per-article best category, as categorize_articles picked it."""
+    matcher = get_group_matcher(CATEGORY_KEYWORDS)
+    best = []
+    for article in articles:
+        best_category, best_score = -1, 0
+        counts = matcher.counts(article.get("title", "") + " " + article.get("summary", ""))
+        for column, score in enumerate(counts.values()):
+            if score > best_score:
+                best_category, best_score = column, score
+        best.append(best_category)
+    return best
+
+
+def time_it(func, repeat: int):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch keyword scoring")
+    parser.add_argument("--articles", type=int, default=10000, help="Corpus size (default: 10000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (default: 3)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="Worker processes for parallel rating (default: number of CPUs)")
+    args = parser.parse_args()
+
+    articles = build_corpus(args.articles)
+    rating_scorer = get_batch_scorer(RATING_KEYWORDS)
+    category_scorer = get_batch_scorer(CATEGORY_KEYWORDS)
+
+    benchmarks = [
+        ("rating counts", lambda: rate_loop(articles),
+         lambda: rating_scorer.counts(articles, joined=False).tolist()),
+        ("best category", lambda: categorize_loop(articles),
+         lambda: best_groups(category_scorer.counts(articles)).tolist()),
+    ]
+
+    print(f"{args.articles} articles\n")
+    print(f"{'benchmark':<16} {'per article':>12} {'matrix':>10} {'speedup':>9}  same result")
+    print("-" * 62)
+    for name, loop, batch in benchmarks:
+        loop_time, expected = time_it(loop, args.repeat)
+        batch_time, result = time_it(batch, args.repeat)
+        print(f"{name:<16} {loop_time * 1000:>10.0f}ms {batch_time * 1000:>8.0f}ms "
+              f"{loop_time / batch_time:>8.1f}x  {expected == result}")
+
+    batch_time, _ = time_it(lambda: rate_articles_content(articles, workers=1), args.repeat)
+    print(f"\nrate_articles_content (full rating dicts): {batch_time * 1000:.0f}ms")
+
+    if args.workers > 1:
+        # One chunk per worker, forcing the process pool even below its automatic threshold
+        chunk_size = -(-len(articles) // args.workers)
+        serial_time, expected = time_it(lambda: rating_scorer.counts(articles, joined=False), args.repeat)
+        parallel_time, result = time_it(lambda: parallel_counts(RATING_KEYWORDS, articles, False, args.workers,
+                                                                min_articles=0, chunk_size=chunk_size), args.repeat)
+        print(f"rating counts with {args.workers} worker processes: {parallel_time * 1000:.0f}ms "
+              f"({serial_time / parallel_time:.1f}x, same result: {(expected == result).all()})")
+
+if __name__ == "__main__":
+    main()
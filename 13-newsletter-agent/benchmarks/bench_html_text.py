@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark the bounded HTML-to-text cleaner against the BeautifulSoup path.
+
+Feed summaries are cut to 500 characters, but some feeds embed whole articles in
+their content. This compares building a full BeautifulSoup tree with the streaming
+html_to_text extractor on summaries of increasing size, and checks that both
+produce the same text.
+
+Usage:
+    python benchmarks/bench_html_text.py [--repeat 20]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from newsletter_agent.html_text import html_to_text
+from newsletter_agent.rss_tools import SUMMARY_LENGTH
+
+PARAGRAPH = (
+    "<p>Studios are using <b>generative AI</b> to prototype NPC dialogue, "
+    "build <a href='https://example.com/levels'>procedural levels</a> and speed up "
+    "asset creation &amp; testing.</p>\n"
+)
+
+
+def make_summary(size: int) -> str:
+    """Build an HTML summary of roughly size characters."""
+    html = "<div class='entry-content'><script>trackView();</script>"
+    while len(html) < size:
+        html += PARAGRAPH
+    return html + "</div>"
+
+
+def soup_summary(html: str) -> str:
+    """The original cleaning path: parse everything, then cut."""
+    text = BeautifulSoup(html, 'html.parser').get_text(separator=' ', strip=True)
+    return text[:SUMMARY_LENGTH] + ('...' if len(text) > SUMMARY_LENGTH else '')
+
+
+def streaming_summary(html: str) -> str:
+    """The bounded cleaning path used by rss_tools."""
+    text = html_to_text(html, max_chars=SUMMARY_LENGTH + 1)
+    return text[:SUMMARY_LENGTH] + ('...' if len(text) > SUMMARY_LENGTH else '')
+
+
+def time_it(func, html: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(html)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark HTML-to-text cleaning of feed summaries")
+    parser.add_argument("--repeat", type=int, default=20, help="Iterations per size (default: 20)")
+    args = parser.parse_args()
+
+    print(f"{'summary size':>14} {'BeautifulSoup':>15} {'html_to_text':>14} {'speedup':>9}  same output")
+    print("-" * 68)
+
+    for size in [300, 2_000, 20_000, 200_000, 2_000_000]:
+        html = make_summary(size)
+        same = soup_summary(html) == streaming_summary(html)
+        soup_time = time_it(soup_summary, html, args.repeat)
+        stream_time = time_it(streaming_summary, html, args.repeat)
+        print(f"{len(html):>14,} {soup_time * 1000:>13.2f}ms {stream_time * 1000:>12.2f}ms "
+              f"{soup_time / stream_time:>8.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
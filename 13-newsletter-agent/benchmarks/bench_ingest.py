@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Benchmark article ingestion against recorded fixtures.
+
+Starts the local fixture server (see fixture_server.py) and runs the ingest paths
+against it: fetch_rss_articles over RSS and Atom feeds, evaluate_sources over
+feeds and HTML sites, and the FutureTools scraper. Each path is run several times
+and the run latency (p50/p99) and throughput are reported, so regressions show up
+without depending on live sites.
+
+The feed cache, feed health records and article store are kept in a temporary
+directory, so the benchmark never touches the real ones.
+
+Usage:
+    python benchmarks/bench_ingest.py [--runs 10] [--feeds 20] [--latency 50] [--failure-rate 0.05]
+"""
+
+import io
+import os
+import sys
+import time
+import shutil
+import tempfile
+import argparse
+import contextlib
+
+BENCH_DIR = tempfile.mkdtemp(prefix="newsletter_bench_")
+os.environ["NEWSLETTER_FEED_CACHE_DIR"] = os.path.join(BENCH_DIR, "feed_cache")
+os.environ["NEWSLETTER_FEED_HEALTH"] = os.path.join(BENCH_DIR, "feed_health.json")
+os.environ["NEWSLETTER_ARTICLE_DB"] = os.path.join(BENCH_DIR, "articles.db")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixture_server import FixtureSet, FixtureServer
+from newsletter_agent import feed_cache, feed_health
+from newsletter_agent.futuretools_tools import fetch_futuretools_news
+from newsletter_agent.http_pool import HostRateLimiter, get_session
+from newsletter_agent.rss_tools import fetch_rss_articles
+from newsletter_agent.source_discovery import SimpleToolContext, evaluate_sources
+
+
+def percentile(values, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def reset_caches():
+    """Forget cached feeds and feed health so the next run starts cold."""
+    shutil.rmtree(os.environ["NEWSLETTER_FEED_CACHE_DIR"], ignore_errors=True)
+    feed_cache._caches.clear()
+    feed_health._healths.clear()
+
+
+def measure(runs: int, func, cold: bool):
+    """
+    Run func repeatedly.
+
+    Returns:
+        Tuple of (latencies in seconds, items processed per run)
+    """
+    latencies = []
+    items = []
+    for _ in range(runs):
+        if cold:
+            reset_caches()
+        start = time.perf_counter()
+        # The tools print progress for every feed; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            count = func()
+        latencies.append(time.perf_counter() - start)
+        items.append(count)
+    return latencies, items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ingestion against a local fixture server")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per benchmark (default: 10)")
+    parser.add_argument("--feeds", type=int, default=20, help="RSS feeds (plus as many Atom feeds) (default: 20)")
+    parser.add_argument("--items-per-feed", type=int, default=20, help="Items per feed (default: 20)")
+    parser.add_argument("--sites", type=int, default=10, help="HTML sites to evaluate (default: 10)")
+    parser.add_argument("--futuretools-items", type=int, default=200,
+                        help="Cards on the FutureTools page (default: 200)")
+    parser.add_argument("--latency", type=float, default=20, help="Server delay per response in ms (default: 20)")
+    parser.add_argument("--jitter", type=float, default=30, help="Extra random delay in ms (default: 30)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of 503 responses (default: 0)")
+    parser.add_argument("--dead-feeds", type=int, default=2, help="Feeds that always 404 (default: 2)")
+    parser.add_argument("--validators", action="store_true", help="Serve ETags so repeat runs get 304s")
+    parser.add_argument("--cold", action="store_true", help="Clear the feed cache and health before every run")
+    parser.add_argument("--host-rate", type=float, default=100,
+                        help="Requests per second per host for source evaluation; every fixture shares "
+                             "one host, so this is higher than in production (default: 100)")
+    args = parser.parse_args()
+
+    fixtures = FixtureSet(args.feeds, args.items_per_feed, args.sites, args.futuretools_items, args.validators)
+    server = FixtureServer(fixtures, latency=args.latency / 1000, jitter=args.jitter / 1000,
+                           failure_rate=args.failure_rate).start()
+    base = server.base_url
+    get_session().limiter = HostRateLimiter(rate=args.host_rate, burst=max(1, int(args.host_rate)))
+
+    feed_urls = ([f"{base}/feeds/{n}.xml" for n in range(args.feeds)] +
+                 [f"{base}/atom/{n}.xml" for n in range(args.feeds)] +
+                 [f"{base}/dead/{n}.xml" for n in range(args.dead_feeds)])
+    # Evaluation sees sites with and without a linked feed, plus a few direct feed URLs
+    sources = [f"{base}/sites/{n}/" for n in range(args.sites)] + feed_urls[:3]
+
+    def run_fetch_rss():
+        return fetch_rss_articles(feed_urls, 7, SimpleToolContext())["articles_found"]
+
+    def run_evaluate_sources():
+        context = SimpleToolContext({"discovered_sources": sources})
+        evaluate_sources(context)
+        return len(context.state["evaluated_sources"])
+
+    def run_futuretools():
+        return len(fetch_futuretools_news(7, url=f"{base}/futuretools/news"))
+
+    benchmarks = [
+        ("fetch_rss_articles", "articles", run_fetch_rss),
+        ("evaluate_sources", "sources", run_evaluate_sources),
+        ("futuretools scraper", "articles", run_futuretools),
+    ]
+
+    print(f"Fixtures: {args.feeds} RSS + {args.feeds} Atom feeds x {args.items_per_feed} items, "
+          f"{args.dead_feeds} dead feeds, {args.sites} sites, {args.futuretools_items} FutureTools cards")
+    print(f"Server: {args.latency:.0f}ms + up to {args.jitter:.0f}ms jitter, "
+          f"{args.failure_rate:.0%} failures, validators {'on' if args.validators else 'off'}, "
+          f"{'cold' if args.cold else 'warm'} cache, {args.runs} runs\n")
+    print(f"{'benchmark':<22} {'p50':>9} {'p99':>9} {'mean items':>11} {'throughput':>16}")
+    print("-" * 71)
+
+    try:
+        for name, unit, func in benchmarks:
+            requests_before = server.requests
+            latencies, items = measure(args.runs, func, args.cold)
+            throughput = sum(items) / sum(latencies)
+            print(f"{name:<22} {percentile(latencies, 50) * 1000:>7.0f}ms {percentile(latencies, 99) * 1000:>7.0f}ms "
+                  f"{sum(items) / len(items):>11.1f} {throughput:>10.1f} {unit}/s"
+                  f"  ({(server.requests - requests_before) / args.runs:.0f} requests/run)")
+    finally:
+        server.stop()
+        shutil.rmtree(BENCH_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
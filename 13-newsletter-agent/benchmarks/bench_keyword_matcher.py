@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark the compiled keyword matcher against per-keyword substring loops.
+
+Runs source evaluation's RELEVANT_KEYWORDS over article-sized texts and page-sized
+texts built from the recorded articles, and checks that both approaches find the
+same keywords.
+
+Usage:
+    python benchmarks/bench_keyword_matcher.py [--repeat 20]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from newsletter_agent.keyword_matcher import get_matcher
+from newsletter_agent.source_discovery import RELEVANT_KEYWORDS
+
+
+def load_texts():
+    """Article texts (title + summary) from the recorded fixtures."""
+    texts = []
+    for name in ["futuretools_articles.json", "sample_articles.json"]:
+        with open(os.path.join(ROOT_DIR, name), "r", encoding="utf-8") as f:
+            texts.extend(f"{a.get('title', '')} {a.get('summary', '')}" for a in json.load(f))
+    return texts
+
+
+def loop_count(keywords, text: str) -> int:
+    """The original approach: one substring scan per keyword."""
+    text = text.lower()
+    return sum(1 for keyword in keywords if keyword.lower() in text)
+
+
+def time_it(func, texts, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            func(text)
+    return (time.perf_counter() - start) / (repeat * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark multi-keyword matching")
+    parser.add_argument("--repeat", type=int, default=20, help="Iterations per text set (default: 20)")
+    args = parser.parse_args()
+
+    random.seed(0)
+    articles = load_texts()
+    pages = [" ".join(random.choice(articles) for _ in range(120))[:25000] for _ in range(5)]
+    # Larger keyword sets, as used when curation criteria add their own keywords
+    extended = RELEVANT_KEYWORDS + [f"{keyword} update" for keyword in RELEVANT_KEYWORDS] + \
+        [f"new {keyword}" for keyword in RELEVANT_KEYWORDS]
+
+    print(f"{'keywords':>9} {'texts':>16} {'keyword loop':>14} {'matcher':>10} {'speedup':>9}  same result")
+    print("-" * 76)
+
+    for keywords in [RELEVANT_KEYWORDS, extended]:
+        matcher = get_matcher(keywords)
+        for label, texts in [(f"{len(articles)} articles", articles), (f"{len(pages)} pages", pages)]:
+            same = all(loop_count(keywords, text) == matcher.count(text) for text in texts)
+            loop_time = time_it(lambda text: loop_count(keywords, text), texts, args.repeat)
+            matcher_time = time_it(matcher.count, texts, args.repeat)
+            print(f"{len(keywords):>9} {label:>16} {loop_time * 1e6:>12.1f}us {matcher_time * 1e6:>8.1f}us "
+                  f"{loop_time / matcher_time:>8.1f}x  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Report the prompt tokens saved by the compact article encoding.
+
+Builds the prompts of the LLM tools for the recorded articles twice: with the
+article payloads as they used to be written (indented JSON with every field, or a
+Python repr) and with PromptEncoder, then compares their sizes. Tokens are
+estimated from the text length unless --count-tokens asks the Gemini API to count
+them (needs GOOGLE_API_KEY).
+
+Usage:
+    python benchmarks/bench_prompt_encoder.py [--count-tokens]
+"""
+
+import os
+import sys
+import json
+import argparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from newsletter_agent.batch_planner import estimate_tokens
+from newsletter_agent.llm_curator import (CATEGORIZATION_FIELDS, CURATION_FIELDS, DEFAULT_MODEL,
+                                          _categorization_prompt, _curation_prompt)
+from newsletter_agent.prompt_encoder import PromptEncoder
+
+# Batch size of the former fixed-size curation batches, used for both encodings
+BATCH_SIZE = 20
+
+FOCUS_AREAS = [
+    "Generative AI in gaming (primary focus)",
+    "AI-powered game development tools",
+    "AI-generated game assets (art, music, text, levels)",
+    "AI NPCs and character behavior",
+    "General generative AI news and advancements",
+    "Business and funding in AI gaming",
+    "AI ethics and policy in gaming"
+]
+
+CATEGORIES = {
+    "🎮 Gaming & AI": "Articles about AI in games, game development tools, engines, and gaming industry news",
+    "🧠 Major AI Models & Features": "Articles about new AI models, features, capabilities, and technical innovations",
+    "🔬 Breakthrough Tech & Regulation": "Articles about hardware, robotics, policy, ethics, and regulatory developments",
+    "💰 Business & Funding News": "Articles about investments, acquisitions, business developments, and market trends"
+}
+
+
+def load_corpus():
+    """The recorded articles."""
+    articles = []
+    for name in ["futuretools_articles.json", "sample_articles.json"]:
+        with open(os.path.join(ROOT_DIR, name), "r", encoding="utf-8") as f:
+            articles.extend(json.load(f))
+    return articles
+
+
+def old_fields(article, fields, article_id=None):
+    """An article as the tools used to send it."""
+    item = {} if article_id is None else {"id": article_id}
+    item.update({field: article.get(field, "") for field in fields})
+    return item
+
+
+def build_prompts(articles):
+    """(name, old prompts, new prompts) for every LLM tool."""
+    batches = [articles[i:i + BATCH_SIZE] for i in range(0, len(articles), BATCH_SIZE)]
+    category_groups = [articles[i::len(CATEGORIES)] for i in range(len(CATEGORIES))]
+
+    return [
+        ("curate_with_llm",
+         [_curation_prompt(FOCUS_AREAS, json.dumps([old_fields(a, CURATION_FIELDS, n) for n, a in enumerate(batch)],
+                                                   indent=2)) for batch in batches],
+         [_curation_prompt(FOCUS_AREAS, PromptEncoder(CURATION_FIELDS).encode(batch)) for batch in batches]),
+        ("categorize_with_llm",
+         [_categorization_prompt(json.dumps([old_fields(a, CATEGORIZATION_FIELDS, n) for n, a in enumerate(articles)],
+                                            indent=2), CATEGORIES)],
+         [_categorization_prompt(PromptEncoder(CATEGORIZATION_FIELDS).encode(articles), CATEGORIES)]),
+        # The formatting prompts differ only in their article payloads, so compare those
+        ("format_with_llm (articles)",
+         [str([old_fields(a, ("title", "summary", "source", "url", "published")) for a in group])
+          for group in category_groups],
+         [PromptEncoder(("title", "summary", "source", "url", "published")).encode(group, ids=False)
+          for group in category_groups]),
+        ("generate_newsletter_with_llm (articles)",
+         [str(dict(zip(CATEGORIES, category_groups)))],
+         ["\n\n".join(f"{category}:\n{PromptEncoder(('title', 'source', 'summary')).encode(group, ids=False)}"
+                      for category, group in zip(CATEGORIES, category_groups))]),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report prompt sizes before and after compact encoding")
+    parser.add_argument("--count-tokens", action="store_true",
+                        help="Count tokens with the Gemini API instead of estimating them")
+    args = parser.parse_args()
+
+    count = estimate_tokens
+    if args.count_tokens:
+        import google.generativeai as genai
+        genai.configure(api_key=os.getenv("GOOGLE_API_KEY", ""))
+        model = genai.GenerativeModel(DEFAULT_MODEL)
+        count = lambda text: model.count_tokens(text).total_tokens
+
+    articles = load_corpus()
+    print(f"{len(articles)} recorded articles, tokens {'counted by the API' if args.count_tokens else 'estimated'}\n")
+    print(f"{'prompt':<40} {'calls':>5} {'before':>9} {'after':>9} {'saved':>7}")
+    print("-" * 74)
+    total_old = total_new = 0
+    for name, old_prompts, new_prompts in build_prompts(articles):
+        old_tokens = sum(count(prompt) for prompt in old_prompts)
+        new_tokens = sum(count(prompt) for prompt in new_prompts)
+        total_old += old_tokens
+        total_new += new_tokens
+        print(f"{name:<40} {len(old_prompts):>5} {old_tokens:>9} {new_tokens:>9} {1 - new_tokens / old_tokens:>6.0%}")
+    print("-" * 74)
+    print(f"{'total':<40} {'':>5} {total_old:>9} {total_new:>9} {1 - total_new / total_old:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark BM25 ranking over a large synthetic archive.
+
+Builds an archive by recombining the titles and summaries of the recorded articles
+under new IDs and publication dates, indexes it, and times BM25 top-k queries with
+the default curation keywords (cold and cached) against the default keyword scan.
+
+Usage:
+    python benchmarks/bench_ranking.py [--articles 100000] [--queries 5]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from datetime import date, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from newsletter_agent.article_index import ArticleIndex
+from newsletter_agent.curator_tools import DEFAULT_KEYWORDS, score_article
+from newsletter_agent.ranking import BM25Ranker
+
+
+def build_archive(size: int):
+    """Synthetic articles mixing the titles and summaries of the recorded fixtures."""
+    recorded = []
+    for name in ["futuretools_articles.json", "sample_articles.json"]:
+        with open(os.path.join(ROOT_DIR, name), "r", encoding="utf-8") as f:
+            recorded.extend(json.load(f))
+
+    random.seed(0)
+    today = date.today()
+    articles = []
+    for n in range(size):
+        title = random.choice(recorded).get("title", "")
+        summary = " ".join(random.choice(recorded).get("summary", "") for _ in range(random.randint(1, 2)))
+        published = (today - timedelta(days=random.randint(0, 365))).strftime("%Y-%m-%d")
+        articles.append({"id": f"bench-{n}", "title": title, "summary": summary, "published": published})
+    return articles
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark BM25 ranking")
+    parser.add_argument("--articles", type=int, default=100000, help="Archive size (default: 100000)")
+    parser.add_argument("--queries", type=int, default=5, help="Cached queries to time (default: 5)")
+    parser.add_argument("--k", type=int, default=10, help="Articles to return (default: 10)")
+    args = parser.parse_args()
+
+    articles = build_archive(args.articles)
+    index = ArticleIndex()
+
+    start = time.perf_counter()
+    index.add_articles(articles)
+    print(f"Indexed {len(index)} articles in {time.perf_counter() - start:.2f}s")
+
+    ranker = BM25Ranker(index)
+    start = time.perf_counter()
+    top = ranker.top_k(DEFAULT_KEYWORDS, args.k)
+    print(f"BM25 top-{args.k}, cold:   {(time.perf_counter() - start) * 1000:8.1f}ms")
+
+    start = time.perf_counter()
+    for _ in range(args.queries):
+        ranker.top_k(DEFAULT_KEYWORDS, args.k)
+    print(f"BM25 top-{args.k}, cached: {(time.perf_counter() - start) / args.queries * 1000:8.1f}ms")
+
+    start = time.perf_counter()
+    scores = sorted((score_article(article, DEFAULT_KEYWORDS) for article in articles), reverse=True)
+    print(f"Keyword scan and sort:  {(time.perf_counter() - start) * 1000:8.1f}ms")
+
+    print(f"\nTop BM25 score {top[0][1]:.2f}, top keyword score {scores[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Local fixture server for the ingestion benchmarks.
+
+Serves RSS, Atom and HTML fixtures built from the recorded articles in
+futuretools_articles.json and sample_articles.json, scaled up synthetically, so
+ingestion can be measured without touching live sites. Every response can be
+delayed and a fraction of them can fail, to mimic slow and flaky hosts.
+
+Routes:
+    /feeds/<n>.xml      RSS 2.0 feed n
+    /atom/<n>.xml       Atom feed n
+    /sites/<n>/         HTML homepage of site n (odd sites advertise /feeds/<n>.xml)
+    /futuretools/news   FutureTools-style news page with one card per article
+    /dead/...           Always 404
+
+Usage:
+    python benchmarks/fixture_server.py [--port 8800] [--latency 50] [--failure-rate 0.05]
+"""
+
+import os
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from html import escape
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import List, Dict, Any
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Recorded articles the synthetic fixtures are built from
+SEED_FILES = ["futuretools_articles.json", "sample_articles.json"]
+
+
+def load_seed_articles() -> List[Dict[str, Any]]:
+    """Load the recorded articles shipped with the repository."""
+    articles = []
+    for name in SEED_FILES:
+        with open(os.path.join(ROOT_DIR, name), "r", encoding="utf-8") as f:
+            articles.extend(json.load(f))
+    return articles
+
+
+def synthetic_articles(seeds: List[Dict[str, Any]], count: int, offset: int = 0) -> List[Dict[str, Any]]:
+    """
+    Scale the seed articles up to count articles.
+
+    Every copy gets a unique title and URL and a publication date within the last
+    week, so all of them pass the default fetch cutoff.
+    """
+    now = datetime.now()
+    articles = []
+    for i in range(offset, offset + count):
+        seed = seeds[i % len(seeds)]
+        url = seed.get("url") or seed.get("link") or "https://example.com/article"
+        articles.append({
+            "title": f"{seed.get('title', 'Untitled')} #{i}",
+            "url": f"{url.split('?')[0]}?item={i}",
+            "summary": seed.get("summary", ""),
+            "published": now - timedelta(hours=i % (7 * 24))
+        })
+    return articles
+
+
+def rss_feed(n: int, articles: List[Dict[str, Any]]) -> str:
+    """Render an RSS 2.0 feed with HTML summaries."""
+    items = []
+    for a in articles:
+        description = f"<p>{escape(a['summary'])}</p><p><a href=\"{escape(a['url'])}\">Read more</a></p>"
+        items.append(
+            f"<item><title>{escape(a['title'])}</title><link>{escape(a['url'])}</link>"
+            f"<guid>{escape(a['url'])}</guid><pubDate>{format_datetime(a['published'].astimezone())}</pubDate>"
+            f"<description>{escape(description)}</description></item>"
+        )
+    return (f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+            f'<title>Fixture Feed {n}</title><link>http://fixtures.local/sites/{n}/</link>'
+            f'<description>Recorded fixture feed</description>{"".join(items)}</channel></rss>')
+
+
+def atom_feed(n: int, articles: List[Dict[str, Any]]) -> str:
+    """Render an Atom feed."""
+    entries = "".join(
+        f"<entry><title>{escape(a['title'])}</title><link href=\"{escape(a['url'])}\"/>"
+        f"<id>{escape(a['url'])}</id><updated>{a['published'].strftime('%Y-%m-%dT%H:%M:%SZ')}</updated>"
+        f"<summary type=\"html\">{escape('<p>' + escape(a['summary']) + '</p>')}</summary></entry>"
+        for a in articles
+    )
+    return (f'<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+            f'<title>Fixture Atom {n}</title><id>urn:fixture:{n}</id>'
+            f'<updated>{datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")}</updated>{entries}</feed>')
+
+
+def site_page(n: int, articles: List[Dict[str, Any]]) -> str:
+    """Render a site homepage; odd sites link their feed, even sites have none."""
+    alternate = (f'<link rel="alternate" type="application/rss+xml" href="/feeds/{n}.xml">'
+                 if n % 2 else "")
+    posts = "".join(
+        f"<article><h2><a href=\"{escape(a['url'])}\">{escape(a['title'])}</a></h2>"
+        f"<span class=\"post-date\">{a['published'].strftime('%B %d, %Y')}</span>"
+        f"<p>{escape(a['summary'])}</p></article>"
+        for a in articles
+    )
+    return (f"<!DOCTYPE html><html><head><title>Fixture Site {n}</title>{alternate}"
+            f"<script>var analytics = {{}};</script></head><body><nav><a href=\"/\">Home</a></nav>"
+            f"<main>{posts}</main><footer>Fixture site</footer></body></html>")
+
+
+def futuretools_page(articles: List[Dict[str, Any]]) -> str:
+    """Render a FutureTools-style news page."""
+    cards = "".join(
+        f"<div class=\"news-card\"><a href=\"{escape(a['url'])}&utm_source=futuretools.io&utm_medium=newspage\">"
+        f"<h3>{escape(a['title'])}</h3></a><div class=\"news-date\">{a['published'].strftime('%B %d, %Y')}</div></div>"
+        for a in articles
+    )
+    return (f"<!DOCTYPE html><html><head><title>AI News</title></head><body>"
+            f"<div class=\"wrapper\">{cards}</div><a href=\"/terms\">Terms Of Use</a></body></html>")
+
+
+class FixtureSet:
+    """All fixture documents, rendered once up front."""
+
+    def __init__(self, feeds: int = 20, items_per_feed: int = 20, sites: int = 10,
+                 futuretools_items: int = 100, validators: bool = False):
+        """
+        Args:
+            feeds: Number of RSS feeds (and Atom feeds)
+            items_per_feed: Items in every feed
+            sites: Number of HTML sites
+            futuretools_items: Cards on the FutureTools news page
+            validators: Send ETag headers and answer matching conditional GETs with 304
+        """
+        seeds = load_seed_articles()
+        self.validators = validators
+        self.documents = {}
+
+        for n in range(feeds):
+            articles = synthetic_articles(seeds, items_per_feed, n * items_per_feed)
+            self.documents[f"/feeds/{n}.xml"] = ("application/rss+xml", rss_feed(n, articles))
+            self.documents[f"/atom/{n}.xml"] = ("application/atom+xml", atom_feed(n, articles))
+        for n in range(sites):
+            articles = synthetic_articles(seeds, 10, n * 10)
+            self.documents[f"/sites/{n}/"] = ("text/html", site_page(n, articles))
+        self.documents["/futuretools/news"] = (
+            "text/html", futuretools_page(synthetic_articles(seeds, futuretools_items))
+        )
+
+        self.etags = {path: '"%s"' % hashlib.sha1(body.encode("utf-8")).hexdigest()[:16]
+                      for path, (_, body) in self.documents.items()}
+
+
+class FixtureServer:
+    """Threaded HTTP server for a FixtureSet with latency and failure injection."""
+
+    def __init__(self, fixtures: FixtureSet, port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, failure_rate: float = 0.0, seed: int = 42):
+        """
+        Args:
+            fixtures: Documents to serve
+            port: Port to listen on (0 picks a free port)
+            latency: Delay added to every response, in seconds
+            jitter: Extra random delay of up to this many seconds
+            failure_rate: Fraction of requests answered with 503
+            seed: Random seed for jitter and failures
+        """
+        self.fixtures = fixtures
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self.requests = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def handle(self, request: BaseHTTPRequestHandler):
+        with self._random_lock:
+            self.requests += 1
+            delay = self.latency + self.random.uniform(0, self.jitter)
+            fail = self.random.random() < self.failure_rate
+        if delay:
+            time.sleep(delay)
+
+        path = request.path.split("?")[0]
+        document = self.fixtures.documents.get(path)
+
+        if fail:
+            self._respond(request, 503, "text/plain", "Service Unavailable")
+        elif document is None:
+            self._respond(request, 404, "text/plain", "Not Found")
+        else:
+            content_type, body = document
+            etag = self.fixtures.etags[path]
+            if self.fixtures.validators and request.headers.get("If-None-Match") == etag:
+                self._respond(request, 304, content_type, "", {"ETag": etag})
+            else:
+                headers = {"ETag": etag} if self.fixtures.validators else {}
+                self._respond(request, 200, content_type, body, headers)
+
+    def _respond(self, request, status, content_type, body, headers=None):
+        data = body.encode("utf-8")
+        request.send_response(status)
+        request.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        request.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.end_headers()
+        if data:
+            request.wfile.write(data)
+
+    def start(self):
+        """Serve in a background thread."""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down."""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded feed and page fixtures locally")
+    parser.add_argument("--port", type=int, default=8800, help="Port to listen on (default: 8800)")
+    parser.add_argument("--feeds", type=int, default=20, help="Number of feeds (default: 20)")
+    parser.add_argument("--items-per-feed", type=int, default=20, help="Items per feed (default: 20)")
+    parser.add_argument("--sites", type=int, default=10, help="Number of HTML sites (default: 10)")
+    parser.add_argument("--latency", type=float, default=0, help="Delay per response in ms (default: 0)")
+    parser.add_argument("--jitter", type=float, default=0, help="Extra random delay in ms (default: 0)")
+    parser.add_argument("--failure-rate", type=float, default=0, help="Fraction of 503 responses (default: 0)")
+    parser.add_argument("--validators", action="store_true", help="Send ETags and answer conditional GETs")
+    args = parser.parse_args()
+
+    fixtures = FixtureSet(args.feeds, args.items_per_feed, args.sites, validators=args.validators)
+    server = FixtureServer(fixtures, args.port, args.latency / 1000, args.jitter / 1000, args.failure_rate)
+    print(f"Serving {len(fixtures.documents)} fixtures on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Create sample articles file for quick testing
 
 import json
 from google.adk.tools.tool_context import SimpleToolContext
+from newsletter_agent.article_store import load_articles
 from newsletter_agent.rss_tools import fetch_rss_articles
 
 # Create context
@@ -15,7 +16,7 @@ print("Fetching articles...")
 fetch_rss_articles(7, context)
 
 # Get articles
-articles = context.state.get('articles', [])[:20]
+articles = load_articles(context.state, 'articles')[:20]
 print(f"Got {len(articles)} articles")
 
 # Save to file
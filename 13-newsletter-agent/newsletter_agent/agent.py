@@ -8,7 +8,9 @@ from google.adk.agents import Agent
 from google.adk.tools.tool_context import ToolContext
 
 # Import custom tools
+from .article_store import load_articles
 from .rss_tools import fetch_rss_articles, manage_feeds
+from .feed_health import feed_health_report
 from .curator_tools import curate_articles, get_trending_topics
 from .summarizer_tools import summarize_articles, generate_intro
 from .formatter_tools import format_newsletter
@@ -79,8 +81,8 @@ def view_articles(tool_context: ToolContext) -> dict:
     """
     print("--- Tool: view_articles called ---")
     
-    # Get articles from state
-    articles = tool_context.state.get("articles", [])
+    # Get articles from the store referenced by the state
+    articles = load_articles(tool_context.state, "articles")
     
     return {
         "action": "view_articles",
@@ -102,8 +104,8 @@ def generate_newsletter_draft(title: str, tool_context: ToolContext) -> dict:
     """
     print(f"--- Tool: generate_newsletter_draft called with title '{title}' ---")
     
-    # Get articles from state
-    articles = tool_context.state.get("articles", [])
+    # Get articles from the store referenced by the state
+    articles = load_articles(tool_context.state, "articles")
     
     # Get the current date for the newsletter
     current_date = datetime.now().strftime("%Y-%m-%d")
@@ -216,6 +218,7 @@ source_agent = Agent(
     
     Use the fetch_rss_articles tool to collect articles from RSS feeds.
     Use the fetch_google_articles tool to collect articles from Google Search.
+    Use the feed_health_report tool to see which feeds are slow, failing or being skipped.
     
     Make sure to fetch articles from the last 7 days by default, unless specified otherwise.
     """,
@@ -223,6 +226,7 @@ source_agent = Agent(
         manage_feeds,
         fetch_rss_articles,
         fetch_google_articles,
+        feed_health_report,
         view_articles,
     ],
 )
@@ -236,7 +240,7 @@ curator_agent = Agent(
     You are responsible for filtering and ranking articles based on relevance to AI in gaming.
     
     Use the curate_articles tool to filter and rank the articles based on keywords and other criteria.
-    Use the get_trending_topics tool to identify trending topics from the curated articles.
+    Use the get_trending_topics tool to identify this week's trending topics and how they moved against last week.
     
     Make sure to prioritize articles about AI applications in game development, NPCs, procedural generation,
     and player experience personalization.
@@ -317,6 +321,7 @@ newsletter_agent = Agent(
         # Source tools
         manage_feeds,
         fetch_rss_articles,
+        feed_health_report,
         fetch_google_articles,  # Now uses Perplexity API
         fetch_perplexity_articles,
         fetch_spreadsheet_articles,
@@ -0,0 +1,350 @@
+"""
+In-memory inverted index over articles for the AI & Gaming Newsletter
+
+Curation and trending-topic detection may run several times per conversation with
+different keyword sets. Instead of rescanning every title and summary each time,
+articles are indexed once when they land in the state: every whitespace-separated
+token points to the articles (and fields) it appears in.
+
+Keywords keep the substring semantics of `keyword.lower() in text.lower()`. A
+keyword without whitespace can only occur inside a single token, so it is answered
+from the postings of the vocabulary tokens that contain it. A phrase is narrowed to
+the articles that contain each of its words and then verified on the text. Results
+are cached per keyword until the indexed articles change.
+
+The index lives for the whole process, so it is bounded: past MAX_INDEXED_ARTICLES
+the articles indexed or queried least recently are dropped (and indexed again if
+they come back), and the per-keyword caches keep their KEYWORD_CACHE_SIZE most
+recently used keywords.
+
+The index also keeps the statistics needed for ranking (term frequencies per field,
+field lengths and publication dates), see ranking.py.
+"""
+
+import threading
+from collections import Counter, OrderedDict
+from datetime import date
+from typing import List, Dict, Any, Iterable, Set, Tuple
+
+# Field flags stored in the postings
+TITLE = 1
+SUMMARY = 2
+# Title and summary joined by a space, as the tools build their "content" text
+CONTENT = TITLE | SUMMARY
+
+# Articles kept in the index before the least recently used ones are dropped
+MAX_INDEXED_ARTICLES = 20000
+# Keywords (and keyword parts) whose matches, frequencies and expansions are cached
+KEYWORD_CACHE_SIZE = 4096
+
+
+def article_key(article: Dict[str, Any]) -> str:
+    """
+    Get the key an article is indexed under.
+
+    Args:
+        article: Article dictionary
+
+    Returns:
+        The article ID (or its URL, or its text if it has neither)
+    """
+    return article.get("id") or article.get("url") or f"{article.get('title', '')}\n{article.get('summary', '')}"
+
+
+class ArticleIndex:
+    """Inverted index from tokens to the articles and fields containing them."""
+
+    def __init__(self, max_articles: int = MAX_INDEXED_ARTICLES, cache_size: int = KEYWORD_CACHE_SIZE):
+        """
+        Args:
+            max_articles: Articles kept before the least recently used ones are dropped
+            cache_size: Keywords kept in each per-keyword cache
+        """
+        self._lock = threading.RLock()
+        self.max_articles = max_articles
+        self.cache_size = cache_size
+        # token -> {article key: (title frequency, summary frequency)}
+        self._postings = {}
+        # article key -> (lowercased title, lowercased summary), least recently used first
+        self._texts = OrderedDict()
+        # article key -> (title length, summary length) in tokens
+        self._lengths = {}
+        self._total_lengths = [0, 0]
+        # article key -> publication date as a day ordinal (None if unknown)
+        self._published = {}
+        # keyword part -> vocabulary tokens containing it
+        self._expansions = OrderedDict()
+        # (keyword, field) -> article keys matching it
+        self._matches = OrderedDict()
+        # keyword -> {article key: (title frequency, summary frequency)}
+        self._frequencies = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._texts
+
+    def add_articles(self, articles: Iterable[Dict[str, Any]]) -> int:
+        """
+        Index articles, re-indexing the ones whose title or summary changed.
+
+        The articles count as recently used; if the index grows past max_articles,
+        the least recently used other articles are dropped.
+
+        Args:
+            articles: Article dictionaries
+
+        Returns:
+            Number of articles that were (re)indexed
+        """
+        changed = 0
+        with self._lock:
+            batch = set()
+            for article in articles:
+                key = article_key(article)
+                batch.add(key)
+                texts = (article.get("title", "").lower(), article.get("summary", "").lower())
+                if self._texts.get(key) == texts:
+                    self._texts.move_to_end(key)
+                    continue
+                if key in self._texts:
+                    self._remove(key)
+                self._add(key, texts, article.get("published", ""))
+                changed += 1
+            evicted = self._evict(batch)
+            if changed or evicted:
+                self._matches.clear()
+                self._frequencies.clear()
+        return changed
+
+    def touch(self, keys: Iterable[str]) -> None:
+        """
+        Mark indexed articles as recently used, so they are dropped last.
+
+        Args:
+            keys: Article keys (keys that are not indexed are ignored)
+        """
+        with self._lock:
+            for key in keys:
+                if key in self._texts:
+                    self._texts.move_to_end(key)
+
+    def _evict(self, keep: Set[str]) -> int:
+        evicted = 0
+        while len(self._texts) > self.max_articles:
+            key = next(iter(self._texts))
+            if key in keep:
+                # Only articles of the current batch are left, keep them all
+                break
+            self._remove(key)
+            evicted += 1
+        return evicted
+
+    def _add(self, key: str, texts, published: str):
+        self._texts[key] = texts
+        title_tokens, summary_tokens = texts[0].split(), texts[1].split()
+        self._lengths[key] = (len(title_tokens), len(summary_tokens))
+        self._total_lengths[0] += len(title_tokens)
+        self._total_lengths[1] += len(summary_tokens)
+        try:
+            # Dates are stored as YYYY-MM-DD; slicing is much cheaper than strptime
+            self._published[key] = date(int(published[:4]), int(published[5:7]), int(published[8:10])).toordinal()
+        except (TypeError, ValueError):
+            self._published[key] = None
+
+        title_counts, summary_counts = Counter(title_tokens), Counter(summary_tokens)
+        for token in title_counts.keys() | summary_counts.keys():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                # Keep the cached vocabulary expansions up to date
+                for part, tokens in self._expansions.items():
+                    if part in token:
+                        tokens.add(token)
+            postings[key] = (title_counts[token], summary_counts[token])
+
+    def _remove(self, key: str):
+        title, summary = self._texts.pop(key)
+        title_length, summary_length = self._lengths.pop(key)
+        self._total_lengths[0] -= title_length
+        self._total_lengths[1] -= summary_length
+        self._published.pop(key, None)
+        for token in set(title.split()) | set(summary.split()):
+            postings = self._postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(key, None)
+            if not postings:
+                # Drop tokens no article uses anymore from the vocabulary
+                del self._postings[token]
+                for part, tokens in self._expansions.items():
+                    if part in token:
+                        tokens.discard(token)
+
+    def _remember(self, cache: OrderedDict, key, value):
+        cache[key] = value
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return value
+
+    def _expand(self, part: str) -> Set[str]:
+        tokens = self._expansions.get(part)
+        if tokens is None:
+            return self._remember(self._expansions, part, {token for token in self._postings if part in token})
+        self._expansions.move_to_end(part)
+        return tokens
+
+    def _text(self, key: str, field: int) -> str:
+        title, summary = self._texts[key]
+        if field == TITLE:
+            return title
+        if field == SUMMARY:
+            return summary
+        return title + " " + summary
+
+    def match(self, keyword: str, field: int = CONTENT) -> Set[str]:
+        """
+        Find the articles whose field contains a keyword.
+
+        Args:
+            keyword: Keyword (matched case-insensitively as a substring)
+            field: TITLE, SUMMARY or CONTENT (title and summary joined by a space)
+
+        Returns:
+            Set of article keys
+        """
+        keyword = keyword.lower()
+        with self._lock:
+            cache_key = (keyword, field)
+            if cache_key in self._matches:
+                self._matches.move_to_end(cache_key)
+                return self._matches[cache_key]
+
+            parts = keyword.split()
+            candidates = None
+            for part in parts:
+                docs = set()
+                for token in self._expand(part):
+                    for key, (title_tf, summary_tf) in self._postings[token].items():
+                        if (field & TITLE and title_tf) or (field & SUMMARY and summary_tf):
+                            docs.add(key)
+                candidates = docs if candidates is None else candidates & docs
+                if not candidates:
+                    break
+
+            if candidates is None:
+                # Empty or whitespace-only keyword, check every article
+                candidates = set(self._texts)
+
+            if not (len(parts) == 1 and parts[0] == keyword):
+                # Phrases (and keywords with surrounding whitespace) need the exact text
+                candidates = {key for key in candidates if keyword in self._text(key, field)}
+
+            return self._remember(self._matches, cache_key, candidates)
+
+    def keyword_counts(self, keywords: List[str], field: int = CONTENT, keys: Set[str] = None) -> Counter:
+        """
+        Count, per article, the listed keywords its field contains.
+
+        Args:
+            keywords: Keywords (duplicates in the list count twice)
+            field: TITLE, SUMMARY or CONTENT
+            keys: Only count these articles (defaults to every indexed article)
+
+        Returns:
+            Counter of article key to number of keywords found (articles without
+            matches are left out)
+        """
+        counts = Counter()
+        for keyword, multiplicity in Counter(keyword.lower() for keyword in keywords).items():
+            matches = self.match(keyword, field)
+            if keys is not None:
+                matches = matches & keys
+            for key in matches:
+                counts[key] += multiplicity
+        return counts
+
+    def term_frequencies(self, keyword: str) -> Dict[str, Tuple[int, int]]:
+        """
+        Count how often a keyword occurs in the title and summary of each article.
+
+        A keyword without whitespace counts once per token containing it; a phrase
+        counts its occurrences in the field text.
+
+        Args:
+            keyword: Keyword (matched case-insensitively)
+
+        Returns:
+            Dictionary of article key to (title frequency, summary frequency) for
+            the articles containing the keyword in either field
+        """
+        keyword = keyword.lower()
+        with self._lock:
+            frequencies = self._frequencies.get(keyword)
+            if frequencies is not None:
+                self._frequencies.move_to_end(keyword)
+                return frequencies
+
+            parts = keyword.split()
+            frequencies = {}
+            if len(parts) == 1 and parts[0] == keyword:
+                for token in self._expand(keyword):
+                    for key, (title_tf, summary_tf) in self._postings[token].items():
+                        if key in frequencies:
+                            current = frequencies[key]
+                            frequencies[key] = (current[0] + title_tf, current[1] + summary_tf)
+                        else:
+                            frequencies[key] = (title_tf, summary_tf)
+            elif keyword.strip():
+                for key in self.match(keyword, CONTENT):
+                    title, summary = self._texts[key]
+                    title_tf, summary_tf = title.count(keyword), summary.count(keyword)
+                    if title_tf or summary_tf:
+                        frequencies[key] = (title_tf, summary_tf)
+
+            return self._remember(self._frequencies, keyword, frequencies)
+
+    def field_lengths(self, key: str) -> Tuple[int, int]:
+        """Return the (title, summary) length of an article in tokens."""
+        return self._lengths[key]
+
+    def average_lengths(self) -> Tuple[float, float]:
+        """Return the average (title, summary) length in tokens."""
+        count = max(1, len(self._texts))
+        return self._total_lengths[0] / count, self._total_lengths[1] / count
+
+    def published_ordinal(self, key: str) -> int:
+        """Return an article's publication date as a day ordinal (None if unknown)."""
+        return self._published.get(key)
+
+
+_index = ArticleIndex()
+
+
+def get_article_index() -> ArticleIndex:
+    """
+    Get the shared article index.
+
+    Returns:
+        The process-wide ArticleIndex
+    """
+    return _index
+
+
+def index_articles(articles: List[Dict[str, Any]]) -> ArticleIndex:
+    """
+    Make sure articles are indexed and return the index to query them.
+
+    Args:
+        articles: Article dictionaries about to be queried
+
+    Returns:
+        The shared ArticleIndex, or None if the articles cannot be told apart by
+        key (the caller should scan them instead)
+    """
+    if len({article_key(article) for article in articles}) != len(articles):
+        return None
+    index = get_article_index()
+    index.add_articles(articles)
+    return index
@@ -0,0 +1,360 @@
+"""
+Persistent article store for the AI & Gaming Newsletter
+
+This module keeps ingested articles in an indexed SQLite table instead of in the
+session state. Fetchers write their articles here and only store a small reference
+(the store path and the article IDs) in the state, so session writes stay small no
+matter how many articles have been collected, and curation can query a date range
+without loading the whole archive.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import List, Dict, Any, Iterable
+from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+
+from .article_index import get_article_index
+from .trend_store import get_trend_store
+
+# Path of the SQLite database holding the articles
+DEFAULT_DB_PATH = os.getenv("NEWSLETTER_ARTICLE_DB", "newsletter_articles.db")
+
+# SQLite limits the number of parameters per statement, so large ID lists are chunked
+QUERY_CHUNK_SIZE = 500
+
+# Query parameters that only track where a click came from
+_TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref"}
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so the same article links compare equal.
+
+    Lowercases the scheme and host, drops the fragment, tracking parameters
+    (utm_*, fbclid, ...) and any trailing slash.
+
+    Args:
+        url: URL to normalize
+
+    Returns:
+        The canonical URL (empty string for an empty URL)
+    """
+    if not url:
+        return ""
+
+    parsed = urlparse(url.strip())
+    query = [(key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+             if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS]
+    path = parsed.path.rstrip("/") or "/"
+
+    return urlunparse((parsed.scheme.lower(), parsed.netloc.lower(), path, parsed.params,
+                       urlencode(query), ""))
+
+
+def content_hash(article: Dict[str, Any]) -> str:
+    """
+    Hash the content of an article (title and summary).
+
+    Args:
+        article: Article dictionary
+
+    Returns:
+        Hex digest identifying the article content
+    """
+    content = f"{article.get('title', '')}\n{article.get('summary', '')}"
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class ArticleStore:
+    """SQLite-backed article repository."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        """
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id TEXT PRIMARY KEY,
+                canonical_url TEXT,
+                source TEXT,
+                published TEXT,
+                content_hash TEXT,
+                data TEXT NOT NULL,
+                ingested_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_canonical_url ON articles(canonical_url);
+            CREATE INDEX IF NOT EXISTS idx_articles_published ON articles(published);
+            CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source);
+            CREATE INDEX IF NOT EXISTS idx_articles_content_hash ON articles(content_hash);
+        """)
+        self._conn.commit()
+
+    def upsert_articles(self, articles: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert new articles and update the ones whose content changed.
+
+        Args:
+            articles: Article dictionaries (each needs an "id")
+
+        Returns:
+            Number of articles that were not in the store before
+        """
+        now = time.time()
+        rows = []
+        for article in articles:
+            rows.append((
+                article["id"],
+                canonicalize_url(article.get("url", "")),
+                article.get("source", ""),
+                article.get("published", ""),
+                content_hash(article),
+                json.dumps(article),
+                now
+            ))
+
+        if not rows:
+            return 0
+
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany("""
+                INSERT INTO articles (id, canonical_url, source, published, content_hash, data, ingested_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO NOTHING
+            """, rows)
+            inserted = self._conn.total_changes - before
+            self._conn.executemany("""
+                UPDATE articles
+                SET canonical_url = ?, source = ?, published = ?, content_hash = ?, data = ?
+                WHERE id = ? AND content_hash != ?
+            """, [(row[1], row[2], row[3], row[4], row[5], row[0], row[4]) for row in rows])
+            self._conn.commit()
+
+        return inserted
+
+    def get_articles(self, ids: List[str], start_date: str = None, end_date: str = None) -> List[Dict[str, Any]]:
+        """
+        Load articles by ID, optionally restricted to a publication date range.
+
+        Args:
+            ids: Article IDs to load
+            start_date: Earliest publication date to include (YYYY-MM-DD)
+            end_date: Latest publication date to include (YYYY-MM-DD)
+
+        Returns:
+            List of article dictionaries in the order of ids (missing IDs are skipped)
+        """
+        date_clause, date_params = self._date_filter(start_date, end_date)
+        found = {}
+
+        with self._lock:
+            for i in range(0, len(ids), QUERY_CHUNK_SIZE):
+                chunk = ids[i:i + QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = self._conn.execute(
+                    f"SELECT id, data FROM articles WHERE id IN ({placeholders}){date_clause}",
+                    list(chunk) + date_params
+                )
+                for article_id, data in cursor:
+                    found[article_id] = data
+
+        return [json.loads(found[article_id]) for article_id in ids if article_id in found]
+
+    def query(self, start_date: str = None, end_date: str = None, source: str = None,
+              limit: int = None) -> List[Dict[str, Any]]:
+        """
+        Query the whole archive by publication date and source.
+
+        Args:
+            start_date: Earliest publication date to include (YYYY-MM-DD)
+            end_date: Latest publication date to include (YYYY-MM-DD)
+            source: Only include articles from this source
+            limit: Maximum number of articles to return
+
+        Returns:
+            List of article dictionaries, newest first
+        """
+        date_clause, params = self._date_filter(start_date, end_date)
+        sql = f"SELECT data FROM articles WHERE 1 = 1{date_clause}"
+        if source:
+            sql += " AND source = ?"
+            params.append(source)
+        sql += " ORDER BY published DESC, id"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+
+        return [json.loads(data) for (data,) in rows]
+
+    def find_by_url(self, url: str) -> List[Dict[str, Any]]:
+        """
+        Find articles that link to the same canonical URL.
+
+        Args:
+            url: Article URL
+
+        Returns:
+            List of matching article dictionaries
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM articles WHERE canonical_url = ?", (canonicalize_url(url),)
+            ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def count(self) -> int:
+        """Return the number of articles in the store."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def _date_filter(self, start_date: str, end_date: str):
+        clause = ""
+        params = []
+        if start_date:
+            clause += " AND published >= ?"
+            params.append(start_date)
+        if end_date:
+            clause += " AND published <= ?"
+            params.append(end_date)
+        return clause, params
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_article_store(db_path: str = DEFAULT_DB_PATH) -> ArticleStore:
+    """
+    Get the shared article store for a database file.
+
+    Args:
+        db_path: Path of the SQLite database file
+
+    Returns:
+        The ArticleStore for that file
+    """
+    with _stores_lock:
+        if db_path not in _stores:
+            _stores[db_path] = ArticleStore(db_path)
+        return _stores[db_path]
+
+
+def is_reference(value: Any) -> bool:
+    """
+    Tell whether a state value is a reference written by save_articles.
+
+    Args:
+        value: Value of a state key
+
+    Returns:
+        True for an {"ids": [...]} reference, False for a plain article list
+    """
+    return isinstance(value, dict) and "ids" in value
+
+
+def save_articles(state: Dict[str, Any], key: str, articles: List[Dict[str, Any]],
+                  merge: bool = False, db_path: str = DEFAULT_DB_PATH) -> int:
+    """
+    Write articles to the store and keep only a reference to them in the state.
+
+    Args:
+        state: Session state (tool_context.state)
+        key: State key to update (e.g. "articles", "rss_articles")
+        articles: Article dictionaries to save
+        merge: Add to the articles already referenced under key (skipping known IDs)
+            instead of replacing them
+        db_path: Path of the SQLite database file
+
+    Returns:
+        Number of articles referenced under key afterwards
+    """
+    store = get_article_store(db_path)
+    current = state.get(key)
+
+    ids = []
+    if merge and current:
+        if is_reference(current):
+            ids = list(current["ids"])
+        else:
+            # Older sessions hold the full article list, move it into the store
+            store.upsert_articles(current)
+            ids = [article["id"] for article in current]
+
+    store.upsert_articles(articles)
+    # Index the new articles now so keyword queries never rescan them
+    get_article_index().add_articles(articles)
+    # Count the topics of new articles for the rolling trends
+    get_trend_store().record_articles(articles)
+
+    known_ids = set(ids)
+    for article in articles:
+        if article["id"] not in known_ids:
+            ids.append(article["id"])
+            known_ids.add(article["id"])
+
+    # Assign a new value so the session service records the change
+    state[key] = {"store": store.db_path, "ids": ids}
+    return len(ids)
+
+
+def load_articles(state: Dict[str, Any], key: str, start_date: str = None,
+                  end_date: str = None) -> List[Dict[str, Any]]:
+    """
+    Resolve the articles referenced under a state key.
+
+    Plain article lists (as stored by older sessions and by curation steps) are
+    returned as they are, filtered by date if requested.
+
+    Args:
+        state: Session state (tool_context.state)
+        key: State key to read
+        start_date: Earliest publication date to include (YYYY-MM-DD)
+        end_date: Latest publication date to include (YYYY-MM-DD)
+
+    Returns:
+        List of article dictionaries
+    """
+    value = state.get(key)
+    if not value:
+        return []
+
+    if is_reference(value):
+        store = get_article_store(value.get("store", DEFAULT_DB_PATH))
+        return store.get_articles(value["ids"], start_date, end_date)
+
+    if start_date or end_date:
+        return [article for article in value
+                if (not start_date or article.get("published", "") >= start_date)
+                and (not end_date or article.get("published", "") <= end_date)]
+    return value
+
+
+def count_articles(state: Dict[str, Any], key: str) -> int:
+    """
+    Count the articles referenced under a state key without loading them.
+
+    Args:
+        state: Session state (tool_context.state)
+        key: State key to read
+
+    Returns:
+        Number of articles
+    """
+    value = state.get(key)
+    if not value:
+        return 0
+    if is_reference(value):
+        return len(value["ids"])
+    return len(value)
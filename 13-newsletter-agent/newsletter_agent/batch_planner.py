@@ -0,0 +1,194 @@
+"""
+Token-budget batch planning for the AI & Gaming Newsletter
+
+The LLM tools send articles to the model in batches. A fixed number of articles
+per batch either overflows the model's limits on a big week or wastes round trips
+on a small one, so this module packs articles into prompts by estimated tokens
+instead: a batch grows until its prompt would exceed the input token budget or
+its expected answer would exceed the output token budget.
+
+Token counts are estimated from the text length, which is accurate enough to plan
+with and needs no API call. When a response is truncated anyway, run_batches()
+keeps the part that arrived and sends the remaining items again, or splits the
+batch in half when nothing usable arrived. Transient API errors are retried by
+the calls themselves (see llm_retry); run_batches() retries the other failures
+of a batch, such as a response that does not parse.
+"""
+
+import os
+import json
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import List, Any, Callable, Sequence, Tuple
+
+from .llm_cache import TruncatedResponse
+from .llm_retry import LLMCallError, backoff_delay, get_token_budget
+
+# Average characters per token of English text and JSON
+CHARS_PER_TOKEN = 4
+
+# Tokens a single prompt may use (instructions plus articles)
+INPUT_TOKEN_BUDGET = int(os.getenv("NEWSLETTER_INPUT_TOKEN_BUDGET", 30000))
+# Tokens a single response may use (the model's output limit)
+OUTPUT_TOKEN_BUDGET = int(os.getenv("NEWSLETTER_OUTPUT_TOKEN_BUDGET", 8192))
+# Share of the output budget planned for, leaving room for longer answers than expected
+OUTPUT_HEADROOM = 0.75
+
+# Calls in flight at once
+DEFAULT_CONCURRENCY = 4
+# Attempts per batch before it is given up (requesting the rest of a truncated
+# batch counts, splitting it in half does not)
+BATCH_ATTEMPTS = 3
+# Seconds to wait before retrying a failed batch (doubled on every retry, then jittered)
+RETRY_DELAY = 2.0
+
+
+def estimate_tokens(value: Any) -> int:
+    """
+    Estimate the tokens of a text, or of a value as it appears in a prompt.
+
+    Args:
+        value: Text, or a value that is sent as indented JSON
+
+    Returns:
+        Estimated number of tokens
+    """
+    text = value if isinstance(value, str) else json.dumps(value, indent=2)
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def plan_batches(items: Sequence[Any], prompt_tokens: int, output_tokens_per_item: int,
+                 input_budget: int = INPUT_TOKEN_BUDGET, output_budget: int = OUTPUT_TOKEN_BUDGET,
+                 measure: Callable[[Any], int] = estimate_tokens) -> List[List[Any]]:
+    """
+    Pack items into as few batches as the token budgets allow.
+
+    Items keep their order, so results can be merged back in order. An item too
+    large for any budget still gets a batch of its own.
+
+    Args:
+        items: Items to batch, one per article
+        prompt_tokens: Tokens of the prompt without any items
+        output_tokens_per_item: Expected response tokens per item
+        input_budget: Maximum prompt tokens
+        output_budget: Maximum response tokens
+        measure: Prompt tokens of an item (defaults to the item as indented JSON)
+
+    Returns:
+        List of batches, each a list of items
+    """
+    max_items = max(1, int(output_budget * OUTPUT_HEADROOM) // max(1, output_tokens_per_item))
+
+    batches = []
+    batch, batch_tokens = [], prompt_tokens
+    for item in items:
+        tokens = measure(item)
+        if batch and (batch_tokens + tokens > input_budget or len(batch) >= max_items):
+            batches.append(batch)
+            batch, batch_tokens = [], prompt_tokens
+        batch.append(item)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def _delayed(evaluate: Callable[[List[Any]], Any], batch: List[Any], delay: float) -> Any:
+    # Runs in a worker thread, so the backoff before a retry does not hold up other batches
+    if delay:
+        time.sleep(delay)
+    return evaluate(batch)
+
+
+def run_batches(batches: List[List[Any]], evaluate: Callable[[List[Any]], Any],
+                concurrency: int = DEFAULT_CONCURRENCY, attempts: int = BATCH_ATTEMPTS,
+                retry_delay: float = RETRY_DELAY) -> List[Tuple[List[Any], Any]]:
+    """
+    Evaluate batches concurrently, retrying failed ones and splitting truncated ones.
+
+    Args:
+        batches: Batches of items (see plan_batches)
+        evaluate: Called with a batch in a worker thread, returns its result.
+            It raises TruncatedResponse when the response was cut off (with the
+            partial result and the items still missing, if it has them) and any
+            other exception when the call failed.
+        concurrency: Maximum number of calls in flight
+        attempts: Attempts per batch before it is given up; requesting the
+            remaining items of a truncated batch is an attempt too
+        retry_delay: Seconds before the first retry, doubled on every retry
+            (batches are not retried once the run's token budget is spent)
+
+    Returns:
+        List of (batch, result) in item order. A truncated batch appears with its
+        partial result followed by the batch of its remaining items, or as its
+        halves; the result is None for batches (or remaining items) that failed
+        every attempt
+    """
+    results = {}
+    if not batches:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(batches)))) as executor:
+        pending = {}
+
+        def submit(key, batch, attempt, delay=0):
+            # Run in a copy of the caller's context, so its LLM deadline applies
+            future = executor.submit(contextvars.copy_context().run, _delayed, evaluate, batch, delay)
+            pending[future] = (key, batch, attempt)
+
+        for batch_idx, batch in enumerate(batches):
+            print(f"  Processing batch {batch_idx+1}/{len(batches)} ({len(batch)} articles)...")
+            # Keys sort in item order: the parts of a batch get the batch's key plus
+            # their position, which sorts after the batch itself
+            submit((batch_idx,), batch, 1)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key, batch, attempt = pending.pop(future)
+                label = "Batch " + ".".join(str(part + 1) for part in key)
+                try:
+                    results[key] = (batch, future.result())
+                except TruncatedResponse as e:
+                    if e.partial:
+                        if e.remaining and len(e.remaining) >= len(batch):
+                            # Nothing that arrived belongs to the batch, asking again would loop
+                            print(f"  {label} was truncated without any usable result: {str(e)}")
+                            results[key] = (batch, None)
+                            continue
+                        # Keep what arrived and only ask again for what is missing
+                        results[key] = (batch, e.partial)
+                        if not e.remaining:
+                            continue
+                        if attempt >= attempts:
+                            print(f"  {label} was truncated ({str(e)}), giving up on the remaining "
+                                  f"{len(e.remaining)} articles after {attempt} attempts")
+                            results[key + (1,)] = (e.remaining, None)
+                            continue
+                        print(f"  {label} was truncated ({str(e)}), requesting the remaining {len(e.remaining)} articles...")
+                        submit(key + (1,), e.remaining, attempt + 1)
+                        continue
+                    if len(batch) > 1:
+                        half = len(batch) // 2
+                        print(f"  {label} was truncated ({str(e)}), splitting it into {half} + {len(batch) - half} articles...")
+                        submit(key + (0,), batch[:half], attempt)
+                        submit(key + (1,), batch[half:], attempt)
+                        continue
+                    print(f"  {label} was truncated: {str(e)}")
+                    results[key] = (batch, None)
+                except LLMCallError as e:
+                    # The call already used up its retries, deadline or budget
+                    print(f"  {label} failed: {str(e)}")
+                    results[key] = (batch, None)
+                except Exception as e:
+                    if attempt >= attempts or get_token_budget().exhausted:
+                        print(f"  {label} failed after {attempt} attempts: {str(e)}")
+                        results[key] = (batch, None)
+                        continue
+                    delay = backoff_delay(attempt, retry_delay)
+                    print(f"  {label} failed ({str(e)}), retrying in {delay:.1f}s...")
+                    submit(key, batch, attempt + 1, delay)
+
+    return [results[key] for key in sorted(results)]
+
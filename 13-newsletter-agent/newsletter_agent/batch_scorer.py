@@ -0,0 +1,230 @@
+"""
+Batch keyword scoring for the AI & Gaming Newsletter
+
+Rating, categorization and trending-topic detection all count, per article, how
+many keywords of each group (rating criterion, category, topic) the article
+contains. Instead of scoring article by article, this module builds one
+article x keyword hit matrix per corpus and derives every group count from it with
+a single matrix product; callers then pick categories with argmax and rating tiers
+with vectorized thresholds. The matrix is filled keyword by keyword: each keyword
+is searched for in the whole corpus joined into one string, which str.find scans
+much faster than a regex can test every article for every keyword. Very large
+corpora (e.g. rating the whole archive) are split across worker processes.
+
+Keywords keep the substring semantics of `keyword.lower() in text.lower()`, and a
+keyword listed twice in a group counts twice.
+"""
+
+import os
+import threading
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Sequence, Tuple
+
+import numpy as np
+
+from .article_index import TITLE, SUMMARY, CONTENT, ArticleIndex, article_key
+from .keyword_matcher import KeywordMatcher
+
+# Number of scorers (keyword group sets) to keep
+CACHE_SIZE = 16
+
+# Below this many articles, counting in worker processes costs more than it saves
+PARALLEL_MIN_ARTICLES = 20000
+# Articles sent to a worker process at a time
+PARALLEL_CHUNK_SIZE = 5000
+
+
+class BatchScorer:
+    """Keyword group counts for many articles at once."""
+
+    def __init__(self, groups: Dict[str, List[str]]):
+        """
+        Args:
+            groups: Mapping of group name to its keywords
+        """
+        self.groups = list(groups)
+        self.matcher = KeywordMatcher(keyword for keywords in groups.values() for keyword in keywords)
+        self.keywords = list(self.matcher.multiplicity)
+        self._columns = {keyword: column for column, keyword in enumerate(self.keywords)}
+
+        # keyword x group matrix of how often each group lists each keyword
+        self.membership = np.zeros((len(self.keywords), len(self.groups)), dtype=np.int32)
+        for group_column, keywords in enumerate(groups.values()):
+            for keyword in keywords:
+                self.membership[self._columns[keyword.lower()], group_column] += 1
+
+    def hits(self, articles: Sequence[Dict[str, Any]], joined: bool = True,
+             index: ArticleIndex = None) -> np.ndarray:
+        """
+        Build the article x keyword hit matrix.
+
+        Args:
+            articles: Article dictionaries
+            joined: Match the title and summary joined by a space (as categorization
+                and trending do) instead of each field on its own (as rating does)
+            index: Article index holding the articles; the matrix is then filled
+                column by column from its postings instead of scanning the texts
+
+        Returns:
+            Boolean array of shape (len(articles), number of distinct keywords)
+        """
+        hits = np.zeros((len(articles), len(self.keywords)), dtype=bool)
+
+        if index is not None:
+            rows = {article_key(article): row for row, article in enumerate(articles)}
+            for column, keyword in enumerate(self.keywords):
+                matches = index.match(keyword, CONTENT) if joined else \
+                    index.match(keyword, TITLE) | index.match(keyword, SUMMARY)
+                matched_rows = [rows[key] for key in matches if key in rows]
+                hits[matched_rows, column] = True
+            return hits
+
+        # One text per article, or a title and a summary text per article
+        texts = []
+        for article in articles:
+            title, summary = article.get("title", ""), article.get("summary", "")
+            if joined:
+                texts.append((title + " " + summary).lower())
+            else:
+                texts.extend((title.lower(), summary.lower()))
+        texts_per_article = 1 if joined else 2
+
+        # Keywords never contain the separator, so no match spans two texts
+        corpus = "\0".join(texts)
+        ends = []
+        end = -1
+        for text in texts:
+            end += len(text) + 1
+            ends.append(end)
+
+        find = corpus.find
+        for column, keyword in enumerate(self.keywords):
+            if not keyword:
+                # The empty keyword is contained in every text
+                hits[:, column] = True
+                continue
+            matched_texts = []
+            position = find(keyword)
+            while position >= 0:
+                text_index = bisect_right(ends, position)
+                matched_texts.append(text_index)
+                # One match per text is enough, continue with the next one
+                position = find(keyword, ends[text_index] + 1)
+            hits[np.array(matched_texts, dtype=np.intp) // texts_per_article, column] = True
+        return hits
+
+    def counts(self, articles: Sequence[Dict[str, Any]], joined: bool = True,
+               index: ArticleIndex = None) -> np.ndarray:
+        """
+        Count the keywords of each group found in each article.
+
+        Args:
+            articles: Article dictionaries
+            joined: See hits()
+            index: See hits()
+
+        Returns:
+            Integer array of shape (len(articles), number of groups), columns in
+            the order of the groups
+        """
+        return self.hits(articles, joined, index).astype(np.int32) @ self.membership
+
+
+def best_groups(counts: np.ndarray) -> np.ndarray:
+    """
+    Pick the group with the most keyword hits for each article.
+
+    Args:
+        counts: Article x group counts
+
+    Returns:
+        Column of the best group per article (the first one on ties), -1 for
+        articles without any hit
+    """
+    if not counts.size:
+        return np.full(len(counts), -1)
+    return np.where(counts.max(axis=1) > 0, counts.argmax(axis=1), -1)
+
+
+def tiers(counts: np.ndarray, thresholds: Sequence[int], scores: Sequence[int], default: int) -> np.ndarray:
+    """
+    Map keyword counts to scores by thresholds.
+
+    Args:
+        counts: Keyword counts
+        thresholds: Minimum counts, highest first
+        scores: Score for each threshold
+        default: Score for counts below every threshold
+
+    Returns:
+        Array of scores shaped like counts
+    """
+    return np.select([counts >= threshold for threshold in thresholds], scores, default)
+
+
+def _count_chunk(groups: Dict[str, List[str]], joined: bool, texts: List[Tuple[str, str]]) -> np.ndarray:
+    # Runs in a worker process: only (title, summary) pairs go in and an integer
+    # array comes back, so little is pickled either way
+    articles = [{"title": title, "summary": summary} for title, summary in texts]
+    return get_batch_scorer(groups).counts(articles, joined)
+
+
+def parallel_counts(groups: Dict[str, List[str]], articles: Sequence[Dict[str, Any]], joined: bool = True,
+                    workers: int = None, min_articles: int = PARALLEL_MIN_ARTICLES,
+                    chunk_size: int = PARALLEL_CHUNK_SIZE) -> np.ndarray:
+    """
+    Count keyword groups for a large corpus across worker processes.
+
+    Small corpora (or a single worker) are counted in this process, and so is
+    everything if worker processes cannot be started.
+
+    Args:
+        groups: Mapping of group name to its keywords
+        articles: Article dictionaries
+        joined: See BatchScorer.hits()
+        workers: Number of worker processes (defaults to the number of CPUs)
+        min_articles: Count in this process below this many articles
+        chunk_size: Articles per worker task
+
+    Returns:
+        Integer array of shape (len(articles), number of groups), as BatchScorer.counts()
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(articles) < max(min_articles, 2 * chunk_size):
+        return get_batch_scorer(groups).counts(articles, joined)
+
+    chunks = [[(article.get("title", ""), article.get("summary", "")) for article in articles[i:i + chunk_size]]
+              for i in range(0, len(articles), chunk_size)]
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            results = list(executor.map(_count_chunk, [groups] * len(chunks), [joined] * len(chunks), chunks))
+    except (OSError, BrokenProcessPool) as e:
+        print(f"Counting in worker processes failed ({e}), counting serially")
+        return get_batch_scorer(groups).counts(articles, joined)
+    return np.vstack(results)
+
+
+_scorers = {}
+_scorers_lock = threading.Lock()
+
+
+def get_batch_scorer(groups: Dict[str, List[str]]) -> BatchScorer:
+    """
+    Get the batch scorer for named keyword lists, building it on first use.
+
+    Args:
+        groups: Mapping of group name to its keywords
+
+    Returns:
+        The shared BatchScorer for those lists
+    """
+    key = tuple((group, tuple(keywords)) for group, keywords in groups.items())
+    with _scorers_lock:
+        scorer = _scorers.get(key)
+        if scorer is None:
+            if len(_scorers) >= CACHE_SIZE:
+                _scorers.pop(next(iter(_scorers)))
+            scorer = _scorers[key] = BatchScorer(groups)
+        return scorer
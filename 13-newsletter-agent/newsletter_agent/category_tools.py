@@ -2,6 +2,8 @@ from datetime import datetime
 from typing import List, Dict, Any
 from google.adk.tools.tool_context import ToolContext
 
+from .batch_scorer import get_batch_scorer, best_groups
+
 
 def categorize_articles(tool_context: ToolContext) -> dict:
     """Categorize articles into predefined sections based on content.
@@ -56,31 +58,14 @@ def categorize_articles(tool_context: ToolContext) -> dict:
         }
     }
     
-    # Categorize each article
-    for article in articles:
-        best_category = None
-        best_score = 0
-        
-        # Combine title and summary for content analysis
-        title = article.get("title", "").lower()
-        summary = article.get("summary", "").lower()
-        content = title + " " + summary
-        
-        # Score each category based on keyword matches
-        for cat_id, category in categories.items():
-            score = 0
-            for keyword in category["keywords"]:
-                if keyword.lower() in content:
-                    score += 1
-            
-            # Select the category with the highest score
-            if score > best_score:
-                best_score = score
-                best_category = cat_id
-        
-        # Assign to best category or "other" if no good match
-        if best_category and best_score > 0:
-            categories[best_category]["articles"].append(article)
+    # Count category keywords for all articles in one hit matrix
+    category_ids = list(categories)
+    counts = get_batch_scorer({cat_id: category["keywords"] for cat_id, category in categories.items()}).counts(articles)
+    
+    # Assign each article to the category with the highest score, or "other" if no keyword matched
+    for article, best in zip(articles, best_groups(counts).tolist()):
+        if best >= 0:
+            categories[category_ids[best]]["articles"].append(article)
         else:
             # Create "other" category if it doesn't exist
             if "other" not in categories:
@@ -0,0 +1,164 @@
+"""
+Shared API clients for the AI & Gaming Newsletter
+
+The tools used to build their API clients on every call (and every batch): a new
+Gemini model object per LLM call, a new OpenAI client per Perplexity search and
+a new gspread authorization per spreadsheet fetch, each paying for its own TLS
+handshake and auth round trip, while three modules configured the Gemini API
+when they were imported. This module creates every client lazily on first use,
+keeps it for the whole process (clients pool their connections, so later calls
+reuse them) and replaces it when its health check fails, when it gets too old or
+when a tool reports it broken.
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+import google.generativeai as genai
+
+# Seconds a gspread client is kept before authorizing again (access tokens last an hour)
+GSPREAD_MAX_AGE = 45 * 60
+
+# Connections an OpenAI-compatible client keeps open
+OPENAI_MAX_CONNECTIONS = 20
+OPENAI_MAX_KEEPALIVE = 10
+
+
+class ClientRegistry:
+    """Thread-safe, lazily filled cache of clients with health checks."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (kind, key) -> (client, monotonic creation time)
+        self._clients = {}
+
+    def get(self, kind: str, key: Hashable, factory: Callable[[], Any],
+            healthy: Callable[[Any], bool] = None, max_age: float = None) -> Any:
+        """
+        Get a client, creating it on first use or when the cached one is unusable.
+
+        Args:
+            kind: Kind of client (e.g. "openai")
+            key: What distinguishes clients of that kind (API key, base URL...)
+            factory: Creates a new client
+            healthy: Returns False for a client that must be replaced
+            max_age: Seconds after which the client is replaced
+
+        Returns:
+            The shared client
+        """
+        with self._lock:
+            entry = self._clients.get((kind, key))
+            if entry is not None:
+                client, created = entry
+                expired = max_age is not None and time.monotonic() - created > max_age
+                if not expired and (healthy is None or healthy(client)):
+                    return client
+            client = factory()
+            self._clients[(kind, key)] = (client, time.monotonic())
+            return client
+
+    def invalidate(self, kind: str, key: Hashable = None) -> None:
+        """
+        Forget clients so the next get() creates new ones.
+
+        Args:
+            kind: Kind of client
+            key: Only forget the client with this key (defaults to all of the kind)
+        """
+        with self._lock:
+            for entry_kind, entry_key in list(self._clients):
+                if entry_kind == kind and (key is None or entry_key == key):
+                    del self._clients[(entry_kind, entry_key)]
+
+
+_registry = ClientRegistry()
+
+
+def get_registry() -> ClientRegistry:
+    """
+    Get the process-wide client registry.
+
+    Returns:
+        The shared ClientRegistry
+    """
+    return _registry
+
+
+def configure_genai() -> None:
+    """Configure the Gemini API with GOOGLE_API_KEY, once per key."""
+    api_key = os.getenv("GOOGLE_API_KEY", "")
+
+    def configure():
+        genai.configure(api_key=api_key)
+        return api_key
+
+    # The registry holds the key the API is configured with; configure again when it changed
+    _registry.get("genai", None, configure, healthy=lambda configured_key: configured_key == api_key)
+
+
+def get_generative_model(model: str, generation_config: Dict[str, Any] = None) -> genai.GenerativeModel:
+    """
+    Get the shared Gemini model object for a model and generation config.
+
+    Args:
+        model: Model name
+        generation_config: Generation parameters
+
+    Returns:
+        The GenerativeModel; its API client and connections are shared
+    """
+    configure_genai()
+    # Models made before the API key changed keep the old key's client
+    key = (os.getenv("GOOGLE_API_KEY", ""), model, json.dumps(generation_config or {}, sort_keys=True, default=str))
+    return _registry.get("gemini", key, lambda: genai.GenerativeModel(model, generation_config=generation_config))
+
+
+def get_openai_client(api_key: str, base_url: str = None) -> Any:
+    """
+    Get the shared OpenAI-compatible client for an API key and endpoint.
+
+    Args:
+        api_key: API key
+        base_url: API endpoint (e.g. Perplexity's), defaults to OpenAI's
+
+    Returns:
+        The OpenAI client, with a pooled HTTP transport
+    """
+    import httpx
+    from openai import OpenAI
+
+    def create():
+        http_client = httpx.Client(limits=httpx.Limits(max_connections=OPENAI_MAX_CONNECTIONS,
+                                                       max_keepalive_connections=OPENAI_MAX_KEEPALIVE),
+                                   follow_redirects=True)
+        return OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+
+    return _registry.get("openai", (api_key, base_url), create, healthy=lambda client: not client.is_closed())
+
+
+def get_gspread_client(creds_file: str, scope: tuple) -> Any:
+    """
+    Get the shared gspread client authorized with a service account file.
+
+    The client is authorized again when the file changes or the client is older
+    than GSPREAD_MAX_AGE.
+
+    Args:
+        creds_file: Path of the service account credentials file
+        scope: OAuth scopes
+
+    Returns:
+        The authorized gspread client
+    """
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    def create():
+        return gspread.authorize(ServiceAccountCredentials.from_json_keyfile_name(creds_file, list(scope)))
+
+    key = (os.path.abspath(creds_file), os.path.getmtime(creds_file), tuple(scope))
+    return _registry.get("gspread", key, create, max_age=GSPREAD_MAX_AGE)
@@ -1,7 +1,154 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import List, Dict, Any
 from google.adk.tools.tool_context import ToolContext
 
+from .article_index import TITLE, SUMMARY, article_key, index_articles
+from .article_store import content_hash, load_articles
+from .batch_scorer import get_batch_scorer
+from .keyword_matcher import get_matcher
+from .ranking import rank_articles
+from .score_cache import get_score_cache, scorer_key
+from .trend_store import TOPIC_KEYWORDS, TREND_WINDOWS, get_trend_store
+
+
+# Default keywords used to score articles
+DEFAULT_KEYWORDS = [
+    # Generative AI keywords
+    "generative AI", "gen AI", "diffusion model", "large language model", "LLM", 
+    "stable diffusion", "midjourney", "DALL-E", "GPT", "Vertex AI", "AWS Bedrock",
+    "text-to-image", "text-to-3D", "text-to-audio", "procedural generation",
+    
+    # Gaming AI keywords
+    "AI in games", "gaming", "game development", "NPC", "character behavior",
+    "game assets", "game design", "Unity", "Unreal Engine", "simulation",
+    
+    # Security and ethics
+    "OWASP", "AI security", "AI ethics", "UGC", "user-generated content",
+    "content moderation", "AI safety"
+]
+
+
+# Version of the keyword scoring below; bump it when the scoring changes so
+# cached scores are recomputed
+SCORING_VERSION = 1
+
+
+def score_article(article: Dict[str, Any], keywords: List[str]) -> int:
+    """Score an article's relevance based on keywords and recency.
+    
+    Args:
+        article: Article dictionary
+        keywords: List of keywords to prioritize
+        
+    Returns:
+        The relevance score (+2 per keyword in the title, +1 per keyword in the
+        summary, plus up to 3 points for recent articles)
+    """
+    return keyword_score(article, keywords) + recency_bonus(article)
+
+
+def keyword_score(article: Dict[str, Any], keywords: List[str]) -> int:
+    """Score an article's keyword hits (the part of the score that does not change over time).
+    
+    Args:
+        article: Article dictionary
+        keywords: List of keywords to prioritize
+        
+    Returns:
+        +2 per keyword in the title, +1 per keyword in the summary
+    """
+    matcher = get_matcher(keywords)
+    
+    # Score based on keywords in title (higher weight), then in summary
+    return 2 * matcher.count(article.get("title", "")) + matcher.count(article.get("summary", ""))
+
+
+def score_articles(articles: List[Dict[str, Any]], keywords: List[str]) -> List[int]:
+    """Score many articles at once (same scores as score_article).
+    
+    Keyword scores are cached per article ID, keyword set and scoring version, so
+    only articles that are new or whose content changed since an earlier run are
+    scored again; the recency bonus is added on top at query time.
+    
+    Args:
+        articles: List of article dictionaries
+        keywords: List of keywords to prioritize
+        
+    Returns:
+        The relevance score of each article, in order
+    """
+    cache = get_score_cache()
+    scorer = scorer_key(keywords, SCORING_VERSION)
+    hashes = [content_hash(article) if article.get("id") else None for article in articles]
+    cached = cache.get_scores(scorer, [article["id"] for article in articles if article.get("id")])
+    
+    scores = []
+    missing = []
+    for position, (article, digest) in enumerate(zip(articles, hashes)):
+        hit = cached.get(article.get("id"))
+        if hit is not None and hit[0] == digest:
+            scores.append(hit[1])
+        else:
+            scores.append(None)
+            missing.append(position)
+    
+    if missing:
+        fresh = _keyword_scores([articles[position] for position in missing], keywords)
+        rows = []
+        for position, score in zip(missing, fresh):
+            scores[position] = score
+            if hashes[position] is not None:
+                rows.append((articles[position]["id"], hashes[position], score))
+        cache.put_scores(scorer, rows)
+    
+    # Articles share few publication dates, so compute each date's bonus once
+    bonuses = {}
+    results = []
+    for article, score in zip(articles, scores):
+        published = article.get("published")
+        if published not in bonuses:
+            bonuses[published] = recency_bonus(article)
+        results.append(score + bonuses[published])
+    return results
+
+
+def _keyword_scores(articles: List[Dict[str, Any]], keywords: List[str]) -> List[int]:
+    # Keyword hits are looked up in the shared article index, so scoring another
+    # keyword set over the same articles does not rescan their text
+    index = index_articles(articles)
+    if index is None:
+        return [keyword_score(article, keywords) for article in articles]
+    
+    keys = {article_key(article) for article in articles}
+    title_counts = index.keyword_counts(keywords, TITLE, keys)
+    summary_counts = index.keyword_counts(keywords, SUMMARY, keys)
+    return [2 * title_counts[key] + summary_counts[key] for key in map(article_key, articles)]
+
+
+def recency_bonus(article: Dict[str, Any]) -> int:
+    """Bonus points for recently published articles.
+    
+    Args:
+        article: Article dictionary
+        
+    Returns:
+        3 for today or yesterday, 2 for the last 3 days, 1 for the last week, else 0
+    """
+    try:
+        pub_date = datetime.strptime(article.get("published", "2000-01-01"), "%Y-%m-%d")
+        days_old = (datetime.now() - pub_date).days
+        if days_old <= 1:  # Today or yesterday
+            return 3
+        elif days_old <= 3:  # Last 3 days
+            return 2
+        elif days_old <= 7:  # Last week
+            return 1
+    except:
+        # If date parsing fails, no bonus
+        pass
+    
+    return 0
+
 
 def curate_articles(criteria: Dict[str, Any], tool_context: ToolContext) -> dict:
     """Filter and rank articles based on relevance criteria.
@@ -11,15 +158,25 @@ def curate_articles(criteria: Dict[str, Any], tool_context: ToolContext) -> dict
             - keywords: List of keywords to prioritize
             - min_score: Minimum relevance score (0-10)
             - max_articles: Maximum number of articles to include
+            - days: Only consider articles published in the last N days
+            - ranking: "bm25" to rank by BM25 relevance with field weights and a
+              recency decay (min_score then applies to the BM25 score, default 0)
         tool_context: Context for accessing and updating session state
         
     Returns:
         A dictionary with curated articles
     """
     print(f"--- Tool: curate_articles called with criteria: {criteria} ---")
-    
-    # Get articles from state
-    articles = tool_context.state.get("articles", [])
+    start_date = None
+    if criteria.get("days"):
+        start_date = (datetime.now() - timedelta(days=criteria["days"])).strftime("%Y-%m-%d")
+
+    if criteria.get("ranking") == "bm25":
+        return _curate_bm25(criteria, start_date, tool_context)
+
+    # Get articles from the store referenced by the state, restricted to the
+    # requested date range so older articles are never loaded
+    articles = load_articles(tool_context.state, "articles", start_date=start_date)
     
     if not articles:
         return {
@@ -29,57 +186,13 @@ def curate_articles(criteria: Dict[str, Any], tool_context: ToolContext) -> dict
         }
     
     # Extract criteria
-    default_keywords = [
-        # Generative AI keywords
-        "generative AI", "gen AI", "diffusion model", "large language model", "LLM", 
-        "stable diffusion", "midjourney", "DALL-E", "GPT", "Vertex AI", "AWS Bedrock",
-        "text-to-image", "text-to-3D", "text-to-audio", "procedural generation",
-        
-        # Gaming AI keywords
-        "AI in games", "gaming", "game development", "NPC", "character behavior",
-        "game assets", "game design", "Unity", "Unreal Engine", "simulation",
-        
-        # Security and ethics
-        "OWASP", "AI security", "AI ethics", "UGC", "user-generated content",
-        "content moderation", "AI safety"
-    ]
-    
-    keywords = criteria.get("keywords", default_keywords)
+    keywords = criteria.get("keywords", DEFAULT_KEYWORDS)
     min_score = criteria.get("min_score", 3)
     max_articles = criteria.get("max_articles", 10)
     
     # Score and rank articles
     scored_articles = []
-    for article in articles:
-        # Initialize score
-        score = 0
-        
-        # Score based on keywords in title (higher weight)
-        title = article.get("title", "").lower()
-        for keyword in keywords:
-            if keyword.lower() in title:
-                score += 2
-        
-        # Score based on keywords in summary
-        summary = article.get("summary", "").lower()
-        for keyword in keywords:
-            if keyword.lower() in summary:
-                score += 1
-        
-        # Bonus for recency
-        try:
-            pub_date = datetime.strptime(article.get("published", "2000-01-01"), "%Y-%m-%d")
-            days_old = (datetime.now() - pub_date).days
-            if days_old <= 1:  # Today or yesterday
-                score += 3
-            elif days_old <= 3:  # Last 3 days
-                score += 2
-            elif days_old <= 7:  # Last week
-                score += 1
-        except:
-            # If date parsing fails, no bonus
-            pass
-        
+    for article, score in zip(articles, score_articles(articles, keywords)):
         # Only include articles that meet minimum score
         if score >= min_score:
             scored_articles.append({
@@ -108,8 +221,37 @@ def curate_articles(criteria: Dict[str, Any], tool_context: ToolContext) -> dict
     }
 
 
+def _curate_bm25(criteria: Dict[str, Any], start_date: str, tool_context: ToolContext) -> dict:
+    # Rank from the index and load only the selected articles
+    ranked, total = rank_articles(tool_context.state, "articles", criteria.get("keywords", DEFAULT_KEYWORDS),
+                                  criteria.get("max_articles", 10), start_date, criteria.get("min_score", 0))
+
+    if not total:
+        return {
+            "action": "curate_articles",
+            "status": "error",
+            "message": "No articles found to curate. Please fetch articles first."
+        }
+
+    curated_articles = [article for article, _ in ranked]
+    tool_context.state["curated_articles"] = curated_articles
+
+    return {
+        "action": "curate_articles",
+        "status": "success",
+        "ranking": "bm25",
+        "total_articles": total,
+        "curated_count": len(curated_articles),
+        "message": f"Curated {len(curated_articles)} articles from a total of {total} by BM25 relevance."
+    }
+
+
 def get_trending_topics(tool_context: ToolContext) -> dict:
-    """Identify trending topics from the curated articles.
+    """Identify trending topics and how they moved against the previous period.
+    
+    Topics are read from the rolling per-day counters of all ingested articles
+    (see trend_store.py). If no article was published in the last week, the
+    topics of the curated articles are counted instead.
     
     Args:
         tool_context: Context for accessing session state
@@ -129,56 +271,29 @@ def get_trending_topics(tool_context: ToolContext) -> dict:
             "message": "No curated articles found. Please curate articles first."
         }
     
-    # Comprehensive keyword frequency analysis for generative AI in gaming
-    topic_keywords = {
-        # Generative AI models and technologies
-        "generative_models": ["gpt", "llm", "large language model", "diffusion model", "stable diffusion", 
-                            "midjourney", "dall-e", "text-to-image", "text-to-3d", "generative ai", "gen ai"],
-        
-        # Cloud AI platforms
-        "ai_platforms": ["vertex ai", "aws bedrock", "azure openai", "hugging face", "replicate", 
-                        "anthropic", "claude", "nvidia", "cloud ai"],
-        
-        # Game development and engines
-        "game_development": ["game engine", "unity", "unreal", "godot", "game design", "developer", 
-                           "asset creation", "game assets", "3d models"],
-        
-        # NPC and character AI
-        "npc_behavior": ["npc", "character", "behavior", "pathfinding", "dialogue", "character ai", 
-                       "conversation", "agent", "autonomous"],
-        
-        # Procedural and content generation
-        "content_generation": ["procedural", "generation", "content", "level design", "world building", 
-                             "terrain", "texture", "asset generation"],
-        
-        # Player experience and personalization
-        "player_experience": ["player", "experience", "engagement", "personalization", "adaptive", 
-                            "dynamic difficulty", "recommendation"],
-        
-        # Security and ethics
-        "security_ethics": ["security", "ethics", "privacy", "bias", "fairness", "owasp", 
-                          "content moderation", "safety", "ugc", "user-generated"]
-    }
-    
-    # Count occurrences of each topic
-    topic_counts = {topic: 0 for topic in topic_keywords}
+    # Curated articles are normally counted at ingestion already, this only adds
+    # the ones that never went through the article store
+    trend_store = get_trend_store()
+    trend_store.record_articles(articles)
+    trending_topics = trend_store.trends(TREND_WINDOWS)
     
-    for article in articles:
-        title = article.get("title", "").lower()
-        summary = article.get("summary", "").lower()
-        content = title + " " + summary
+    if trending_topics:
+        days = TREND_WINDOWS[0]
+        message = f"Identified {len(trending_topics)} trending topics over the last {days} days."
+    else:
+        # Count occurrences of each topic from one article x keyword hit matrix (a
+        # keyword counts once per article that contains it), filled from the
+        # article index when the articles can be told apart by key
+        counts = get_batch_scorer(TOPIC_KEYWORDS).counts(articles, index=index_articles(articles))
+        topic_counts = dict(zip(TOPIC_KEYWORDS, counts.sum(axis=0).tolist()))
         
-        for topic, keywords in topic_keywords.items():
-            for keyword in keywords:
-                if keyword.lower() in content:
-                    topic_counts[topic] += 1
-    
-    # Sort topics by frequency
-    trending_topics = [
-        {"topic": topic, "count": count}
-        for topic, count in sorted(topic_counts.items(), key=lambda x: x[1], reverse=True)
-        if count > 0
-    ]
+        # Sort topics by frequency
+        trending_topics = [
+            {"topic": topic, "count": count}
+            for topic, count in sorted(topic_counts.items(), key=lambda x: x[1], reverse=True)
+            if count > 0
+        ]
+        message = f"Identified {len(trending_topics)} trending topics from {len(articles)} articles."
     
     # Store trending topics in state
     tool_context.state["trending_topics"] = trending_topics
@@ -187,5 +302,5 @@ def get_trending_topics(tool_context: ToolContext) -> dict:
         "action": "get_trending_topics",
         "status": "success",
         "topics": trending_topics,
-        "message": f"Identified {len(trending_topics)} trending topics from {len(articles)} articles."
+        "message": message
     }
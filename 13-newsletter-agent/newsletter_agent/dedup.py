@@ -0,0 +1,223 @@
+"""
+Near-duplicate story detection for the AI & Gaming Newsletter
+
+The same announcement often arrives from several sources under different IDs.
+This module groups such near-duplicates into story clusters with MinHash
+signatures over title + summary word shingles and locality-sensitive hashing
+(banding), so each article is only compared with the few candidates that share a
+band bucket. Building the index is roughly linear in the size of the corpus.
+"""
+
+import re
+import hashlib
+from typing import List, Dict, Any, Tuple, Optional
+
+import numpy as np
+
+# Number of MinHash permutations, split into bands of rows for LSH. Two articles
+# with Jaccard similarity J share a bucket with probability 1 - (1 - J**3)**24,
+# about 96% at the default threshold of 0.5 (and 48% at 0.3); candidates are
+# then checked against the threshold with the full signature
+NUM_PERMUTATIONS = 72
+BANDS = 24
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+
+# Estimated Jaccard similarity above which two articles are the same story
+DEFAULT_THRESHOLD = 0.5
+
+# Words per shingle
+SHINGLE_SIZE = 2
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+# Mersenne prime modulus of the universal hash functions; a * x + b stays below 2**63
+_PRIME = (1 << 31) - 1
+
+
+def _make_coefficients(count: int) -> Tuple[np.ndarray, np.ndarray]:
+    # Deterministic (a, b) pairs; x -> (a * x + b) mod p acts as one random
+    # permutation of the shingle hashes per pair
+    a, b = [], []
+    for i in range(count):
+        digest = hashlib.sha256(f"minhash-{i}".encode("utf-8")).digest()
+        a.append(int.from_bytes(digest[:8], "big") % (_PRIME - 1) + 1)
+        b.append(int.from_bytes(digest[8:16], "big") % _PRIME)
+    return np.array(a, dtype=np.uint64)[:, None], np.array(b, dtype=np.uint64)[:, None]
+
+
+_A, _B = _make_coefficients(NUM_PERMUTATIONS)
+
+
+def _shingles(article: Dict[str, Any]) -> set:
+    text = f"{article.get('title', '')} {article.get('summary', '')}".lower()
+    words = _WORD_RE.findall(text)
+    if len(words) < SHINGLE_SIZE:
+        return set(words)
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(article: Dict[str, Any]) -> Optional[Tuple[int, ...]]:
+    """
+    Compute the MinHash signature of an article's title and summary.
+
+    Args:
+        article: Article dictionary
+
+    Returns:
+        Tuple of NUM_PERMUTATIONS hash values, or None if the article has no text
+    """
+    shingles = _shingles(article)
+    if not shingles:
+        return None
+
+    hashes = np.fromiter((int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+                          % _PRIME for shingle in shingles), dtype=np.uint64, count=len(shingles))
+    # One row per permutation, one column per shingle
+    return tuple(((_A * hashes + _B) % _PRIME).min(axis=1).tolist())
+
+
+def estimate_similarity(signature_a: Tuple[int, ...], signature_b: Tuple[int, ...]) -> float:
+    """
+    Estimate the Jaccard similarity of two articles from their signatures.
+
+    Args:
+        signature_a: MinHash signature of the first article
+        signature_b: MinHash signature of the second article
+
+    Returns:
+        Fraction of matching signature values (0.0 - 1.0)
+    """
+    matches = sum(1 for a, b in zip(signature_a, signature_b) if a == b)
+    return matches / len(signature_a)
+
+
+def _representative_rank(article: Dict[str, Any]) -> Tuple:
+    # Prefer articles with more text, then the earliest published, then the lowest ID
+    return (-len(article.get("summary", "")), article.get("published", ""), str(article.get("id", "")))
+
+
+class NearDuplicateIndex:
+    """Incremental LSH index that groups near-duplicate articles into story clusters."""
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD):
+        """
+        Args:
+            threshold: Estimated Jaccard similarity above which articles are merged
+        """
+        self.threshold = threshold
+        self.articles = []
+        self.signatures = []
+        self._buckets = {}
+        # Union-find parents over article positions
+        self._parent = []
+
+    def _find(self, position: int) -> int:
+        while self._parent[position] != position:
+            self._parent[position] = self._parent[self._parent[position]]
+            position = self._parent[position]
+        return position
+
+    def _union(self, a: int, b: int):
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            self._parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    def add(self, article: Dict[str, Any]) -> Optional[int]:
+        """
+        Add an article to the index.
+
+        Args:
+            article: Article dictionary
+
+        Returns:
+            Position of the first article of the story it belongs to, or None if it
+            starts a new story
+        """
+        position = len(self.articles)
+        signature = minhash_signature(article)
+        self.articles.append(article)
+        self.signatures.append(signature)
+        self._parent.append(position)
+
+        if signature is None:
+            return None
+
+        duplicate_of = None
+        for band in range(BANDS):
+            key = (band, signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])
+            bucket = self._buckets.setdefault(key, [])
+            for other in bucket:
+                if self._find(other) == self._find(position):
+                    continue
+                if estimate_similarity(signature, self.signatures[other]) >= self.threshold:
+                    self._union(position, other)
+                    if duplicate_of is None:
+                        duplicate_of = other
+            bucket.append(position)
+
+        return None if duplicate_of is None else self._find(position)
+
+    def clusters(self) -> List[List[Dict[str, Any]]]:
+        """
+        Group the indexed articles into story clusters.
+
+        Returns:
+            List of clusters, each a list of articles with the representative first.
+            Clusters are ordered by the position of their first article.
+        """
+        groups = {}
+        for position, article in enumerate(self.articles):
+            groups.setdefault(self._find(position), []).append(article)
+
+        clusters = []
+        for root in sorted(groups):
+            members = groups[root]
+            representative = min(members, key=_representative_rank)
+            clusters.append([representative] + [a for a in members if a is not representative])
+        return clusters
+
+
+def cluster_near_duplicates(articles: List[Dict[str, Any]],
+                            threshold: float = DEFAULT_THRESHOLD) -> List[List[Dict[str, Any]]]:
+    """
+    Group near-duplicate articles into story clusters.
+
+    Args:
+        articles: List of article dictionaries
+        threshold: Estimated Jaccard similarity above which articles are merged
+
+    Returns:
+        List of clusters, each a list of articles with the representative first
+    """
+    index = NearDuplicateIndex(threshold)
+    for article in articles:
+        index.add(article)
+    return index.clusters()
+
+
+def dedupe_articles(articles: List[Dict[str, Any]],
+                    threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Keep one representative per story and record the other copies on it.
+
+    The representative gets a "related_coverage" list with the source, title and
+    URL of every duplicate it replaces.
+
+    Args:
+        articles: List of article dictionaries
+        threshold: Estimated Jaccard similarity above which articles are merged
+
+    Returns:
+        List of representative articles, in order of first appearance
+    """
+    representatives = []
+    for cluster in cluster_near_duplicates(articles, threshold):
+        representative = cluster[0]
+        if len(cluster) > 1:
+            representative["related_coverage"] = [
+                {"source": a.get("source", ""), "title": a.get("title", ""), "url": a.get("url", "")}
+                for a in cluster[1:]
+            ]
+        representatives.append(representative)
+    return representatives
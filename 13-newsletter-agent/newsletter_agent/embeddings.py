@@ -0,0 +1,326 @@
+"""
+Local text embeddings for the AI & Gaming Newsletter
+
+MinHash deduplication (dedup.py) catches copies of the same text. Different
+outlets covering the same event use different wording, so this module adds a
+cheap semantic similarity that runs on the CPU without any model download or
+network call:
+
+- A hashing vectorizer maps the words and word pairs of an article's title and
+  summary to TF-IDF weights over a fixed number of hashed features.
+- A fixed sparse random projection (every hashed feature adds a few signed
+  entries) reduces those features to a short dense vector; cosine similarity is
+  approximately preserved (Johnson-Lindenstrauss).
+- Random-hyperplane LSH tables find the approximate nearest neighbours of an
+  article without comparing it with every other one.
+
+Stories are then clustered from the neighbour pairs, so the LLM tools only see
+one representative per story.
+"""
+
+import re
+import zlib
+from collections import Counter
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple
+
+import numpy as np
+
+from .dedup import _representative_rank
+
+# Hashed feature space of the vectorizer (a power of two)
+HASH_FEATURES = 2 ** 14
+# Tokens whose hashed feature column is kept (least recently used ones are hashed again)
+COLUMN_CACHE_SIZE = 2 ** 16
+# Dimensions of the projected embeddings
+EMBEDDING_DIM = 512
+# Nonzero entries per hashed feature in the random projection
+PROJECTION_DENSITY = 8
+# Weight of title words relative to summary words
+TITLE_WEIGHT = 2.0
+
+# LSH tables and hyperplanes (bits) per table; few bits per table keep the recall
+# high at the low similarities of differently worded coverage
+LSH_TABLES = 16
+LSH_BITS = 5
+
+# Up to this many articles, clustering compares all pairs exactly instead of
+# using the LSH index, which only pays off for larger sets
+EXACT_MAX_ARTICLES = 10000
+
+# Cosine similarity above which two articles cover the same story. On the recorded
+# articles, coverage of the same event by different outlets scores 0.3 - 0.5 and
+# different announcements by the same company stay below 0.3.
+DEFAULT_SIMILARITY = 0.3
+
+# Articles vectorized per block, bounding the memory of the projection
+_BLOCK_SIZE = 2000
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Words that carry no topic; without them short texts would look alike
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+new how why what now just more into about after over says said their they you your we our can
+""".split())
+
+_random = np.random.default_rng(20240501)
+# Sparse projection: the embedding dimensions each hashed feature adds to (without
+# repeats) and the signed weights it adds; unit vectors in, roughly unit vectors out
+_PROJECTION_DIMS = np.argpartition(_random.random((HASH_FEATURES, EMBEDDING_DIM)), PROJECTION_DENSITY,
+                                   axis=1)[:, :PROJECTION_DENSITY]
+_PROJECTION_SIGNS = (_random.choice([-1.0, 1.0], (HASH_FEATURES, PROJECTION_DENSITY)) /
+                     np.sqrt(PROJECTION_DENSITY)).astype(np.float32)
+_HYPERPLANES = _random.standard_normal((LSH_TABLES, EMBEDDING_DIM, LSH_BITS)).astype(np.float32)
+_BIT_VALUES = 1 << np.arange(LSH_BITS)
+
+@lru_cache(maxsize=COLUMN_CACHE_SIZE)
+def _column(token: str) -> int:
+    return zlib.crc32(token.encode("utf-8")) & (HASH_FEATURES - 1)
+
+
+def _features(article: Dict[str, Any]) -> Counter:
+    # Hashed term frequencies of the words and word pairs, title words weighted higher
+    features = Counter()
+    for text, weight in ((article.get("title", ""), TITLE_WEIGHT), (article.get("summary", ""), 1.0)):
+        words = [word for word in _WORD_RE.findall(text.lower()) if word not in _STOPWORDS]
+        tokens = words + [a + " " + b for a, b in zip(words, words[1:])]
+        counts = Counter(map(_column, tokens))
+        if weight != 1.0:
+            counts = {column: count * weight for column, count in counts.items()}
+        features.update(counts)
+    return features
+
+
+def embed_articles(articles: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Embed articles as unit vectors.
+
+    TF-IDF weights are computed over the given articles, so embed all articles
+    that will be compared with each other in one call.
+
+    Args:
+        articles: Article dictionaries
+
+    Returns:
+        float32 array of shape (len(articles), EMBEDDING_DIM); articles without
+        text get a zero vector
+    """
+    rows, columns, values = [], [], []
+    for row, article in enumerate(articles):
+        features = _features(article)
+        rows.extend([row] * len(features))
+        columns.extend(features)
+        values.extend(features.values())
+
+    embeddings = np.zeros((len(articles), EMBEDDING_DIM), dtype=np.float32)
+    if not values:
+        return embeddings
+
+    rows = np.asarray(rows)
+    columns = np.asarray(columns)
+    # Sublinear term frequency times smoothed inverse document frequency
+    document_frequency = np.bincount(columns, minlength=HASH_FEATURES)
+    idf = np.log((1 + len(articles)) / (1 + document_frequency)) + 1
+    weights = ((1 + np.log(np.asarray(values))) * idf[columns]).astype(np.float32)
+
+    # Normalize the sparse vectors before projecting them
+    norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=len(articles)))
+    weights /= norms[rows]
+
+    # Project block by block: each feature adds its signed weight to a few
+    # dimensions of its article's embedding
+    starts = np.searchsorted(rows, np.arange(len(articles)))
+    for block_start in range(0, len(articles), _BLOCK_SIZE):
+        block_end = min(block_start + _BLOCK_SIZE, len(articles))
+        first = starts[block_start]
+        last = starts[block_end] if block_end < len(articles) else len(rows)
+        block_columns = columns[first:last]
+        targets = (rows[first:last, None] - block_start) * EMBEDDING_DIM + _PROJECTION_DIMS[block_columns]
+        values = _PROJECTION_SIGNS[block_columns] * weights[first:last, None]
+        embeddings[block_start:block_end] = np.bincount(
+            targets.ravel(), values.ravel(), minlength=(block_end - block_start) * EMBEDDING_DIM
+        ).reshape(block_end - block_start, EMBEDDING_DIM)
+
+    lengths = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return np.divide(embeddings, lengths, out=embeddings, where=lengths > 0)
+
+
+class EmbeddingIndex:
+    """Approximate nearest-neighbour index over article embeddings (random-hyperplane LSH)."""
+
+    def __init__(self, embeddings: np.ndarray):
+        """
+        Args:
+            embeddings: Unit vectors, one row per article (see embed_articles)
+        """
+        self.embeddings = embeddings
+        # Bucket code of every embedding in every table
+        self._codes = ((np.einsum("nd,tdb->tnb", embeddings, _HYPERPLANES) > 0) @ _BIT_VALUES)
+        # Articles without text have no neighbours, keep them out of the buckets
+        indexed = np.flatnonzero(np.any(embeddings != 0, axis=1))
+        self._buckets = []
+        for codes in self._codes:
+            order = indexed[np.argsort(codes[indexed], kind="stable")]
+            boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+            self._buckets.append({int(codes[group[0]]): group
+                                  for group in np.split(order, boundaries) if len(group)})
+
+    def candidates(self, row: int) -> np.ndarray:
+        """
+        Find the rows sharing an LSH bucket with a row.
+
+        Args:
+            row: Row of the embedding to look up
+
+        Returns:
+            Array of candidate rows (excluding the row itself)
+        """
+        groups = [buckets.get(int(codes[row])) for buckets, codes in zip(self._buckets, self._codes)]
+        groups = [group for group in groups if group is not None]
+        if not groups:
+            return np.empty(0, dtype=np.int64)
+        found = np.unique(np.concatenate(groups))
+        return found[found != row]
+
+    def neighbors(self, row: int, k: int = 10, min_similarity: float = 0.0) -> List[Tuple[int, float]]:
+        """
+        Find the approximate nearest neighbours of a row.
+
+        Args:
+            row: Row of the embedding to look up
+            k: Maximum number of neighbours
+            min_similarity: Minimum cosine similarity
+
+        Returns:
+            List of (row, cosine similarity), most similar first
+        """
+        candidates = self.candidates(row)
+        if not len(candidates):
+            return []
+        similarities = self.embeddings[candidates] @ self.embeddings[row]
+        keep = similarities >= min_similarity
+        candidates, similarities = candidates[keep], similarities[keep]
+        order = np.argsort(-similarities, kind="stable")[:k]
+        return [(int(candidates[i]), float(similarities[i])) for i in order]
+
+    def similar_pairs(self, min_similarity: float = DEFAULT_SIMILARITY) -> List[Tuple[int, int, float]]:
+        """
+        Find all pairs of rows in a shared bucket that are similar enough.
+
+        Args:
+            min_similarity: Minimum cosine similarity
+
+        Returns:
+            List of (row, other row, cosine similarity) with row < other row
+        """
+        pairs = {}
+        for buckets in self._buckets:
+            for group in buckets.values():
+                if len(group) < 2:
+                    continue
+                similarities = self.embeddings[group] @ self.embeddings[group].T
+                first, second = np.nonzero(np.triu(similarities >= min_similarity, k=1))
+                for a, b, similarity in zip(group[first].tolist(), group[second].tolist(),
+                                            similarities[first, second].tolist()):
+                    pairs[(a, b) if a < b else (b, a)] = similarity
+        return [(a, b, similarity) for (a, b), similarity in sorted(pairs.items())]
+
+
+def exact_similar_pairs(embeddings: np.ndarray,
+                        min_similarity: float = DEFAULT_SIMILARITY) -> List[Tuple[int, int, float]]:
+    """
+    Find all pairs of rows that are similar enough by comparing every pair.
+
+    Args:
+        embeddings: Unit vectors, one row per article (see embed_articles)
+        min_similarity: Minimum cosine similarity
+
+    Returns:
+        List of (row, other row, cosine similarity) with row < other row
+    """
+    pairs = []
+    for start in range(0, len(embeddings), _BLOCK_SIZE):
+        similarities = embeddings[start:start + _BLOCK_SIZE] @ embeddings.T
+        rows, others = np.nonzero(similarities >= min_similarity)
+        for row, other in zip(rows.tolist(), others.tolist()):
+            if start + row < other:
+                pairs.append((start + row, other, float(similarities[row, other])))
+    return pairs
+
+
+def cluster_stories(articles: List[Dict[str, Any]],
+                    min_similarity: float = DEFAULT_SIMILARITY) -> List[List[Dict[str, Any]]]:
+    """
+    Group articles covering the same story.
+
+    Args:
+        articles: List of article dictionaries
+        min_similarity: Cosine similarity above which articles are the same story
+
+    Returns:
+        List of clusters, each a list of articles with the representative first.
+        Clusters are ordered by the position of their first article.
+    """
+    if not articles:
+        return []
+
+    parent = list(range(len(articles)))
+
+    def find(position):
+        while parent[position] != position:
+            parent[position] = parent[parent[position]]
+            position = parent[position]
+        return position
+
+    embeddings = embed_articles(articles)
+    if len(articles) <= EXACT_MAX_ARTICLES:
+        pairs = exact_similar_pairs(embeddings, min_similarity)
+    else:
+        pairs = EmbeddingIndex(embeddings).similar_pairs(min_similarity)
+    for a, b, _ in pairs:
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    groups = {}
+    for position, article in enumerate(articles):
+        groups.setdefault(find(position), []).append(article)
+
+    clusters = []
+    for root in sorted(groups):
+        members = groups[root]
+        representative = min(members, key=_representative_rank)
+        clusters.append([representative] + [a for a in members if a is not representative])
+    return clusters
+
+
+def collapse_stories(articles: List[Dict[str, Any]],
+                     min_similarity: float = DEFAULT_SIMILARITY) -> List[Dict[str, Any]]:
+    """
+    Keep one representative per story and record the other articles on it.
+
+    The representative is returned as a copy whose "related_coverage" list (see
+    dedup.dedupe_articles) is extended with the source, title and URL of every
+    article it replaces; the input articles are left unchanged.
+
+    Args:
+        articles: List of article dictionaries
+        min_similarity: Cosine similarity above which articles are the same story
+
+    Returns:
+        List of representative articles, in order of first appearance
+    """
+    representatives = []
+    for cluster in cluster_stories(articles, min_similarity):
+        representative = cluster[0]
+        if len(cluster) > 1:
+            # Extend a copy, so collapsing the same articles again adds nothing twice
+            coverage = list(representative.get("related_coverage", []))
+            for article in cluster[1:]:
+                coverage.append({"source": article.get("source", ""), "title": article.get("title", ""),
+                                 "url": article.get("url", "")})
+                coverage.extend(article.get("related_coverage", []))
+            representative = dict(representative, related_coverage=coverage)
+        representatives.append(representative)
+    return representatives
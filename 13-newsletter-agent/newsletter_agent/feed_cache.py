@@ -0,0 +1,246 @@
+"""
+Conditional-GET feed cache for the AI & Gaming Newsletter
+
+This module keeps a persistent on-disk cache of feed responses. For every feed URL
+it stores the ETag and Last-Modified validators and the raw body, so the next fetch
+can send If-None-Match/If-Modified-Since and re-parse the cached body when the
+server answers 304 Not Modified. Only raw bytes and JSON go to disk, so a cache
+file can neither run code nor break when feedparser changes; recently parsed
+feeds are also kept in memory.
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import feedparser
+import requests
+
+# Directory where cached feeds are stored
+DEFAULT_CACHE_DIR = os.getenv("NEWSLETTER_FEED_CACHE_DIR", ".feed_cache")
+
+# Parsed feeds kept in memory; the least recently used ones are reloaded from disk
+MEMORY_CACHE_SIZE = 128
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+class FeedCache:
+    """On-disk cache of feed bodies and validators, with the recently parsed feeds in memory."""
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, memory_size: int = MEMORY_CACHE_SIZE):
+        """
+        Args:
+            cache_dir: Directory to store cached feeds in
+            memory_size: Parsed feeds kept in memory
+        """
+        self.cache_dir = cache_dir
+        self.memory_size = memory_size
+        self._lock = threading.Lock()
+        # Parsed feeds recently loaded in this process, keyed by URL, least recently used first
+        self._memory = OrderedDict()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, url: str, suffix: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+        return os.path.join(self.cache_dir, f"{key}.{suffix}")
+
+    def _write(self, path: str, data: bytes):
+        # Write to a temporary file first so readers never see a partial entry
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def load(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the cached metadata for a feed.
+
+        Args:
+            url: Feed URL
+
+        Returns:
+            Dictionary with etag, last_modified, fetched_at and checked_at, or None
+        """
+        try:
+            with open(self._path(url, "json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def is_fresh(self, url: str, max_age: float) -> bool:
+        """
+        Check whether the cached entry was validated less than max_age seconds ago.
+
+        Args:
+            url: Feed URL
+            max_age: Maximum age in seconds
+
+        Returns:
+            True if the cached feed can be used without contacting the server
+        """
+        meta = self.load(url)
+        return bool(meta) and max_age > 0 and time.time() - meta.get("checked_at", 0) < max_age
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Build the conditional request headers for a feed.
+
+        Args:
+            url: Feed URL
+
+        Returns:
+            Dictionary with If-None-Match and/or If-Modified-Since (empty if not cached)
+        """
+        meta = self.load(url)
+        headers = {}
+        if meta and os.path.exists(self._path(url, "body")):
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def store(self, url: str, headers: Dict[str, str], body: bytes, feed: Any = None):
+        """
+        Store a full (200) response for a feed.
+
+        Args:
+            url: Feed URL
+            headers: Response headers with lowercase names
+            body: Raw response body
+            feed: Parsed feed, if already available
+        """
+        if feed is None:
+            feed = feedparser.parse(body, response_headers=headers)
+
+        now = time.time()
+        meta = {
+            "url": url,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "content_type": headers.get("content-type"),
+            "fetched_at": now,
+            "checked_at": now
+        }
+
+        with self._lock:
+            self._write(self._path(url, "body"), body)
+            self._write(self._path(url, "json"), json.dumps(meta).encode("utf-8"))
+            self._remember(url, feed)
+
+    def touch(self, url: str):
+        """
+        Record that the server confirmed the cached feed is still current (304).
+
+        Args:
+            url: Feed URL
+        """
+        meta = self.load(url)
+        if meta:
+            meta["checked_at"] = time.time()
+            with self._lock:
+                self._write(self._path(url, "json"), json.dumps(meta).encode("utf-8"))
+
+    def load_feed(self, url: str) -> Any:
+        """
+        Load the cached feed, parsing the stored body unless it is still in memory.
+
+        Args:
+            url: Feed URL
+
+        Returns:
+            The parsed feed, or None if the feed is not cached
+        """
+        with self._lock:
+            if url in self._memory:
+                self._memory.move_to_end(url)
+                return self._memory[url]
+
+        try:
+            with open(self._path(url, "body"), "rb") as f:
+                body = f.read()
+        except OSError:
+            return None
+        meta = self.load(url) or {}
+        feed = feedparser.parse(body, response_headers={"content-type": meta.get("content_type") or ""})
+
+        with self._lock:
+            self._remember(url, feed)
+        return feed
+
+    def _remember(self, url: str, feed: Any):
+        # Called with the lock held
+        self._memory[url] = feed
+        self._memory.move_to_end(url)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_feed_cache(cache_dir: str = DEFAULT_CACHE_DIR) -> FeedCache:
+    """
+    Get the shared feed cache for a directory.
+
+    Args:
+        cache_dir: Directory to store cached feeds in
+
+    Returns:
+        The FeedCache for that directory
+    """
+    with _caches_lock:
+        if cache_dir not in _caches:
+            _caches[cache_dir] = FeedCache(cache_dir)
+        return _caches[cache_dir]
+
+
+def fetch_feed(url: str, cache: FeedCache = None, max_age: float = 0, timeout: float = 15,
+               session: requests.Session = None) -> Any:
+    """
+    Fetch and parse a single feed with a conditional GET.
+
+    Args:
+        url: Feed URL
+        cache: Feed cache to use (defaults to the shared cache)
+        max_age: Serve the cached feed without a request if it was validated this recently (seconds)
+        timeout: Request timeout in seconds
+        session: Session to send the request with (defaults to a one-off request)
+
+    Returns:
+        The parsed feed
+    """
+    cache = cache or get_feed_cache()
+    http = session or requests
+
+    if cache.is_fresh(url, max_age):
+        feed = cache.load_feed(url)
+        if feed is not None:
+            return feed
+
+    headers = {"User-Agent": USER_AGENT}
+    headers.update(cache.conditional_headers(url))
+
+    response = http.get(url, headers=headers, timeout=timeout)
+
+    if response.status_code == 304:
+        feed = cache.load_feed(url)
+        if feed is not None:
+            cache.touch(url)
+            return feed
+        # The cached copy disappeared, fetch the full body again
+        response = http.get(url, headers={"User-Agent": USER_AGENT}, timeout=timeout)
+
+    response_headers = {key.lower(): value for key, value in response.headers.items()}
+    feed = feedparser.parse(response.content, response_headers=response_headers)
+
+    if response.status_code == 200:
+        cache.store(url, response_headers, response.content, feed)
+
+    return feed
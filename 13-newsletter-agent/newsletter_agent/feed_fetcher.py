@@ -0,0 +1,223 @@
+"""
+Concurrent feed fetcher for the AI & Gaming Newsletter
+
+This module downloads RSS/Atom feeds in parallel with asyncio and aiohttp and hands
+the raw bytes to feedparser. Concurrency is bounded globally and per host so a large
+feed list does not hammer a single site, and every request has its own timeout so
+one slow host cannot hold up the whole run. When a FeedCache is supplied, requests
+are sent as conditional GETs and unchanged feeds are served from the cache. When a
+FeedHealth is supplied, every result is recorded and feeds whose circuit is open
+are skipped without a request.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, AsyncIterator
+from urllib.parse import urlparse
+
+import aiohttp
+import feedparser
+
+from .feed_cache import FeedCache
+from .feed_health import FeedHealth
+
+# Default limits for the fetch engine
+DEFAULT_MAX_CONCURRENCY = 10
+DEFAULT_PER_HOST_CONCURRENCY = 2
+DEFAULT_TIMEOUT = 15
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+def run_sync(coro):
+    """
+    Run a coroutine to completion from synchronous code.
+
+    Tools are plain functions, but the ADK runner calls them from inside its own
+    event loop, where asyncio.run() is not allowed. In that case the coroutine is
+    run on a fresh loop in a worker thread instead.
+
+    Args:
+        coro: Coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+class FeedFetcher:
+    """Download and parse many feeds concurrently."""
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 per_host_concurrency: int = DEFAULT_PER_HOST_CONCURRENCY,
+                 timeout: float = DEFAULT_TIMEOUT, cache: FeedCache = None,
+                 health: FeedHealth = None):
+        """
+        Args:
+            max_concurrency: Maximum number of requests in flight overall
+            per_host_concurrency: Maximum number of requests in flight per host
+            timeout: Per-request timeout in seconds
+            cache: Optional feed cache for conditional GETs
+            health: Optional feed health records used as a circuit breaker
+        """
+        self.max_concurrency = max_concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.timeout = timeout
+        self.cache = cache
+        self.health = health
+
+    async def iter_feeds(self, feed_urls: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Fetch feeds concurrently and yield each result as soon as it completes.
+
+        Args:
+            feed_urls: List of feed URLs to fetch
+
+        Yields:
+            Result dictionaries (see _fetch_one), in completion order
+        """
+        global_limit = asyncio.Semaphore(self.max_concurrency)
+        host_limits = {}
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.per_host_concurrency)
+
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector,
+                                         headers={"User-Agent": USER_AGENT}) as session:
+            tasks = []
+            for index, feed_url in enumerate(feed_urls):
+                if self.health and not self.health.should_fetch(feed_url):
+                    yield self._new_result(index, feed_url, skipped=True,
+                                           error="Skipped after repeated failures")
+                    continue
+                host = urlparse(feed_url).netloc
+                if host not in host_limits:
+                    host_limits[host] = asyncio.Semaphore(self.per_host_concurrency)
+                tasks.append(asyncio.ensure_future(
+                    self._fetch_one(session, index, feed_url, global_limit, host_limits[host])
+                ))
+
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    yield await next_done
+            finally:
+                # Don't leave requests running if the consumer stops early
+                for task in tasks:
+                    task.cancel()
+                if self.health:
+                    self.health.save()
+
+    async def fetch_all(self, feed_urls: List[str]) -> List[Dict[str, Any]]:
+        """
+        Fetch all feeds concurrently.
+
+        Args:
+            feed_urls: List of feed URLs to fetch
+
+        Returns:
+            List of result dictionaries in the same order as feed_urls
+        """
+        results = [None] * len(feed_urls)
+        async for result in self.iter_feeds(feed_urls):
+            results[result["index"]] = result
+        return results
+
+    def _new_result(self, index: int, feed_url: str, **values) -> Dict[str, Any]:
+        result = {
+            "index": index,
+            "url": feed_url,
+            "final_url": None,
+            "feed": None,
+            "status": None,
+            "from_cache": False,
+            "skipped": False,
+            "error": None,
+            "elapsed": 0.0
+        }
+        result.update(values)
+        return result
+
+    async def _fetch_one(self, session: aiohttp.ClientSession, index: int, feed_url: str,
+                         global_limit: asyncio.Semaphore, host_limit: asyncio.Semaphore) -> Dict[str, Any]:
+        """
+        Download a single feed and parse it.
+
+        Returns:
+            Dictionary with the feed URL, its position in the input list, the URL
+            after redirects, the parsed feed (None on failure), the HTTP status,
+            whether it came from the cache or was skipped by the circuit breaker,
+            an error message and the elapsed time
+        """
+        result = self._new_result(index, feed_url)
+        loop = asyncio.get_running_loop()
+        request_headers = self.cache.conditional_headers(feed_url) if self.cache else {}
+
+        async with host_limit, global_limit:
+            start = time.monotonic()
+            try:
+                async with session.get(feed_url, headers=request_headers) as response:
+                    result["status"] = response.status
+                    result["final_url"] = str(response.url)
+                    body = await response.read()
+                    headers = {key.lower(): value for key, value in response.headers.items()}
+
+                if result["status"] == 304 and self.cache:
+                    # Unchanged since the last run, reuse the cached parse
+                    result["feed"] = await loop.run_in_executor(None, self.cache.load_feed, feed_url)
+                    if result["feed"] is None:
+                        result["error"] = "Not modified, but no cached copy found"
+                    else:
+                        result["from_cache"] = True
+                        await loop.run_in_executor(None, self.cache.touch, feed_url)
+                elif result["status"] >= 400:
+                    result["error"] = f"HTTP {result['status']}"
+                else:
+                    # Parsing is CPU-bound, keep it off the event loop
+                    result["feed"] = await loop.run_in_executor(
+                        None, lambda: feedparser.parse(body, response_headers=headers)
+                    )
+                    if self.cache and result["status"] == 200:
+                        await loop.run_in_executor(
+                            None, self.cache.store, feed_url, headers, body, result["feed"]
+                        )
+            except asyncio.TimeoutError:
+                result["error"] = f"Timed out after {self.timeout}s"
+            except aiohttp.ClientError as e:
+                result["error"] = str(e) or e.__class__.__name__
+            except Exception as e:
+                result["error"] = f"{e.__class__.__name__}: {e}"
+            finally:
+                result["elapsed"] = time.monotonic() - start
+
+        if self.health:
+            self.health.record_result(result)
+        return result
+
+
+def fetch_feeds(feed_urls: List[str], max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                per_host_concurrency: int = DEFAULT_PER_HOST_CONCURRENCY,
+                timeout: float = DEFAULT_TIMEOUT, cache: FeedCache = None,
+                health: FeedHealth = None) -> List[Dict[str, Any]]:
+    """
+    Fetch and parse feeds concurrently from synchronous code.
+
+    Args:
+        feed_urls: List of feed URLs to fetch
+        max_concurrency: Maximum number of requests in flight overall
+        per_host_concurrency: Maximum number of requests in flight per host
+        timeout: Per-request timeout in seconds
+        cache: Optional feed cache for conditional GETs
+        health: Optional feed health records used as a circuit breaker
+
+    Returns:
+        List of result dictionaries in the same order as feed_urls
+    """
+    fetcher = FeedFetcher(max_concurrency, per_host_concurrency, timeout, cache, health)
+    return run_sync(fetcher.fetch_all(feed_urls))
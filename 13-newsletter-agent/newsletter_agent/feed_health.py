@@ -0,0 +1,225 @@
+"""
+Feed health tracking for the AI & Gaming Newsletter
+
+This module keeps a persistent health record for every feed (latency, last success,
+consecutive failures, entries per fetch) and uses it as a circuit breaker: once a
+feed fails several runs in a row it is skipped, and the time until the next attempt
+doubles with every further failure. A single successful fetch closes the circuit.
+"""
+
+import os
+import json
+import time
+import threading
+from typing import Dict, Any
+
+from google.adk.tools.tool_context import ToolContext
+
+from .feed_cache import DEFAULT_CACHE_DIR
+
+# File holding the health records
+DEFAULT_HEALTH_PATH = os.getenv("NEWSLETTER_FEED_HEALTH", os.path.join(DEFAULT_CACHE_DIR, "feed_health.json"))
+
+# Consecutive failures before a feed is skipped
+FAILURE_THRESHOLD = 3
+
+# Backoff after the circuit opens (seconds), doubled per further failure up to the maximum
+BASE_BACKOFF = 60 * 60
+MAX_BACKOFF = 7 * 24 * 60 * 60
+
+# Weight of the newest sample in the moving average latency
+LATENCY_SMOOTHING = 0.3
+
+
+def _new_record(url: str) -> Dict[str, Any]:
+    return {
+        "url": url,
+        "fetches": 0,
+        "successes": 0,
+        "failures": 0,
+        "consecutive_failures": 0,
+        "last_success": None,
+        "last_failure": None,
+        "last_error": None,
+        "last_status": None,
+        "redirected_to": None,
+        "last_latency": None,
+        "avg_latency": None,
+        "avg_entries": 0.0,
+        "retry_after": None
+    }
+
+
+class FeedHealth:
+    """Persistent per-feed health records with a circuit breaker."""
+
+    def __init__(self, path: str = DEFAULT_HEALTH_PATH):
+        """
+        Args:
+            path: JSON file to load and save the records
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self.records = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self.records = json.load(f)
+        except (OSError, ValueError):
+            self.records = {}
+
+    def save(self):
+        """Write the records to disk."""
+        with self._lock:
+            data = json.dumps(self.records, indent=2)
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+
+    def should_fetch(self, url: str, now: float = None) -> bool:
+        """
+        Check whether a feed may be fetched, i.e. its circuit is not open.
+
+        Args:
+            url: Feed URL
+            now: Current time (defaults to time.time())
+
+        Returns:
+            True if the feed is healthy or its backoff has expired
+        """
+        record = self.records.get(url)
+        if not record or not record.get("retry_after"):
+            return True
+        return (now or time.time()) >= record["retry_after"]
+
+    def record_result(self, result: Dict[str, Any]):
+        """
+        Update a feed's record from a FeedFetcher result.
+
+        A response without entries that feedparser could not parse (an HTML page
+        after a redirect, for example) counts as a failure.
+
+        Args:
+            result: Result dictionary (see feed_fetcher.FeedFetcher._fetch_one)
+        """
+        feed = result.get("feed")
+        entries = len(feed.get("entries", [])) if feed is not None else 0
+        error = result.get("error")
+        if not error and feed is not None and not entries and feed.get("bozo"):
+            error = "Response is not a valid feed"
+
+        now = time.time()
+        with self._lock:
+            record = self.records.setdefault(result["url"], _new_record(result["url"]))
+            record["fetches"] += 1
+            record["last_status"] = result.get("status")
+            final_url = result.get("final_url")
+            record["redirected_to"] = final_url if final_url and final_url != result["url"] else None
+
+            latency = result.get("elapsed")
+            if latency is not None:
+                record["last_latency"] = latency
+                if record["avg_latency"] is None:
+                    record["avg_latency"] = latency
+                else:
+                    record["avg_latency"] += LATENCY_SMOOTHING * (latency - record["avg_latency"])
+
+            if error:
+                record["failures"] += 1
+                record["consecutive_failures"] += 1
+                record["last_failure"] = now
+                record["last_error"] = error
+                excess = record["consecutive_failures"] - FAILURE_THRESHOLD
+                if excess >= 0:
+                    record["retry_after"] = now + min(MAX_BACKOFF, BASE_BACKOFF * 2 ** excess)
+            else:
+                record["successes"] += 1
+                record["consecutive_failures"] = 0
+                record["last_success"] = now
+                record["retry_after"] = None
+                record["avg_entries"] += (entries - record["avg_entries"]) / record["successes"]
+
+    def report(self, limit: int = 10) -> Dict[str, Any]:
+        """
+        Summarize the health of all tracked feeds.
+
+        Args:
+            limit: Number of feeds to list per section
+
+        Returns:
+            Dictionary with the slowest feeds, the feeds being skipped, the feeds
+            that are failing and the feeds that redirect
+        """
+        now = time.time()
+        records = list(self.records.values())
+
+        def summary(record):
+            return {
+                "url": record["url"],
+                "avg_latency": round(record["avg_latency"], 3) if record["avg_latency"] is not None else None,
+                "avg_entries": round(record["avg_entries"], 1),
+                "consecutive_failures": record["consecutive_failures"],
+                "last_error": record["last_error"],
+                "last_success": record["last_success"],
+                "redirected_to": record["redirected_to"]
+            }
+
+        slowest = sorted((r for r in records if r["avg_latency"] is not None),
+                         key=lambda r: r["avg_latency"], reverse=True)
+        skipped = [r for r in records if r.get("retry_after") and r["retry_after"] > now]
+        failing = sorted((r for r in records if r["consecutive_failures"]),
+                         key=lambda r: r["consecutive_failures"], reverse=True)
+        redirected = [r for r in records if r["redirected_to"]]
+
+        return {
+            "feeds_tracked": len(records),
+            "slowest_feeds": [summary(r) for r in slowest[:limit]],
+            "skipped_feeds": [dict(summary(r), retry_in=round(r["retry_after"] - now)) for r in skipped[:limit]],
+            "failing_feeds": [summary(r) for r in failing[:limit]],
+            "redirected_feeds": [summary(r) for r in redirected[:limit]]
+        }
+
+
+_healths = {}
+_healths_lock = threading.Lock()
+
+
+def get_feed_health(path: str = DEFAULT_HEALTH_PATH) -> FeedHealth:
+    """
+    Get the shared health records for a file.
+
+    Args:
+        path: JSON file holding the records
+
+    Returns:
+        The FeedHealth for that file
+    """
+    with _healths_lock:
+        if path not in _healths:
+            _healths[path] = FeedHealth(path)
+        return _healths[path]
+
+
+def feed_health_report(tool_context: ToolContext, limit: int = 10) -> dict:
+    """Report the slowest, failing and skipped RSS feeds.
+
+    Args:
+        tool_context: Context for accessing session state
+        limit: Number of feeds to list per section
+
+    Returns:
+        A dictionary with the feed health report
+    """
+    print("--- Tool: feed_health_report called ---")
+
+    report = get_feed_health().report(limit)
+
+    return {
+        "action": "feed_health_report",
+        "status": "success",
+        **report,
+        "message": f"Tracking {report['feeds_tracked']} feeds, {len(report['skipped_feeds'])} skipped after repeated failures."
+    }
@@ -0,0 +1,249 @@
+"""
+Bounded HTML-to-text extraction for the AI & Gaming Newsletter
+
+Feed summaries and scraped pages only need a few hundred characters of text, but
+building a full BeautifulSoup tree parses the whole document first. The helpers in
+this module stream the HTML through the standard library parser in small chunks and
+stop as soon as enough text has been collected.
+
+html_to_text produces the same text as BeautifulSoup's
+get_text(separator=' ', strip=True), or get_text() with strip=False and no
+separator, cut to max_chars.
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import List, Dict, Any, Pattern
+
+# Size of the slices fed to the parser; small enough to stop early on huge documents
+CHUNK_SIZE = 4096
+
+# Elements whose contents are never visible text
+_SKIPPED_TAGS = {"script", "style", "template"}
+
+# Elements whose whitespace BeautifulSoup keeps as it is
+_PRESERVED_TAGS = {"pre", "textarea"}
+
+_HEADING_TAGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+
+
+class _EnoughText(Exception):
+    """Raised inside the parser callbacks to stop parsing early."""
+
+
+class _TextExtractor(HTMLParser):
+    """Collect (stripped) text nodes until max_chars characters are available."""
+
+    def __init__(self, max_chars: int = None, separator: str = " ", strip: bool = True):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.separator = separator
+        self.strip = strip
+        self.parts = []
+        self.length = 0
+        self.skip_depth = 0
+        self.preserve_depth = 0
+        # Text of the current node, which the parser may deliver in pieces
+        self.pending = []
+
+    def _needed(self) -> int:
+        # Characters still missing, counting the separator before the next node
+        return self.max_chars - self.length - (len(self.separator) if self.parts else 0)
+
+    def flush(self):
+        text = "".join(self.pending)
+        if self.strip:
+            text = text.strip()
+        elif "\n" in text and not text.strip() and not self.preserve_depth:
+            # BeautifulSoup collapses whitespace-only nodes with a line break to "\n"
+            text = "\n"
+        self.pending = []
+        if not text:
+            return
+        if self.parts:
+            self.length += len(self.separator)
+        self.parts.append(text)
+        self.length += len(text)
+        if self.max_chars is not None and self.length >= self.max_chars:
+            raise _EnoughText()
+
+    def handle_starttag(self, tag, attrs):
+        self.flush()
+        if tag in _SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag in _PRESERVED_TAGS:
+            self.preserve_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        self.flush()
+
+    def handle_endtag(self, tag):
+        self.flush()
+        if tag in _SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        elif tag in _PRESERVED_TAGS and self.preserve_depth:
+            self.preserve_depth -= 1
+
+    def handle_comment(self, data):
+        self.flush()
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        self.pending.append(data)
+        # Stop inside a long text node once it already holds enough visible text
+        if self.max_chars is not None and len(self._pending_text()) >= self._needed():
+            self.flush()
+
+    def _pending_text(self) -> str:
+        text = "".join(self.pending)
+        return text.strip() if self.strip else text
+
+    def text(self) -> str:
+        text = self.separator.join(self.parts)
+        return text if self.max_chars is None else text[:self.max_chars]
+
+
+def _feed(parser: HTMLParser, html: str):
+    try:
+        for start in range(0, len(html), CHUNK_SIZE):
+            parser.feed(html[start:start + CHUNK_SIZE])
+        parser.close()
+        if isinstance(parser, _TextExtractor):
+            parser.flush()
+    except _EnoughText:
+        pass
+
+
+def html_to_text(html: str, max_chars: int = None, separator: str = " ", strip: bool = True) -> str:
+    """
+    Extract visible text from HTML, stopping once max_chars characters are found.
+
+    Args:
+        html: HTML (or plain text) to clean
+        max_chars: Maximum number of characters to return (None for all text)
+        separator: String placed between text nodes
+        strip: Strip whitespace from text nodes and drop empty ones
+
+    Returns:
+        The text nodes joined by separator, cut to max_chars
+    """
+    if not html:
+        return ""
+
+    extractor = _TextExtractor(max_chars, separator, strip)
+    _feed(extractor, html)
+    return extractor.text()
+
+
+class _LinkExtractor(HTMLParser):
+    """Collect links, their text and the container element they appear in."""
+
+    def __init__(self, container_pattern: Pattern = None, max_text: int = 300):
+        super().__init__(convert_charrefs=True)
+        self.container_pattern = container_pattern
+        self.max_text = max_text
+        self.links = []
+        self.headings = {}
+        self.containers = 0
+        # Stack of (is_container, container_id) for the open div elements
+        self.div_stack = []
+        self.skip_depth = 0
+        self.current_link = None
+        self.current_heading = None
+
+    def _container(self):
+        for is_container, container_id in reversed(self.div_stack):
+            if is_container:
+                return container_id
+        return None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag in _SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag == "div":
+            classes = (attrs.get("class") or "").split()
+            is_container = bool(self.container_pattern) and any(
+                self.container_pattern.search(name) for name in classes
+            )
+            if is_container:
+                self.containers += 1
+            self.div_stack.append((is_container, self.containers if is_container else None))
+        elif tag == "a" and attrs.get("href") is not None:
+            self.current_link = {"href": attrs["href"], "text": [], "container": self._container()}
+        elif tag in _HEADING_TAGS:
+            self.current_heading = []
+
+    def handle_endtag(self, tag):
+        if tag in _SKIPPED_TAGS and self.skip_depth:
+            self.skip_depth -= 1
+        elif tag == "div" and self.div_stack:
+            self.div_stack.pop()
+        elif tag == "a" and self.current_link is not None:
+            link = self.current_link
+            link["text"] = "".join(link["text"])[:self.max_text].strip()
+            self.links.append(link)
+            self.current_link = None
+        elif tag in _HEADING_TAGS and self.current_heading is not None:
+            container = self._container()
+            if container is not None and container not in self.headings:
+                self.headings[container] = "".join(self.current_heading)[:self.max_text].strip()
+            self.current_heading = None
+
+    def handle_data(self, data):
+        if self.skip_depth:
+            return
+        if self.current_link is not None and sum(map(len, self.current_link["text"])) < self.max_text:
+            self.current_link["text"].append(data)
+        if self.current_heading is not None:
+            self.current_heading.append(data)
+
+
+def extract_links(html: str, container_pattern: Pattern = None, max_text: int = 300) -> List[Dict[str, Any]]:
+    """
+    Extract the links of a page in a single streaming pass.
+
+    Args:
+        html: HTML of the page
+        container_pattern: Regex matched against div class names; links inside a
+            matching div are tagged with that container
+        max_text: Maximum number of characters of link text to keep
+
+    Returns:
+        List of dictionaries with href, text, container (an ID for the innermost
+        matching div, or None) and heading (the first heading text in that container)
+    """
+    extractor = _LinkExtractor(container_pattern, max_text)
+    if html:
+        _feed(extractor, html)
+
+    for link in extractor.links:
+        link["heading"] = extractor.headings.get(link["container"], "")
+    return extractor.links
+
+
+# Matches opening time/span/div tags whose class attribute mentions a date or time
+_DATE_ELEMENT_RE = re.compile(
+    r"<(?:time|span|div)\b[^>]*\sclass\s*=\s*[\"']?[^\"'>]*(?:date|time)",
+    re.IGNORECASE
+)
+
+
+def count_date_elements(html: str, limit: int = None) -> int:
+    """
+    Count time/span/div elements with a date- or time-related class.
+
+    Args:
+        html: HTML of the page
+        limit: Stop counting after this many matches
+
+    Returns:
+        Number of matching elements
+    """
+    count = 0
+    for _ in _DATE_ELEMENT_RE.finditer(html or ""):
+        count += 1
+        if limit is not None and count >= limit:
+            break
+    return count
@@ -0,0 +1,124 @@
+"""
+Pooled, rate-limited HTTP for the AI & Gaming Newsletter
+
+Source discovery talks to many different sites, often several times per site
+(homepage, feed autodiscovery, common feed paths). Instead of sleeping after every
+source, requests go through one shared keep-alive session whose connection pool is
+reused across threads, and a token bucket per host keeps each single site polite
+while different hosts are contacted in parallel.
+"""
+
+import time
+import threading
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Requests per second allowed for a single host, and how many may be sent in a burst
+DEFAULT_HOST_RATE = 1.0
+DEFAULT_HOST_BURST = 2
+
+# Timeout in seconds applied when a request does not set its own
+DEFAULT_TIMEOUT = 15
+
+# Number of hosts to keep connections for, and connections kept per host
+POOL_CONNECTIONS = 20
+POOL_MAXSIZE = 10
+
+
+class HostRateLimiter:
+    """Thread-safe token bucket per host."""
+
+    def __init__(self, rate: float = DEFAULT_HOST_RATE, burst: int = DEFAULT_HOST_BURST):
+        """
+        Args:
+            rate: Tokens added per second for each host
+            burst: Maximum number of tokens a host can accumulate
+        """
+        self.rate = rate
+        self.burst = burst
+        self._lock = threading.Lock()
+        # host -> (tokens, monotonic time of the last update)
+        self._buckets = {}
+
+    def acquire(self, url: str) -> float:
+        """
+        Take a token for the host of a URL, waiting until one is available.
+
+        Args:
+            url: URL about to be requested
+
+        Returns:
+            Seconds spent waiting
+        """
+        host = urlparse(url).netloc.lower()
+
+        with self._lock:
+            now = time.monotonic()
+            tokens, updated = self._buckets.get(host, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate) - 1
+            # Reserve the token now so concurrent callers queue up behind each other
+            self._buckets[host] = (tokens, now)
+
+        wait = -tokens / self.rate if tokens < 0 else 0.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class PoliteSession(requests.Session):
+    """requests.Session that waits for the host's rate limiter and applies a default timeout."""
+
+    def __init__(self, limiter: HostRateLimiter = None, timeout: float = DEFAULT_TIMEOUT):
+        """
+        Args:
+            limiter: Rate limiter to wait on before each request (None to disable)
+            timeout: Timeout in seconds for requests that do not set one
+        """
+        super().__init__()
+        self.limiter = limiter
+        self.timeout = timeout
+
+        adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        if self.limiter is not None:
+            self.limiter.acquire(url)
+        return super().request(method, url, *args, **kwargs)
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> PoliteSession:
+    """
+    Get the shared keep-alive session, rate limited per host.
+
+    Returns:
+        The shared PoliteSession
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = PoliteSession(HostRateLimiter())
+        return _session
+
+
+def polite_get(url: str, **kwargs) -> requests.Response:
+    """
+    GET a URL through the shared session.
+
+    Args:
+        url: URL to fetch
+        **kwargs: Passed on to requests (headers, timeout, ...)
+
+    Returns:
+        The response
+    """
+    return get_session().get(url, **kwargs)
@@ -0,0 +1,115 @@
+"""
+Streaming JSON array parser for the AI & Gaming Newsletter's LLM responses
+
+The LLM tools ask for a JSON array and used to wait for the whole response, then
+cut it out between the first "[" and the last "]" and parse it in one go, so one
+malformed element lost the whole batch. JsonArrayStream is fed the response
+chunk by chunk as it is generated and returns each element of the top-level
+array as soon as it closes. Elements that do not parse are skipped and counted,
+text around the array (prose, code fences) is ignored, and a response that ends
+before the array closes keeps the elements received so far.
+"""
+
+import json
+from typing import List, Any, Iterable, Iterator
+
+
+class JsonArrayStream:
+    """Incremental, tolerant parser of the first top-level JSON array in a text."""
+
+    def __init__(self):
+        self.started = False
+        self.complete = False
+        self.parsed = 0
+        self.skipped = 0
+        self._buffer = ""
+        self._position = 0
+        self._element_start = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Parse the next chunk of the response.
+
+        Args:
+            chunk: Text following the previous chunks
+
+        Returns:
+            Elements of the array completed by this chunk, in order
+        """
+        if self.complete or not chunk:
+            return []
+        self._buffer += chunk
+        elements = []
+        buffer = self._buffer
+        position = self._position
+
+        if not self.started:
+            start = buffer.find("[", position)
+            if start < 0:
+                # Keep nothing of the text before the array
+                self._buffer, self._position = "", 0
+                return []
+            self.started = True
+            position = self._element_start = start + 1
+
+        while position < len(buffer):
+            char = buffer[position]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "[{":
+                self._depth += 1
+            elif char in "]}" and self._depth > 0:
+                self._depth -= 1
+            elif char in ",]" and self._depth == 0:
+                # An element of the top-level array ends here
+                self._add(buffer[self._element_start:position], elements)
+                self._element_start = position + 1
+                if char == "]":
+                    self.complete = True
+                    break
+            position += 1
+
+        # Drop the text of the completed elements
+        self._buffer = buffer[self._element_start:]
+        self._position = position - self._element_start
+        self._element_start = 0
+        return elements
+
+    def _add(self, text: str, elements: List[Any]) -> None:
+        text = text.strip()
+        if not text:
+            # Trailing comma or empty array
+            return
+        try:
+            elements.append(json.loads(text))
+            self.parsed += 1
+        except ValueError:
+            self.skipped += 1
+
+
+def iter_json_array(chunks: Iterable[str], parser: JsonArrayStream = None) -> Iterator[Any]:
+    """
+    Yield the elements of the JSON array in a stream of text chunks as they close.
+
+    Args:
+        chunks: Response text, chunk by chunk
+        parser: Parser to use, to inspect its counters and completeness afterwards
+
+    Yields:
+        Each parsed element of the array
+    """
+    parser = parser or JsonArrayStream()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.complete:
+            return
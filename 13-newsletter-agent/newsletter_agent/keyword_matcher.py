@@ -0,0 +1,194 @@
+"""
+Multi-keyword matcher for the AI & Gaming Newsletter
+
+Curation, trending topics, categorization, rating, summarizing and source
+evaluation all check which of their keywords occur in an article. Looping over the
+list with `keyword in text` rescans the text once per keyword. This module compiles
+a keyword set once into a trie-shaped regular expression (the same automaton
+Aho-Corasick walks, but executed by the C regex engine) that finds every keyword
+in a single scan of the text.
+
+Matching keeps the plain substring semantics of `keyword.lower() in text.lower()`:
+"ai" matches inside "said", and a keyword listed twice counts twice.
+"""
+
+import re
+import threading
+from collections import Counter
+from typing import List, Dict, Iterable, Set
+
+# Number of compiled keyword sets to keep
+CACHE_SIZE = 64
+
+
+def _trie_pattern(keywords: Iterable[str]) -> str:
+    # Build a regex in which keywords sharing a prefix share the branch for it,
+    # so the engine never compares the same prefix twice at a position
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # A keyword ends here, the longer continuations are optional (greedy, longest first)
+        return f"(?:{pattern})?" if "" in node else pattern
+
+    return build(trie)
+
+
+class KeywordMatcher:
+    """Compiled matcher for a fixed list of keywords (case-insensitive substrings)."""
+
+    def __init__(self, keywords: Iterable[str]):
+        """
+        Args:
+            keywords: Keywords to look for; duplicates count once per listing
+        """
+        self.keywords = [keyword.lower() for keyword in keywords]
+        self.multiplicity = Counter(self.keywords)
+        # The empty keyword is contained in every text
+        self._always = {""} if "" in self.multiplicity else set()
+
+        distinct = [keyword for keyword in self.multiplicity if keyword]
+        self._pattern = re.compile(_trie_pattern(distinct)) if distinct else None
+
+        # The regex reports the longest keyword starting at each position; every
+        # shorter keyword matching at the same position is a prefix of it
+        self._prefixes = {
+            keyword: [other for other in distinct if keyword.startswith(other)]
+            for keyword in distinct
+        }
+
+    def find(self, *texts: str) -> Set[str]:
+        """
+        Find the keywords that occur in any of the texts.
+
+        Args:
+            *texts: Texts to search (matched case-insensitively)
+
+        Returns:
+            Set of the (lowercased) keywords found
+        """
+        found = set(self._always)
+        if self._pattern is None:
+            return found
+
+        for text in texts:
+            if not text:
+                continue
+            text = text.lower()
+            search = self._pattern.search
+            match = search(text)
+            while match:
+                found.update(self._prefixes[match.group()])
+                match = search(text, match.start() + 1)
+        return found
+
+    def count(self, *texts: str) -> int:
+        """
+        Count the listed keywords that occur in any of the texts.
+
+        Args:
+            *texts: Texts to search (matched case-insensitively)
+
+        Returns:
+            Number of keyword list entries found (duplicates in the list count twice)
+        """
+        return sum(self.multiplicity[keyword] for keyword in self.find(*texts))
+
+    def contains_any(self, *texts: str) -> bool:
+        """
+        Check whether any keyword occurs in any of the texts.
+
+        Args:
+            *texts: Texts to search (matched case-insensitively)
+
+        Returns:
+            True if at least one keyword was found
+        """
+        if self._always:
+            return True
+        if self._pattern is None:
+            return False
+        return any(text and self._pattern.search(text.lower()) for text in texts)
+
+
+class KeywordGroupMatcher:
+    """Matcher for several named keyword lists, scanning each text once for all of them."""
+
+    def __init__(self, groups: Dict[str, List[str]]):
+        """
+        Args:
+            groups: Mapping of group name to its keywords
+        """
+        self.groups = list(groups)
+        self.matcher = KeywordMatcher(keyword for keywords in groups.values() for keyword in keywords)
+        # keyword -> groups listing it (once per listing)
+        self._owners = {}
+        for group, keywords in groups.items():
+            for keyword in keywords:
+                self._owners.setdefault(keyword.lower(), []).append(group)
+
+    def counts(self, *texts: str) -> Dict[str, int]:
+        """
+        Count the keywords of each group that occur in any of the texts.
+
+        Args:
+            *texts: Texts to search (matched case-insensitively)
+
+        Returns:
+            Dictionary of group name to number of its keywords found (every group included)
+        """
+        counts = dict.fromkeys(self.groups, 0)
+        for keyword in self.matcher.find(*texts):
+            for group in self._owners[keyword]:
+                counts[group] += 1
+        return counts
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _cached(key, factory):
+    with _cache_lock:
+        matcher = _cache.get(key)
+        if matcher is None:
+            if len(_cache) >= CACHE_SIZE:
+                _cache.pop(next(iter(_cache)))
+            matcher = _cache[key] = factory()
+        return matcher
+
+
+def get_matcher(keywords: Iterable[str]) -> KeywordMatcher:
+    """
+    Get the compiled matcher for a keyword list, building it on first use.
+
+    Args:
+        keywords: Keywords to look for
+
+    Returns:
+        The shared KeywordMatcher for that list
+    """
+    keywords = tuple(keywords)
+    return _cached(("list", keywords), lambda: KeywordMatcher(keywords))
+
+
+def get_group_matcher(groups: Dict[str, List[str]]) -> KeywordGroupMatcher:
+    """
+    Get the compiled matcher for named keyword lists, building it on first use.
+
+    Args:
+        groups: Mapping of group name to its keywords
+
+    Returns:
+        The shared KeywordGroupMatcher for those lists
+    """
+    key = ("groups", tuple((group, tuple(keywords)) for group, keywords in groups.items()))
+    return _cached(key, lambda: KeywordGroupMatcher(groups))
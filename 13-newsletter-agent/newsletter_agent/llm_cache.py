@@ -0,0 +1,346 @@
+"""
+Persistent LLM response cache for the AI & Gaming Newsletter
+
+Curation, categorization, formatting and source analysis send the same prompts
+again whenever a run is retried or the agent calls a tool a second time. This
+module keeps the text of every successful response in SQLite, keyed on a hash of
+the model, the prompt and the generation config, so a repeated prompt is answered
+from disk instead of the API. Entries expire after a time to live, and the least
+recently used ones are evicted once the cache holds too many entries or bytes.
+
+All LLM tools call generate_text() or stream_text(), which check the cache before
+calling the model and make the call through llm_retry.call_with_retry().
+"""
+
+import os
+import json
+import time
+import hashlib
+import itertools
+import sqlite3
+import threading
+from typing import List, Dict, Any, Callable, Iterator
+
+from .article_store import DEFAULT_DB_PATH
+from .client_registry import get_generative_model
+from .llm_retry import call_with_retry, get_token_budget
+
+# Path of the SQLite database holding the responses (the article database by default)
+DEFAULT_LLM_CACHE_DB_PATH = os.getenv("NEWSLETTER_LLM_CACHE_DB", DEFAULT_DB_PATH)
+
+# Set NEWSLETTER_LLM_CACHE=0 to always call the model
+LLM_CACHE_ENABLED = os.getenv("NEWSLETTER_LLM_CACHE", "1") != "0"
+
+# Seconds a response stays valid
+LLM_CACHE_TTL = int(os.getenv("NEWSLETTER_LLM_CACHE_TTL", 7 * 24 * 3600))
+# Size caps; the least recently used responses are evicted beyond them
+LLM_CACHE_MAX_ENTRIES = 5000
+LLM_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class TruncatedResponse(ValueError):
+    """The model stopped at its output token limit, so the response is incomplete."""
+
+    def __init__(self, message: str, partial: Any = None, remaining: List[Any] = None):
+        """
+        Args:
+            message: What was cut off
+            partial: Result parsed from the part that was received, if any
+            remaining: Items the received part did not cover, to be requested again
+        """
+        super().__init__(message)
+        self.partial = partial
+        self.remaining = remaining
+
+
+def prompt_key(model: str, prompt: str, generation_config: Dict[str, Any] = None) -> str:
+    """
+    Identify a request by its content.
+
+    Args:
+        model: Model name
+        prompt: Prompt text
+        generation_config: Generation parameters (temperature, max tokens...)
+
+    Returns:
+        Hex digest identifying the request
+    """
+    content = json.dumps({"model": model, "prompt": prompt, "config": generation_config or {}},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed LRU cache of LLM responses with a time to live."""
+
+    def __init__(self, db_path: str = DEFAULT_LLM_CACHE_DB_PATH, ttl: float = LLM_CACHE_TTL,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        """
+        Args:
+            db_path: Path of the SQLite database file
+            ttl: Seconds a response stays valid
+            max_entries: Maximum number of responses kept
+            max_bytes: Maximum total size of the responses kept
+        """
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses(last_used);
+        """)
+        self._conn.commit()
+
+    def get(self, key: str) -> str:
+        """
+        Look up a response.
+
+        Args:
+            key: Request key (see prompt_key)
+
+        Returns:
+            The cached response text, or None if it is missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created FROM llm_responses WHERE key = ?",
+                                     (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_responses SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                               (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, model: str, response: str) -> None:
+        """
+        Store a response and evict expired and least recently used ones.
+
+        Args:
+            key: Request key (see prompt_key)
+            model: Model name
+            response: Response text
+        """
+        now = time.time()
+        size = len(response.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO llm_responses (key, model, response, size, created, last_used)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (key, model, response, size, now, now))
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        # Caller holds the lock
+        self._conn.execute("DELETE FROM llm_responses WHERE created < ?", (now - self.ttl,))
+        entries, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses").fetchone()
+        if entries <= self.max_entries and total <= self.max_bytes:
+            return
+
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM llm_responses ORDER BY last_used"):
+            if entries <= self.max_entries and total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            entries -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM llm_responses WHERE key = ?", evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Report the size of the cache and how well it served this process.
+
+        Returns:
+            Dictionary with "entries", "bytes", "hits", "misses" and "hit_rate"
+        """
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_responses").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": total,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def clear(self) -> None:
+        """Forget all cached responses."""
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_responses")
+            self._conn.commit()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_llm_cache(db_path: str = DEFAULT_LLM_CACHE_DB_PATH) -> LLMCache:
+    """
+    Get the shared LLM response cache for a database file.
+
+    Args:
+        db_path: Path of the SQLite database file
+
+    Returns:
+        The LLMCache for that file
+    """
+    with _caches_lock:
+        if db_path not in _caches:
+            _caches[db_path] = LLMCache(db_path)
+        return _caches[db_path]
+
+
+def _is_truncated(response: Any) -> bool:
+    finish_reason = response.candidates[0].finish_reason if response.candidates else None
+    return getattr(finish_reason, "name", finish_reason) == "MAX_TOKENS"
+
+
+def _request_options(request_options: Dict[str, Any], time_left: float) -> Dict[str, Any]:
+    # The request may not outlast the deadline of the call
+    if time_left is None:
+        return request_options
+    options = dict(request_options or {})
+    options["timeout"] = min(options.get("timeout", time_left), max(time_left, 1.0))
+    return options
+
+
+def _charge_usage(response: Any, prompt: str, text: str) -> None:
+    usage = getattr(response, "usage_metadata", None)
+    tokens = getattr(usage, "total_token_count", None)
+    if not isinstance(tokens, int) or not tokens:
+        # Roughly 4 characters per token when the API reports no usage
+        tokens = (len(prompt) + len(text)) // 4
+    get_token_budget().charge(tokens)
+
+
+def generate_text(model: str, prompt: str, generation_config: Dict[str, Any] = None,
+                  request_options: Dict[str, Any] = None, parse: Callable[[str], Any] = None,
+                  use_cache: bool = LLM_CACHE_ENABLED) -> Any:
+    """
+    Generate a response, answering repeated requests from the cache.
+
+    Only successful responses are cached. Transient API errors are retried (see
+    llm_retry); other errors propagate to the caller, and a response cut off at
+    the output token limit raises TruncatedResponse.
+
+    Args:
+        model: Model name
+        prompt: Prompt text
+        generation_config: Generation parameters, part of the cache key
+        request_options: Transport options such as {"timeout": seconds}, not part of the key
+        parse: Function applied to the response text; a response it rejects (by
+            raising) is not cached, so a retry asks the model again
+        use_cache: Look up and store the response in the cache
+
+    Returns:
+        The response text, or what parse returned for it
+    """
+    cache = key = None
+    if use_cache:
+        cache = get_llm_cache()
+        key = prompt_key(model, prompt, generation_config)
+        cached = cache.get(key)
+        if cached is not None:
+            return parse(cached) if parse else cached
+
+    def call(time_left):
+        response = get_generative_model(model, generation_config).generate_content(
+            prompt, request_options=_request_options(request_options, time_left))
+        _charge_usage(response, prompt, "")
+        return response
+
+    response = call_with_retry(call, label=f"{model} call", latency_key=(model, "generate"))
+    if _is_truncated(response):
+        raise TruncatedResponse(f"response stopped at the output token limit of {model}")
+    text = response.text
+    result = parse(text) if parse else text
+
+    if cache is not None and text:
+        cache.put(key, model, text)
+    return result
+
+
+def stream_text(model: str, prompt: str, generation_config: Dict[str, Any] = None,
+                request_options: Dict[str, Any] = None, validate: Callable[[str], bool] = None,
+                use_cache: bool = LLM_CACHE_ENABLED) -> Iterator[str]:
+    """
+    Stream a response chunk by chunk, answering repeated requests from the cache.
+
+    A cached response is yielded as a single chunk. A streamed response is cached
+    once it has been read to the end without being cut off, and only if validate
+    accepts it; a response cut off at the output token limit raises
+    TruncatedResponse after its last chunk. Transient
+    API errors are retried (see llm_retry) until the first chunk arrives; after
+    that they propagate to the caller.
+
+    Args:
+        model: Model name
+        prompt: Prompt text
+        generation_config: Generation parameters, part of the cache key
+        request_options: Transport options such as {"timeout": seconds}, not part of the key
+        validate: Called with the whole response text after the last chunk was
+            consumed; a response it returns False for is not cached, so a retry
+            asks the model again
+        use_cache: Look up and store the response in the cache
+
+    Yields:
+        The response text, chunk by chunk
+    """
+    cache = key = None
+    if use_cache:
+        cache = get_llm_cache()
+        key = prompt_key(model, prompt, generation_config)
+        cached = cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    def call(time_left):
+        response = get_generative_model(model, generation_config).generate_content(
+            prompt, request_options=_request_options(request_options, time_left), stream=True)
+        # Wait for the first chunk, so that failing to start is retried
+        iterator = iter(response)
+        return next(iterator, None), iterator
+
+    first, iterator = call_with_retry(call, label=f"{model} stream", latency_key=(model, "stream"))
+    chunks = []
+    truncated = False
+    chunk = None
+    for chunk in itertools.chain([first] if first is not None else [], iterator):
+        truncated = truncated or _is_truncated(chunk)
+        if chunk.parts:
+            chunks.append(chunk.text)
+            yield chunks[-1]
+
+    # The last chunk reports the usage of the whole response
+    _charge_usage(chunk, prompt, "".join(chunks))
+    if truncated:
+        raise TruncatedResponse(f"response stopped at the output token limit of {model}")
+    text = "".join(chunks)
+    if cache is not None and text and (validate is None or validate(text)):
+        cache.put(key, model, text)
@@ -5,20 +5,139 @@ This module provides functions for using LLMs to curate articles for the newslet
 with a focus on generative AI in gaming and general generative AI news.
 """
 
-import os
-import json
 from typing import List, Dict, Any
 from google.adk.tools.tool_context import ToolContext
-import google.generativeai as genai
 
-# Configure the Google Generative AI API if available
-api_key = os.getenv("GOOGLE_API_KEY", "")
-if api_key:
-    genai.configure(api_key=api_key)
+from .article_store import load_articles
+from .batch_planner import (DEFAULT_CONCURRENCY, INPUT_TOKEN_BUDGET, OUTPUT_TOKEN_BUDGET,
+                            estimate_tokens, plan_batches, run_batches)
+from .dedup import dedupe_articles
+from .embeddings import cluster_stories, collapse_stories
+from .json_stream import JsonArrayStream
+from .llm_cache import TruncatedResponse, stream_text
+from .llm_retry import deadline, run_budget
+from .prompt_encoder import PromptEncoder, compact_json
 
 # Default model to use
 DEFAULT_MODEL = "gemini-1.5-pro"
 
+# Expected response tokens per article: an evaluation with a justification, or a category
+CURATION_OUTPUT_TOKENS = 80
+CATEGORIZATION_OUTPUT_TOKENS = 30
+# Seconds before a single LLM call is abandoned
+BATCH_TIMEOUT = 120
+# Seconds curation or categorization may spend on LLM calls, retries included
+STAGE_DEADLINE = 600
+
+
+# Article fields sent for curation and for categorization
+CURATION_FIELDS = ("title", "source", "summary", "published", "url")
+CATEGORIZATION_FIELDS = ("title", "summary")
+
+
+def _curation_prompt(focus_areas: List[str], articles_text: str) -> str:
+    return f"""
+        You are an expert curator for an AI & Gaming newsletter. Your task is to evaluate and categorize articles from the list below.
+
+        FOCUS AREAS (in order of priority):
+        {chr(10).join([f"{i+1}. {area}" for i, area in enumerate(focus_areas)])}
+
+        ARTICLES TO EVALUATE:
+        {articles_text}
+
+        INSTRUCTIONS:
+        1. Evaluate each article's relevance to our focus areas
+        2. For each article, assign a relevance score (1-10) and provide a brief justification
+        3. Evaluate ALL articles in the batch - we want to be inclusive
+        4. Return your evaluation as a JSON array with the following format for each article:
+           {{"id": article_id, "relevance_score": score, "justification": "brief explanation", "categories": ["primary category", "secondary category"]}}
+        5. Do not include any other text in your response, only the JSON array
+
+        Be inclusive in your evaluation. We want a good mix of articles about generative AI in gaming, general generative AI news, and related topics. Even if an article is only tangentially related, include it with an appropriate relevance score.
+        """
+
+
+def _categorization_prompt(articles_text: str, standard_categories: Dict[str, str]) -> str:
+    return f"""
+    You are a newsletter editor specializing in AI and gaming technology news.
+    
+    Categorize the following articles into the most appropriate categories:
+    
+    ARTICLES:
+    {articles_text}
+    
+    CATEGORIES:
+    {compact_json(standard_categories)}
+    
+    INSTRUCTIONS:
+    1. For each article, determine the most appropriate category
+    2. Return a JSON array with the following format for each article:
+       {{"id": article_index, "category": "category_name"}}
+    3. Only use the category names provided above
+    4. Try to distribute articles evenly across all four categories when appropriate
+    5. Be flexible in your categorization to ensure all categories have articles
+    6. Do not include any other text in your response, only the JSON array
+    """
+
+
+def _result_id(result: Dict[str, Any]) -> Any:
+    # Models sometimes write ids as strings ("3") or floats (3.0)
+    article_id = result.get("id")
+    if isinstance(article_id, (str, float)) and not isinstance(article_id, bool):
+        try:
+            if float(article_id) == int(float(article_id)):
+                return int(float(article_id))
+        except (ValueError, OverflowError):
+            pass
+    return article_id
+
+
+def _ask_llm(prompt: str, output_budget: int, positions: List[int], encoder: PromptEncoder) -> List[Dict[str, Any]]:
+    """
+    Stream one batch prompt and parse the JSON array it returns element by element.
+    
+    Malformed elements are skipped instead of failing the batch.
+    
+    Args:
+        prompt: Prompt listing the articles of the batch, with ids counting from 0
+        output_budget: Maximum response tokens
+        positions: Positions of the batch's articles (the article with id n is positions[n])
+        encoder: Encoder of the prompt, to decode URL handles in the results
+        
+    Returns:
+        The parsed results
+        
+    Raises:
+        TruncatedResponse: If the response was cut off, with the results received
+            so far and the positions of the articles still missing
+        Exception: If the call fails, times out or returns no JSON array at all
+    """
+    parser = JsonArrayStream()
+    results = []
+    truncated = None
+    try:
+        # Repeated prompts are answered from the cache, which only keeps responses
+        # holding a complete JSON array
+        for chunk in stream_text(DEFAULT_MODEL, prompt, generation_config={"max_output_tokens": output_budget},
+                                 request_options={"timeout": BATCH_TIMEOUT},
+                                 validate=lambda text: parser.complete):
+            results.extend(dict(encoder.decode(element), id=_result_id(element))
+                           for element in parser.feed(chunk) if isinstance(element, dict))
+    except TruncatedResponse as e:
+        truncated = e
+    
+    if parser.skipped:
+        print(f"  Skipped {parser.skipped} malformed results")
+    if not parser.complete:
+        if not parser.started and truncated is None:
+            raise ValueError("LLM response contains no JSON array")
+        received = {result.get("id") for result in results}
+        remaining = [position for n, position in enumerate(positions) if n not in received]
+        raise TruncatedResponse(str(truncated or f"JSON array was cut off after {parser.parsed} results"),
+                                partial=results, remaining=remaining)
+    return results
+
+
 def curate_with_llm(criteria: Dict[str, Any], tool_context: ToolContext) -> dict:
     """
     Use an LLM to curate articles based on relevance to generative AI in gaming.
@@ -27,15 +146,18 @@ def curate_with_llm(criteria: Dict[str, Any], tool_context: ToolContext) -> dict
         criteria: Dictionary of criteria for filtering and ranking
             - focus_areas: List of focus areas to prioritize
             - max_articles: Maximum number of articles to include
+            - concurrency: Maximum number of LLM calls in flight (default 4)
+            - input_token_budget: Maximum tokens per prompt (default NEWSLETTER_INPUT_TOKEN_BUDGET or 30000)
+            - output_token_budget: Maximum tokens per response (default NEWSLETTER_OUTPUT_TOKEN_BUDGET or 8192)
+            - deadline: Seconds the LLM calls may take, retries included (default 600)
         tool_context: Context for accessing and updating session state
         
     Returns:
         A dictionary with curated articles
     """
     print(f"--- Tool: curate_with_llm called with criteria: {criteria} ---")
-    
     # Get articles from state
-    all_articles = tool_context.state.get("rss_articles", [])
+    all_articles = load_articles(tool_context.state, "rss_articles")
     
     if not all_articles:
         return {
@@ -44,6 +166,13 @@ def curate_with_llm(criteria: Dict[str, Any], tool_context: ToolContext) -> dict
             "message": "No articles found to curate. Please fetch articles first."
         }
     
+    # Collapse the same story from different sources before spending LLM calls on it:
+    # copies of the same text first, then differently worded coverage of the same event
+    fetched_count = len(all_articles)
+    all_articles = collapse_stories(dedupe_articles(all_articles))
+    if len(all_articles) < fetched_count:
+        print(f"  Merged {fetched_count - len(all_articles)} duplicate articles into {len(all_articles)} stories")
+    
     # Extract criteria
     default_focus_areas = [
         "Generative AI in gaming (primary focus)",
@@ -58,92 +187,43 @@ def curate_with_llm(criteria: Dict[str, Any], tool_context: ToolContext) -> dict
     focus_areas = criteria.get("focus_areas", default_focus_areas)
     max_articles = criteria.get("max_articles", 25)
     
-    # Prepare articles for LLM evaluation
-    article_data = []
-    for i, article in enumerate(all_articles):
-        # Create a simplified representation for the LLM
-        article_data.append({
-            "id": i,
-            "title": article.get("title", ""),
-            "source": article.get("source", "Unknown"),
-            "summary": article.get("summary", ""),
-            "published": article.get("published", ""),
-            "url": article.get("url", "")
-        })
-    
-    # Split articles into batches to avoid context length issues
-    batch_size = 20
-    batches = [article_data[i:i + batch_size] for i in range(0, len(article_data), batch_size)]
-    
-    # Process each batch with the LLM
+    input_budget = criteria.get("input_token_budget", INPUT_TOKEN_BUDGET)
+    output_budget = criteria.get("output_token_budget", OUTPUT_TOKEN_BUDGET)
+    
+    # Pack the articles into as few prompts as the token budgets allow, sizing
+    # them in the compact form they are sent in
+    sizing = PromptEncoder(CURATION_FIELDS)
+    batches = plan_batches(range(len(all_articles)),
+                           estimate_tokens(_curation_prompt(focus_areas, sizing.legend())),
+                           CURATION_OUTPUT_TOKENS, input_budget, output_budget,
+                           measure=lambda position: estimate_tokens(
+                               compact_json(sizing.encode_article(all_articles[position], 0))) + 1)
+    
+    def evaluate(positions):
+        # Ids (and URL handles) count from 0 in each batch, so a batch's prompt
+        # only depends on its own articles
+        encoder = PromptEncoder(CURATION_FIELDS)
+        articles_text = encoder.encode([all_articles[position] for position in positions])
+        return _ask_llm(_curation_prompt(focus_areas, articles_text), output_budget, positions, encoder)
+    
+    # Send the batches to the LLM concurrently; results come back in article order
+    concurrency = criteria.get("concurrency", DEFAULT_CONCURRENCY)
+    with deadline(criteria.get("deadline", STAGE_DEADLINE)), run_budget():
+        batch_results = run_batches(batches, evaluate, concurrency)
     selected_articles = []
-    
-    for batch_idx, batch in enumerate(batches):
-        print(f"  Processing batch {batch_idx+1}/{len(batches)} ({len(batch)} articles)...")
-        
-        # Create prompt for LLM
-        prompt = f"""
-        You are an expert curator for an AI & Gaming newsletter. Your task is to evaluate and categorize articles from the list below.
-
-        FOCUS AREAS (in order of priority):
-        {chr(10).join([f"{i+1}. {area}" for i, area in enumerate(focus_areas)])}
-
-        ARTICLES TO EVALUATE:
-        {json.dumps(batch, indent=2)}
-
-        INSTRUCTIONS:
-        1. Evaluate each article's relevance to our focus areas
-        2. For each article, assign a relevance score (1-10) and provide a brief justification
-        3. Evaluate ALL articles in the batch - we want to be inclusive
-        4. Return your evaluation as a JSON array with the following format for each article:
-           {{"id": article_id, "relevance_score": score, "justification": "brief explanation", "categories": ["primary category", "secondary category"]}}
-        5. Do not include any other text in your response, only the JSON array
-
-        Be inclusive in your evaluation. We want a good mix of articles about generative AI in gaming, general generative AI news, and related topics. Even if an article is only tangentially related, include it with an appropriate relevance score.
-        """
-        
-        try:
-            # Call the Generative AI model
-            model = genai.GenerativeModel(DEFAULT_MODEL)
-            response = model.generate_content(prompt)
-            
-            # Parse the response
-            try:
-                # Extract JSON from response
-                response_text = response.text.strip()
-                
-                # Handle potential formatting issues
-                if response_text.startswith("```json"):
-                    response_text = response_text.split("```json")[1]
-                if response_text.endswith("```"):
-                    response_text = response_text.split("```")[0]
+    for positions, results in batch_results:
+        # Add selected articles from this batch - be more inclusive with a lower threshold
+        for result in results or []:
+            article_id = result.get("id")
+            if isinstance(article_id, int) and 0 <= article_id < len(positions):
+                # Get the original article and add curation metadata
+                article = all_articles[positions[article_id]]
+                article["relevance_score"] = result.get("relevance_score", 0)
+                article["curation_justification"] = result.get("justification", "")
+                article["categories"] = result.get("categories", [])
                 
-                # Clean up any remaining non-JSON text
-                if not response_text.startswith("["):
-                    response_text = response_text[response_text.find("["):]
-                if not response_text.endswith("]"):
-                    response_text = response_text[:response_text.rfind("]")+1]
-                
-                # Parse the JSON
-                batch_results = json.loads(response_text)
-                
-                # Add selected articles from this batch - be more inclusive with a lower threshold
-                for result in batch_results:
-                    article_id = result.get("id")
-                    if article_id is not None and 0 <= article_id < len(batch):
-                        # Get the original article and add curation metadata
-                        article = all_articles[batch_idx * batch_size + article_id]
-                        article["relevance_score"] = result.get("relevance_score", 0)
-                        article["curation_justification"] = result.get("justification", "")
-                        article["categories"] = result.get("categories", [])
-                        
-                        # Be more inclusive - accept articles with any relevance score
-                        selected_articles.append(article)
-            except Exception as e:
-                print(f"  Error parsing LLM response: {str(e)}")
-                print(f"  Response text: {response.text}")
-        except Exception as e:
-            print(f"  Error calling LLM API: {str(e)}")
+                # Be more inclusive - accept articles with any relevance score
+                selected_articles.append(article)
     
     # Sort by relevance score (descending)
     selected_articles.sort(key=lambda x: x.get("relevance_score", 0), reverse=True)
@@ -166,7 +246,7 @@ def curate_with_llm(criteria: Dict[str, Any], tool_context: ToolContext) -> dict
             category_counts[category] = category_counts.get(category, 0) + 1
     
     return {
-        "message": f"Curated {len(selected_articles)} articles from {len(all_articles)} using LLM",
+        "message": f"Curated {len(selected_articles)} articles from {len(all_articles)} stories ({fetched_count} fetched) using LLM",
         "source_counts": source_counts,
         "category_counts": category_counts,
         "curated_articles": selected_articles
@@ -185,7 +265,7 @@ def categorize_with_llm(tool_context: ToolContext) -> dict:
     print(f"--- Tool: categorize_with_llm called ---")
     
     # Get articles from state
-    articles = tool_context.state.get("articles", [])
+    articles = load_articles(tool_context.state, "articles")
     
     if not articles:
         return {
@@ -205,90 +285,52 @@ def categorize_with_llm(tool_context: ToolContext) -> dict:
     # Prepare the categorized articles structure
     categorized_articles = {category: [] for category in standard_categories.keys()}
     
-    # Create a batch of all articles for the LLM
-    article_data = []
-    for i, article in enumerate(articles):
-        article_data.append({
-            "id": i,
-            "title": article.get("title", ""),
-            "summary": article.get("summary", "")
-        })
-    
-    # Create the prompt for the LLM
-    prompt = f"""
-    You are a newsletter editor specializing in AI and gaming technology news.
-    
-    Categorize the following articles into the most appropriate categories:
-    
-    ARTICLES:
-    {json.dumps(article_data, indent=2)}
-    
-    CATEGORIES:
-    {json.dumps(standard_categories, indent=2)}
-    
-    INSTRUCTIONS:
-    1. For each article, determine the most appropriate category
-    2. Return a JSON array with the following format for each article:
-       {{"id": article_index, "category": "category_name"}}
-    3. Only use the category names provided above
-    4. Try to distribute articles evenly across all four categories when appropriate
-    5. Be flexible in your categorization to ensure all categories have articles
-    6. Do not include any other text in your response, only the JSON array
-    """
-    
-    try:
-        # Call the Generative AI model
-        model = genai.GenerativeModel(DEFAULT_MODEL)
-        response = model.generate_content(prompt)
+    # Only ask about one article per story; the others get the same category
+    position_of = {id(article): i for i, article in enumerate(articles)}
+    story_members = {}
+    for cluster in cluster_stories(articles):
+        positions = [position_of[id(member)] for member in cluster]
+        story_members[positions[0]] = positions
+    
+    # Pack the story representatives into as few prompts as the token budgets allow
+    representatives = list(story_members)
+    
+    sizing = PromptEncoder(CATEGORIZATION_FIELDS)
+    batches = plan_batches(representatives,
+                           estimate_tokens(_categorization_prompt(sizing.legend(), standard_categories)),
+                           CATEGORIZATION_OUTPUT_TOKENS,
+                           measure=lambda position: estimate_tokens(
+                               compact_json(sizing.encode_article(articles[position], 0))) + 1)
+    
+    def evaluate(positions):
+        # Ids count from 0 in each batch
+        encoder = PromptEncoder(CATEGORIZATION_FIELDS)
+        articles_text = encoder.encode([articles[position] for position in positions])
+        return _ask_llm(_categorization_prompt(articles_text, standard_categories), OUTPUT_TOKEN_BUDGET,
+                        positions, encoder)
+    
+    with deadline(STAGE_DEADLINE), run_budget():
+        batch_results = run_batches(batches, evaluate)
+    for positions, categorization_results in batch_results:
+        if categorization_results is None:
+            # Fallback: distribute the articles of this batch evenly across the four categories
+            category_keys = list(standard_categories.keys())
+            for position in sorted(member for representative in positions
+                                   for member in story_members[representative]):
+                fallback_category = category_keys[position % len(category_keys)]
+                categorized_articles[fallback_category].append(articles[position])
+            continue
         
-        # Parse the response
-        try:
-            # Extract JSON from response
-            response_text = response.text.strip()
-            
-            # Handle potential formatting issues
-            if response_text.startswith("```json"):
-                response_text = response_text.split("```json")[1]
-            if response_text.endswith("```"):
-                response_text = response_text.split("```")[0]
+        # Categorize articles
+        for result in categorization_results:
+            article_id = result.get("id")
+            category = result.get("category")
             
-            # Clean up any remaining non-JSON text
-            if not response_text.startswith("["):
-                response_text = response_text[response_text.find("["):]
-            if not response_text.endswith("]"):
-                response_text = response_text[:response_text.rfind("]")+1]
-            
-            # Parse the JSON
-            categorization_results = json.loads(response_text)
-            
-            # Categorize articles
-            for result in categorization_results:
-                article_id = result.get("id")
-                category = result.get("category")
-                
-                if article_id is not None and 0 <= article_id < len(articles) and category in standard_categories:
-                    categorized_articles[category].append(articles[article_id])
+            if isinstance(article_id, int) and 0 <= article_id < len(positions) and category in standard_categories:
+                for position in story_members[positions[article_id]]:
+                    categorized_articles[category].append(articles[position])
                     # Also add the category to the article
-                    articles[article_id]["category"] = category
-        except Exception as e:
-            print(f"  Error parsing LLM response: {str(e)}")
-            print(f"  Response text: {response.text}")
-            
-            # Fallback: distribute articles across categories
-            for i, article in enumerate(articles):
-                # Distribute evenly across the four categories
-                category_keys = list(standard_categories.keys())
-                fallback_category = category_keys[i % len(category_keys)]
-                categorized_articles[fallback_category].append(article)
-    except Exception as e:
-        print(f"  Error calling LLM API: {str(e)}")
-        
-        # Fallback: distribute articles across categories
-        for i, article in enumerate(articles):
-            # Distribute evenly across the four categories
-            category_keys = list(standard_categories.keys())
-            fallback_category = category_keys[i % len(category_keys)]
-            categorized_articles[fallback_category].append(article)
+                    articles[position]["category"] = category
     
     # Update state with categorized articles
     tool_context.state["categories"] = categorized_articles
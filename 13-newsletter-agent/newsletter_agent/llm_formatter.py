@@ -1,15 +1,52 @@
-import os
+import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import List, Dict, Any
 from google.adk.tools.tool_context import ToolContext
-import google.generativeai as genai
 from datetime import datetime
 
-# Configure the Google Generative AI API
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY", ""))
+from .llm_cache import generate_text
+from .llm_retry import deadline as llm_deadline, run_budget
+from .prompt_encoder import PromptEncoder
 
 # Default model to use
 DEFAULT_MODEL = "gemini-1.5-pro"
 
+# Section calls in flight at once
+SECTION_CONCURRENCY = 4
+# Seconds to wait for the sections before falling back to article headlines
+SECTION_TIMEOUT = 60
+
+# Newsletter sections in template order: what belongs in them and placeholder bullets
+NEWSLETTER_SECTIONS = {
+    "🎮 Gaming & AI": (
+        "AI in games, dev tools, content, engines",
+        ["[Company] emphasizes \"human touch\" amid rising AI usage",
+         "[Studio] launches AI-generated game demo using internal model",
+         "[Dev tool] integrates agent-based NPC design"]),
+    "🧠 Major AI Models & Features": (
+        "Major model releases, feature upgrades, dev APIs",
+        ["[Model name] outperforms competitors with fewer parameters",
+         "[Startup] releases open-source model for code generation",
+         "[API] now supports multi-turn prompt evaluation"]),
+    "🔬 Breakthrough Tech & Regulation": (
+        "News on hardware, robotics, policy, and ethics",
+        ["[Robotaxi] pilot begins in [location]",
+         "[Court ruling] impacts model training transparency",
+         "[Watchdog] raises transparency concerns over model benchmarks"]),
+    "💰 Business & Funding News": (
+        "Funding rounds, M&A, product launches, and market moves",
+        ["[Startup] raises $XM for AI-native dev tooling",
+         "[Big Tech] explores acquisition of AI hardware startup",
+         "[VC firm] backs agentic framework for enterprise apps"]),
+}
+# Section for articles that fit none of the template sections
+OTHER_SECTION = "📌 Other Interesting News"
+
+NEWSLETTER_FOOTER = """*→ Thread and long-form summary coming later this week.
+→ Subscribe to get weekly dev-focused signals.*
+"""
+
 def format_with_llm(articles: List[Dict], category: str, tool_context: ToolContext) -> dict:
     """Use Google's Generative AI to format articles into concise, engaging bullet points.
     
@@ -30,16 +67,9 @@ def format_with_llm(articles: List[Dict], category: str, tool_context: ToolConte
             "message": f"No articles found for category: {category}"
         }
     
-    # Prepare the articles data for the LLM
-    articles_data = []
-    for article in articles:
-        articles_data.append({
-            "title": article.get("title", ""),
-            "summary": article.get("summary", ""),
-            "source": article.get("source", ""),
-            "url": article.get("url", ""),
-            "published": article.get("published", "")
-        })
+    # Prepare the articles data for the LLM in compact form (URLs become handles)
+    encoder = PromptEncoder(("title", "summary", "source", "url", "published"))
+    articles_data = encoder.encode(articles, ids=False)
     
     # Create the prompt for the LLM
     prompt = f"""
@@ -63,11 +93,10 @@ def format_with_llm(articles: List[Dict], category: str, tool_context: ToolConte
     
     try:
         # Call the Generative AI model
-        model = genai.GenerativeModel(DEFAULT_MODEL)
-        response = model.generate_content(prompt)
+        response_text = generate_text(DEFAULT_MODEL, prompt)
         
-        # Extract the formatted bullet points
-        formatted_content = response.text.strip()
+        # Extract the formatted bullet points, restoring any URL the model referred to
+        formatted_content = encoder.decode(response_text.strip())
         
         # Store in state for the category
         if "formatted_categories" not in tool_context.state:
@@ -92,9 +121,147 @@ def format_with_llm(articles: List[Dict], category: str, tool_context: ToolConte
         }
 
 
+def _section_articles(categorized_articles: Any) -> Dict[str, List[Dict]]:
+    """
+    Group categorized articles by newsletter section.
+    
+    Args:
+        categorized_articles: Either the flattened list stored by categorize_with_llm
+            (the section is the article's "category" or one of its "categories") or
+            the {id: {"title", "articles"}} mapping stored by categorize_articles
+        
+    Returns:
+        Dictionary of section title to its articles, the template sections first
+        and OTHER_SECTION last if any article fits none of them
+    """
+    sections = {title: [] for title in NEWSLETTER_SECTIONS}
+    
+    if isinstance(categorized_articles, dict):
+        for category in categorized_articles.values():
+            title = category.get("title", "")
+            sections.setdefault(title if title in NEWSLETTER_SECTIONS else OTHER_SECTION, []).extend(
+                category.get("articles", []))
+        return sections
+    
+    for article in categorized_articles:
+        candidates = [article.get("category")] + list(article.get("categories", []))
+        title = next((candidate for candidate in candidates if candidate in NEWSLETTER_SECTIONS), OTHER_SECTION)
+        sections.setdefault(title, []).append(article)
+    return sections
+
+
+def _fallback_bullets(articles: List[Dict]) -> str:
+    """Bullets made from the article headlines, as format_bullet_points writes them."""
+    if not articles:
+        return "- No major updates this week"
+    lines = []
+    for article in articles:
+        headline = article.get("headline", article.get("title", "Untitled"))
+        source = article.get("source", "")
+        lines.append(f"- **{headline}** - *{source}*" if source else f"- **{headline}**")
+    return "\n".join(lines)
+
+
+def _render_section(title: str, articles: List[Dict], trending_topics: List[Any]) -> str:
+    """
+    Write the bullets of one newsletter section with the LLM.
+    
+    Args:
+        title: Section title
+        articles: Articles of the section
+        trending_topics: Trending topics, as context for the writer
+        
+    Returns:
+        The section's bullet points in Markdown
+        
+    Raises:
+        Exception: If the call fails or times out
+    """
+    if not articles:
+        return "- No major updates this week"
+    
+    guidance, examples = NEWSLETTER_SECTIONS.get(title, ("Other notable AI and gaming news", []))
+    encoder = PromptEncoder(("title", "source", "summary"))
+    example_text = "\n    ".join(f"- {example}" for example in examples)
+    prompt = f"""
+    You are an expert newsletter writer specializing in AI and gaming. Write the "{title}" section of a professional weekly roundup newsletter.
+    
+    SECTION FOCUS: {guidance}
+    
+    ARTICLES:
+    {encoder.encode(articles, ids=False)}
+    
+    TRENDING TOPICS:
+    {trending_topics}
+    
+    EXAMPLE BULLETS (placeholders, do not copy):
+    {example_text}
+    
+    INSTRUCTIONS:
+    1. Write one bullet point per article, based on ACTUAL content from the provided articles.
+    2. Each bullet point should be 6-12 words maximum for quick scanning.
+    3. Include ALL articles from the provided data - do not omit any articles.
+    4. Focus on generative AI in gaming and its impact on game development.
+    5. Return ONLY the bullet points, one per line, each starting with "- ". No heading, no other text.
+    """
+    
+    return encoder.decode(generate_text(DEFAULT_MODEL, prompt, request_options={"timeout": SECTION_TIMEOUT}).strip())
+
+
+def render_sections(sections: Dict[str, List[Dict]], trending_topics: List[Any] = None,
+                    concurrency: int = SECTION_CONCURRENCY, timeout: float = SECTION_TIMEOUT) -> Dict[str, Any]:
+    """
+    Write all newsletter sections concurrently.
+    
+    A section whose call fails or does not finish in time falls back to bullets
+    made from its article headlines, so the newsletter is always complete.
+    
+    Args:
+        sections: Dictionary of section title to its articles
+        trending_topics: Trending topics, as context for the writer
+        concurrency: Maximum number of calls in flight
+        timeout: Seconds to wait for all sections
+        
+    Returns:
+        Dictionary with "sections" ({title: bullets}, in the order of sections)
+        and "fallbacks" (titles of the sections that fell back)
+    """
+    rendered = {}
+    fallbacks = []
+    deadline = time.monotonic() + timeout
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(sections))))
+    try:
+        # The sections' calls stop retrying when the sections would time out anyway,
+        # or once they used up their token budget together
+        with llm_deadline(timeout), run_budget():
+            futures = {title: executor.submit(contextvars.copy_context().run, _render_section,
+                                              title, articles, trending_topics or [])
+                       for title, articles in sections.items()}
+        for title, future in futures.items():
+            try:
+                rendered[title] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                print(f"  Section {title} timed out, using article headlines")
+                rendered[title] = _fallback_bullets(sections[title])
+                fallbacks.append(title)
+            except Exception as e:
+                print(f"  Section {title} failed ({str(e)}), using article headlines")
+                rendered[title] = _fallback_bullets(sections[title])
+                fallbacks.append(title)
+    finally:
+        # Do not wait for calls that timed out
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return {"sections": rendered, "fallbacks": fallbacks}
+
+
 def generate_newsletter_with_llm(tool_context: ToolContext) -> dict:
     """Generate a complete newsletter using LLM for all formatting.
     
+    Each section is written by its own LLM call, all of them concurrently, and
+    the newsletter is assembled from the template in a fixed section order.
+    
     Args:
         tool_context: Context for accessing state
         
@@ -116,109 +283,38 @@ def generate_newsletter_with_llm(tool_context: ToolContext) -> dict:
     # Get trending topics
     trending_topics = tool_context.state.get("trending_topics", [])
     
-    # Group articles by category
-    articles_by_category = {}
-    for article in categorized_articles:
-        categories = article.get("categories", [])
-        if categories:
-            category = categories[0]  # Use the first category
-            if category not in articles_by_category:
-                articles_by_category[category] = []
-            articles_by_category[category].append(article)
-    
-    # Create the prompt for the LLM using the bullet-point format
-    prompt = f"""
-    You are an expert newsletter writer specializing in AI and gaming. Create a professional weekly roundup newsletter using the following categorized articles and trending topics.
-    
-    CATEGORIES AND ARTICLES:
-    {articles_by_category}
+    # Group articles by section and write the sections concurrently
+    sections = _section_articles(categorized_articles)
+    result = render_sections(sections, trending_topics)
     
-    TRENDING TOPICS:
-    {trending_topics}
+    # Assemble the newsletter in the template's section order
+    newsletter = "# This Week in Generative AI 🤖 and Gaming 🎮👇\n\n---\n\n"
+    for title, bullets in result["sections"].items():
+        if title == OTHER_SECTION and not sections[title]:
+            continue
+        newsletter += f"## {title}\n{bullets}\n\n---\n\n"
+    newsletter += NEWSLETTER_FOOTER
     
-    INSTRUCTIONS:
-    Format the newsletter using EXACTLY this template structure:
-    
-    # This Week in Generative AI 🤖 and Gaming 🎮👇
-    *→ Each headline should be 6–12 words max for quick scanning.*
-    
-    ---
-    
-    ## 🎮 Gaming & AI
-    <!-- Add headlines about AI in games, dev tools, content, engines -->
-    - [Company] emphasizes "human touch" amid rising AI usage
-    - [Studio] launches AI-generated game demo using internal model
-    - [Platform] adds procedural content generation support
-    - [Dev tool] integrates agent-based NPC design
-    - [Publisher] explores LLM-based dialogue systems in new title
-    
-    ---
-    
-    ## 🧠 Major AI Models & Features
-    <!-- Include major model releases, feature upgrades, dev APIs -->
-    - [Model name] outperforms competitors with fewer parameters
-    - [Startup] releases open-source model for code generation
-    - [API] now supports multi-turn prompt evaluation
-    - [Voice AI] launches server-based low-latency integration
-    - [Image tool] improves prompt handling for visuals
-    
-    ---
-    
-    ## 🔬 Breakthrough Tech & Regulation
-    <!-- Add news on hardware, robotics, policy, and ethics -->
-    - [Robotaxi] pilot begins in [location]
-    - [AI device] combines robotics with hydrogen engine tech
-    - [Court ruling] impacts model training transparency
-    - [Company] pauses hiring for roles replaced by AI
-    - [Watchdog] raises transparency concerns over model benchmarks
-    
-    ---
-    
-    ## 💰 Business & Funding News
-    <!-- Add funding rounds, M&A, product launches, and market moves -->
-    - [Startup] raises $XM for AI-native dev tooling
-    - [Big Tech] explores acquisition of AI hardware startup
-    - [New company] emerges from stealth with agent-focused platform
-    - [Platform] adds Pro+ pricing tier with new features
-    - [VC firm] backs agentic framework for enterprise apps
-    
-    ---
-    
-    *→ Thread and long-form summary coming later this week.
-    → Subscribe to get weekly dev-focused signals.*
-    
-    IMPORTANT INSTRUCTIONS:
-    1. Replace the placeholder text with ACTUAL content from the provided articles.
-    2. Each bullet point should be 6-12 words maximum for quick scanning.
-    3. Include ALL articles from the provided data - do not omit any articles.
-    4. Categorize each article into the most appropriate section.
-    5. If there are no relevant articles for a section, include 1-2 bullets with "No major updates this week" or similar.
-    6. Keep the emoji headers and section dividers exactly as shown.
-    7. Focus on generative AI in gaming and its impact on game development.
-    8. DO NOT include the HTML comments in the final output.
-    9. Maintain the footer text about thread and subscribe.
-    """
+    # Store the newsletter and its sections in the context
+    tool_context.state["llm_newsletter"] = newsletter
+    tool_context.state["formatted_categories"] = result["sections"]
     
-    try:
-        # Generate the newsletter using the LLM
-        model = genai.GenerativeModel(DEFAULT_MODEL)
-        response = model.generate_content(prompt)
-        
-        # Get the generated newsletter
-        newsletter = response.text
-        
-        # Store the newsletter in the context
-        tool_context.state["llm_newsletter"] = newsletter
-        
-        return {
-            "action": "generate_newsletter_with_llm",
-            "status": "success",
-            "message": "Generated newsletter with LLM",
-            "newsletter": newsletter
-        }
-    except Exception as e:
+    fallbacks = result["fallbacks"]
+    if len(fallbacks) == len(sections):
         return {
             "action": "generate_newsletter_with_llm",
             "status": "error",
-            "message": f"Error generating newsletter with LLM: {str(e)}"
+            "message": "Error generating newsletter with LLM: every section fell back to article headlines",
+            "newsletter": newsletter
         }
+    
+    message = "Generated newsletter with LLM"
+    if fallbacks:
+        message += f" ({len(fallbacks)} of {len(sections)} sections use article headlines: {', '.join(fallbacks)})"
+    return {
+        "action": "generate_newsletter_with_llm",
+        "status": "success",
+        "message": message,
+        "newsletter": newsletter,
+        "fallback_sections": fallbacks
+    }
@@ -0,0 +1,312 @@
+"""
+Retries, deadlines, hedging and a token budget for the AI & Gaming Newsletter's LLM calls
+
+A 429 or 503 from the model used to reach the tools directly, which printed it
+and fell back (to round-robin categories, to headline bullets, to neutral source
+scores), so the newsletter got worse exactly when the API was busiest.
+generate_text() and stream_text() now make every call through call_with_retry(),
+which:
+
+- retries transient errors (rate limits, unavailable or overloaded servers,
+  timeouts) with exponential backoff and full jitter, so concurrent batches do
+  not retry in lockstep;
+- gives up once the deadline of the surrounding deadline() block has passed, and
+  passes the time left to the API as the request timeout;
+- optionally sends a second, hedged request when the first one is slower than
+  the 95th percentile of recent calls, and uses whichever answers first;
+- stops retrying and hedging once the token budget of the surrounding
+  run_budget() block is spent. Like deadlines, budgets live in the context, so
+  each LLM stage (curation, categorization, writing) counts its own tokens and
+  concurrent runs do not share theirs.
+
+Errors that are not transient (bad requests, unparseable or truncated responses)
+are raised at once, as before.
+"""
+
+import os
+import time
+import random
+import threading
+import contextvars
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Hashable, Iterator, Optional
+
+# Attempts per LLM call, the first one included
+LLM_ATTEMPTS = int(os.getenv("NEWSLETTER_LLM_ATTEMPTS", 4))
+# Seconds of backoff before the first retry (doubled on every retry, then jittered)
+BACKOFF_BASE = 1.0
+# Longest backoff between two attempts
+BACKOFF_MAX = 30.0
+
+# HTTP statuses worth retrying
+TRANSIENT_STATUS = {408, 429, 500, 502, 503, 504}
+
+# Set NEWSLETTER_LLM_HEDGE=1 to send a second request when the first one is slow
+HEDGE_ENABLED = os.getenv("NEWSLETTER_LLM_HEDGE", "0") == "1"
+# Latency percentile after which a call is hedged
+HEDGE_QUANTILE = 0.95
+# Calls to measure before hedging, and how many recent calls are kept
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+# Threads running hedged calls
+HEDGE_WORKERS = 16
+
+# Tokens (prompt plus response) the LLM calls of a run_budget() block (one LLM
+# stage) may use before retries and hedged requests stop; 0 means no limit
+RUN_TOKEN_BUDGET = int(os.getenv("NEWSLETTER_LLM_TOKEN_BUDGET", 0))
+
+
+class LLMCallError(RuntimeError):
+    """An LLM call failed for good: its attempts, deadline or token budget ran out."""
+
+
+def is_transient(error: Exception) -> bool:
+    """
+    Tell whether a failed call is worth retrying.
+
+    Args:
+        error: Exception raised by the call
+
+    Returns:
+        True for rate limits, server errors, timeouts and connection errors
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    # google.api_core exceptions carry the HTTP status as code, openai's as status_code
+    for attribute in ("code", "status_code"):
+        status = getattr(error, attribute, None)
+        if isinstance(status, int) and status in TRANSIENT_STATUS:
+            return True
+    return type(error).__name__ in ("APIConnectionError", "APITimeoutError", "ConnectTimeout", "ReadTimeout")
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, cap: float = BACKOFF_MAX) -> float:
+    """
+    Seconds to wait after a failed attempt.
+
+    Args:
+        attempt: Number of the attempt that failed, from 1
+        base: Backoff after the first attempt, before jitter
+        cap: Longest backoff, before jitter
+
+    Returns:
+        A random delay between 0 and the exponential backoff ("full jitter")
+    """
+    return random.uniform(0, min(cap, base * 2 ** (attempt - 1)))
+
+
+_deadline = contextvars.ContextVar("llm_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """
+    Limit the time the LLM calls made inside the block may take, retries included.
+
+    Deadlines nest (the earliest one applies) and follow work handed to threads
+    through contextvars.copy_context().
+
+    Args:
+        seconds: Seconds from now, or None for no limit
+    """
+    if seconds is None:
+        yield
+        return
+    end = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(end if current is None else min(current, end))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left() -> Optional[float]:
+    """
+    Seconds until the current deadline.
+
+    Returns:
+        Seconds left (0 or less once it passed), or None without a deadline
+    """
+    end = _deadline.get()
+    return None if end is None else end - time.monotonic()
+
+
+class TokenBudget:
+    """Thread-safe count of the tokens used by the LLM calls of a run."""
+
+    def __init__(self, limit: int = RUN_TOKEN_BUDGET):
+        """
+        Args:
+            limit: Tokens the run may use, 0 for no limit
+        """
+        self._lock = threading.Lock()
+        self.limit = limit
+        self.used = 0
+
+    def charge(self, tokens: int) -> None:
+        """
+        Count the tokens of a call.
+
+        Args:
+            tokens: Prompt plus response tokens
+        """
+        with self._lock:
+            self.used += tokens
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether the run used up its budget."""
+        return bool(self.limit) and self.used >= self.limit
+
+
+_budget = contextvars.ContextVar("llm_token_budget", default=None)
+
+
+@contextmanager
+def run_budget(token_limit: int = RUN_TOKEN_BUDGET) -> Iterator[TokenBudget]:
+    """
+    Give the LLM calls made inside the block a fresh token budget.
+
+    The budget follows work handed to threads through contextvars.copy_context().
+    A block inside another one shares the outer budget.
+
+    Args:
+        token_limit: Tokens the run may use, 0 for no limit
+
+    Yields:
+        The budget of the block
+    """
+    current = _budget.get()
+    if current is not None:
+        yield current
+        return
+    budget = TokenBudget(token_limit)
+    token = _budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _budget.reset(token)
+
+
+def get_token_budget() -> TokenBudget:
+    """
+    Get the token budget of the current run.
+
+    Returns:
+        The TokenBudget of the surrounding run_budget() block, or an unlimited
+        one outside of any
+    """
+    return _budget.get() or TokenBudget(0)
+
+
+class LatencyTracker:
+    """Recent latencies of successful calls, per kind of call."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=window))
+
+    def record(self, key: Hashable, seconds: float) -> None:
+        with self._lock:
+            self._samples[key].append(seconds)
+
+    def quantile(self, key: Hashable, q: float, min_samples: int = HEDGE_MIN_SAMPLES) -> Optional[float]:
+        """
+        Latency below which a share of recent calls finished.
+
+        Args:
+            key: Kind of call
+            q: Share of calls, e.g. 0.95
+            min_samples: Calls needed for a meaningful answer
+
+        Returns:
+            Seconds, or None with too few samples
+        """
+        with self._lock:
+            samples = sorted(self._samples[key])
+        if len(samples) < min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+_latencies = LatencyTracker()
+_hedge_executor = ThreadPoolExecutor(max_workers=HEDGE_WORKERS, thread_name_prefix="llm-hedge")
+
+
+def _call_hedged(call: Callable[[Optional[float]], Any], timeout: Optional[float], threshold: float,
+                 label: str) -> Any:
+    # Each request runs in its own copy of the context, so both see the deadline
+    futures = [_hedge_executor.submit(contextvars.copy_context().run, call, timeout)]
+    done, _ = wait(futures, timeout=threshold)
+    if not done and not get_token_budget().exhausted:
+        print(f"  {label} is slower than {threshold:.1f}s, sending a hedged request...")
+        futures.append(_hedge_executor.submit(contextvars.copy_context().run, call, time_left()))
+
+    # Use the first answer; fail only when every request failed
+    pending = set(futures)
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = error or future.exception()
+    raise error
+
+
+def call_with_retry(call: Callable[[Optional[float]], Any], label: str = "LLM call",
+                    attempts: int = LLM_ATTEMPTS, hedge: bool = HEDGE_ENABLED,
+                    latency_key: Hashable = None) -> Any:
+    """
+    Make an LLM call, retrying transient failures within the deadline and token budget.
+
+    Args:
+        call: Makes one request; called with the seconds left before the deadline
+            (None without one), to use as its timeout
+        label: Name of the call in log messages
+        attempts: Attempts before giving up
+        hedge: Send a second request when the first one is slower than most
+        latency_key: Kind of call whose latencies decide when to hedge (e.g. the model)
+
+    Returns:
+        What call returned
+
+    Raises:
+        LLMCallError: The call kept failing with transient errors
+        Exception: Any error of the call that is not transient
+    """
+    error = None
+    for attempt in range(1, attempts + 1):
+        timeout = time_left()
+        if timeout is not None and timeout <= 0:
+            raise LLMCallError(f"{label} ran out of time") from error
+
+        threshold = _latencies.quantile(latency_key, HEDGE_QUANTILE) if hedge else None
+        start = time.monotonic()
+        try:
+            if threshold is None or (timeout is not None and threshold >= timeout):
+                result = call(timeout)
+            else:
+                result = _call_hedged(call, timeout, threshold, label)
+            _latencies.record(latency_key, time.monotonic() - start)
+            return result
+        except Exception as e:
+            if not is_transient(e):
+                raise
+            error = e
+
+        if attempt == attempts:
+            break
+        if get_token_budget().exhausted:
+            raise LLMCallError(f"{label} failed ({str(error)}) and the token budget is spent") from error
+        delay = backoff_delay(attempt)
+        left = time_left()
+        if left is not None and delay >= left:
+            raise LLMCallError(f"{label} failed ({str(error)}) with no time left to retry") from error
+        print(f"  {label} failed ({str(error)}), retrying in {delay:.1f}s...")
+        time.sleep(delay)
+
+    raise LLMCallError(f"{label} failed after {attempts} attempts: {str(error)}") from error
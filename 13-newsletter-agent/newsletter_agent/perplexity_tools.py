@@ -1,10 +1,16 @@
 import os
-import json
 import requests
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 from google.adk.tools.tool_context import ToolContext
-from openai import OpenAI
+from openai import APIConnectionError, AuthenticationError
+
+from .article_store import save_articles
+from .client_registry import get_openai_client, get_registry
+from .json_stream import JsonArrayStream
+
+# OpenAI-compatible endpoint of the Perplexity API
+PERPLEXITY_BASE_URL = "https://api.perplexity.ai"
 
 def fetch_perplexity_articles(query: str, days: int, tool_context: ToolContext) -> dict:
     """Fetch recent articles using Perplexity API based on a query.
@@ -19,10 +25,6 @@ def fetch_perplexity_articles(query: str, days: int, tool_context: ToolContext)
     """
     print(f"--- Tool: fetch_perplexity_articles called for '{query}' (last {days} days) ---")
     
-    # Get current articles from state or initialize empty list
-    articles = tool_context.state.get("articles", [])
-    perplexity_articles = tool_context.state.get("perplexity_articles", [])
-    
     # Get API key from environment variable
     api_key = os.getenv("PERPLEXITY_API_KEY")
     if not api_key:
@@ -38,8 +40,8 @@ def fetch_perplexity_articles(query: str, days: int, tool_context: ToolContext)
     date_range = f"after:{past_date.strftime('%Y-%m-%d')}"
     
     try:
-        # Initialize OpenAI client with Perplexity base URL
-        client = OpenAI(api_key=api_key, base_url="https://api.perplexity.ai")
+        # Get the shared OpenAI client for the Perplexity base URL
+        client = get_openai_client(api_key, PERPLEXITY_BASE_URL)
         
         # Construct the search query with date range
         search_query = f"{query} {date_range}"
@@ -63,74 +65,64 @@ def fetch_perplexity_articles(query: str, days: int, tool_context: ToolContext)
             }
         ]
         
-        # Make the API call
-        response = client.chat.completions.create(
+        # Make the API call, streaming the response so articles are parsed as they arrive
+        stream = client.chat.completions.create(
             model="sonar-pro",  # Using the search-optimized model
             messages=messages,
             temperature=0.0,  # Lower temperature for more factual responses
+            stream=True,
         )
         
-        # Extract the response content
-        content = response.choices[0].message.content
-        
-        # Parse the JSON response
-        # Note: We need to handle potential JSON parsing issues
-        try:
-            # Try to extract JSON from the response if it's not pure JSON
-            if not content.strip().startswith('['):
-                import re
-                json_match = re.search(r'\[.*\]', content, re.DOTALL)
-                if json_match:
-                    content = json_match.group(0)
-            
-            # Parse the JSON content
-            article_data = json.loads(content)
-            
-            # Process the articles
-            new_articles = []
-            for idx, item in enumerate(article_data):
-                article = {
-                    "id": f"perplexity_{idx}_{item.get('url', '')}",
+        # Parse the JSON array element by element; malformed articles are skipped
+        # instead of failing the whole response
+        parser = JsonArrayStream()
+        chunks = []
+        new_articles = []
+        for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            chunks.append(chunk.choices[0].delta.content)
+            for item in parser.feed(chunks[-1]):
+                if not isinstance(item, dict):
+                    continue
+                summary = item.get('summary') or ''
+                new_articles.append({
+                    "id": f"perplexity_{len(new_articles)}_{item.get('url', '')}",
                     "title": item.get('title', 'Untitled'),
                     "url": item.get('url', ''),
                     "published": item.get('published_date', current_date.strftime("%Y-%m-%d")),
                     "source": item.get('source', 'Perplexity Search'),
-                    "summary": item.get('summary', '')[:500] + ('...' if len(item.get('summary', '')) > 500 else '')
-                }
-                new_articles.append(article)
-            
-            # Store the fetched articles in state
-            perplexity_articles = new_articles
-            tool_context.state["perplexity_articles"] = perplexity_articles
-            
-            # Merge with existing articles (avoiding duplicates by ID)
-            existing_ids = {article["id"] for article in articles}
-            for article in perplexity_articles:
-                if article["id"] not in existing_ids:
-                    articles.append(article)
-                    existing_ids.add(article["id"])
-            
-            # Update the combined articles in state
-            tool_context.state["articles"] = articles
-            
-            return {
-                "action": "fetch_perplexity_articles",
-                "query": query,
-                "days": days,
-                "articles_found": len(perplexity_articles),
-                "total_articles": len(articles),
-                "message": f"Found {len(perplexity_articles)} articles from Perplexity for '{query}' in the last {days} days."
-            }
-            
-        except json.JSONDecodeError as e:
+                    "summary": summary[:500] + ('...' if len(summary) > 500 else '')
+                })
+        
+        if not parser.started:
             return {
                 "action": "fetch_perplexity_articles",
                 "status": "error",
-                "message": f"Error parsing JSON response: {str(e)}",
-                "raw_response": content
+                "message": "Error parsing JSON response: no JSON array found",
+                "raw_response": "".join(chunks)
             }
+        if parser.skipped:
+            print(f"  Skipped {parser.skipped} malformed articles in the Perplexity response")
+        
+        # Store the fetched articles, then merge them into the combined articles
+        # (avoiding duplicates by ID). The state only keeps references to the store.
+        save_articles(tool_context.state, "perplexity_articles", new_articles)
+        total_articles = save_articles(tool_context.state, "articles", new_articles, merge=True)
+        
+        return {
+            "action": "fetch_perplexity_articles",
+            "query": query,
+            "days": days,
+            "articles_found": len(new_articles),
+            "total_articles": total_articles,
+            "message": f"Found {len(new_articles)} articles from Perplexity for '{query}' in the last {days} days."
+        }
             
     except Exception as e:
+        if isinstance(e, (APIConnectionError, AuthenticationError)):
+            # Start over with a new client next time
+            get_registry().invalidate("openai", (api_key, PERPLEXITY_BASE_URL))
         return {
             "action": "fetch_perplexity_articles",
             "status": "error",
@@ -0,0 +1,286 @@
+"""
+Streaming article pipeline for the AI & Gaming Newsletter
+
+This module lets articles flow through the newsletter stages as async iterators
+instead of fully materialized lists:
+
+    fetch -> normalize -> dedupe -> score -> top_k
+
+Each stage takes an (async) iterable of article dictionaries and yields articles as
+soon as they are ready, so scoring starts with the first feed that arrives instead
+of waiting for the slowest one. Only top_k and collect are barriers that need the
+whole stream.
+"""
+
+import asyncio
+import heapq
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, AsyncIterator, Callable, Iterable, Union
+
+from .article_store import canonicalize_url
+from .dedup import NearDuplicateIndex
+from .curator_tools import DEFAULT_KEYWORDS, score_article
+from .feed_cache import get_feed_cache
+from .feed_fetcher import FeedFetcher, run_sync
+from .feed_health import get_feed_health
+from .rss_tools import entry_to_article
+
+ArticleStream = Union[Iterable[Dict[str, Any]], AsyncIterator[Dict[str, Any]]]
+
+
+async def iterate(source: ArticleStream) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Turn a plain or async iterable into an async iterator.
+
+    Args:
+        source: Iterable of articles
+
+    Yields:
+        Articles from source
+    """
+    if hasattr(source, "__aiter__"):
+        async for article in source:
+            yield article
+    else:
+        for article in source:
+            yield article
+
+
+async def iterate_in_thread(func: Callable[..., Iterable[Dict[str, Any]]], *args) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run a blocking article source (e.g. a scraper) in a worker thread.
+
+    Args:
+        func: Function returning a list of articles
+        *args: Arguments for func
+
+    Yields:
+        The articles returned by func
+    """
+    articles = await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    for article in articles or []:
+        yield article
+
+
+async def stream_feed_articles(feed_urls: List[str], days: int,
+                               fetcher: FeedFetcher = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Fetch RSS feeds concurrently and yield their articles as each feed arrives.
+
+    Args:
+        feed_urls: List of RSS feed URLs to fetch
+        days: Number of days to look back
+        fetcher: Feed fetcher to use (defaults to one backed by the shared feed cache
+            and feed health records)
+
+    Yields:
+        Article dictionaries, in feed completion order
+    """
+    fetcher = fetcher or FeedFetcher(cache=get_feed_cache(), health=get_feed_health())
+    cutoff_date = datetime.now() - timedelta(days=days)
+
+    async for result in fetcher.iter_feeds(feed_urls):
+        if result["skipped"]:
+            continue
+        if result["error"]:
+            print(f"Error fetching feed {result['url']}: {result['error']}")
+            continue
+
+        try:
+            feed = result["feed"]
+            feed_title = feed.get('feed', {}).get('title', 'Unknown Source')
+            for entry in feed.entries:
+                article = entry_to_article(entry, feed_title, cutoff_date)
+                if article:
+                    yield article
+        except Exception as e:
+            print(f"Error fetching feed {result['url']}: {str(e)}")
+
+
+async def merge(*sources: ArticleStream) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Interleave several article streams, yielding from whichever is ready first.
+
+    A source that fails is reported and ends early; the other sources go on.
+
+    Args:
+        *sources: Iterables of articles
+
+    Yields:
+        Articles from all sources
+    """
+    queue = asyncio.Queue()
+    done = object()
+
+    async def pump(source):
+        try:
+            async for article in iterate(source):
+                await queue.put(article)
+        except Exception as e:
+            name = getattr(source, "__name__", type(source).__name__)
+            print(f"Error in article source {name}: {e.__class__.__name__}: {str(e)}")
+        finally:
+            await queue.put(done)
+
+    tasks = [asyncio.ensure_future(pump(source)) for source in sources]
+    remaining = len(tasks)
+    try:
+        while remaining:
+            item = await queue.get()
+            if item is done:
+                remaining -= 1
+            else:
+                yield item
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def normalize(stream: ArticleStream) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Make sure every article has the standard fields with clean values.
+
+    Args:
+        stream: Iterable of articles
+
+    Yields:
+        Articles with id, title, url, published, source and summary set
+    """
+    async for article in iterate(stream):
+        article["title"] = (article.get("title") or "Untitled").strip()
+        article["summary"] = (article.get("summary") or "").strip()
+        article["url"] = (article.get("url") or "").strip()
+        article["source"] = article.get("source") or "Unknown Source"
+        article["published"] = article.get("published") or datetime.now().strftime("%Y-%m-%d")
+        article["id"] = article.get("id") or article["url"]
+        if not article["id"]:
+            continue
+        yield article
+
+
+async def dedupe(stream: ArticleStream, near_duplicates: bool = True) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Drop articles already seen in the stream, by ID or canonical URL.
+
+    Args:
+        stream: Iterable of articles
+        near_duplicates: Also drop articles that tell the same story as an earlier
+            one (see dedup.NearDuplicateIndex); the earlier article records them
+            under "related_coverage"
+
+    Yields:
+        The first occurrence of each article
+    """
+    seen_ids = set()
+    seen_urls = set()
+    index = NearDuplicateIndex() if near_duplicates else None
+    async for article in iterate(stream):
+        url = canonicalize_url(article.get("url", ""))
+        if article["id"] in seen_ids or (url and url in seen_urls):
+            continue
+        seen_ids.add(article["id"])
+        if url:
+            seen_urls.add(url)
+        if index is not None:
+            duplicate_of = index.add(article)
+            if duplicate_of is not None:
+                index.articles[duplicate_of].setdefault("related_coverage", []).append({
+                    "source": article.get("source", ""),
+                    "title": article.get("title", ""),
+                    "url": article.get("url", "")
+                })
+                continue
+        yield article
+
+
+async def score(stream: ArticleStream, keywords: List[str] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Attach a keyword relevance score (see curator_tools.score_article) to each article.
+
+    Args:
+        stream: Iterable of articles
+        keywords: Keywords to score against (defaults to the curator's keywords)
+
+    Yields:
+        Articles with a "score" field
+    """
+    keywords = keywords or DEFAULT_KEYWORDS
+    async for article in iterate(stream):
+        article["score"] = score_article(article, keywords)
+        yield article
+
+
+async def batched(stream: ArticleStream, size: int) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Group a stream into lists of up to size articles, e.g. for LLM batches.
+
+    Args:
+        stream: Iterable of articles
+        size: Maximum batch size
+
+    Yields:
+        Lists of articles
+    """
+    batch = []
+    async for article in iterate(stream):
+        batch.append(article)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def top_k(stream: ArticleStream, k: int, key: Callable[[Dict[str, Any]], Any] = None) -> List[Dict[str, Any]]:
+    """
+    Barrier stage: keep the k best articles of the stream in a bounded heap.
+
+    Args:
+        stream: Iterable of articles
+        k: Number of articles to keep
+        key: Ranking key (defaults to the "score" field)
+
+    Returns:
+        The k best articles, best first (ties keep stream order); empty if k is
+        not positive, without reading the stream
+    """
+    if k <= 0:
+        return []
+    key = key or (lambda article: article.get("score", 0))
+    heap = []
+    position = 0
+    async for article in iterate(stream):
+        # The negated position makes earlier articles win ties, like a stable sort
+        item = (key(article), -position, article)
+        position += 1
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+    return [article for _, _, article in sorted(heap, key=lambda item: item[:2], reverse=True)]
+
+
+async def collect(stream: ArticleStream) -> List[Dict[str, Any]]:
+    """
+    Barrier stage: gather the whole stream into a list.
+
+    Args:
+        stream: Iterable of articles
+
+    Returns:
+        List of articles in stream order
+    """
+    return [article async for article in iterate(stream)]
+
+
+def run_pipeline(final_stage) -> Any:
+    """
+    Run a pipeline ending in a barrier stage (top_k, collect) from synchronous code.
+
+    Args:
+        final_stage: Coroutine returned by the barrier stage
+
+    Returns:
+        The barrier stage's result
+    """
+    return run_sync(final_stage)
@@ -0,0 +1,179 @@
+"""
+Compact article encoding for the AI & Gaming Newsletter's LLM prompts
+
+Articles used to go into prompts as indented JSON (or a Python list repr) with
+full URLs and summaries, so much of every prompt was whitespace, quoting,
+tracking parameters and text the model does not need. PromptEncoder writes them
+as one compact JSON object per line with one-letter field keys, summaries cut to
+a token budget, and URLs replaced by short handles ("url#3") that decode() maps
+back to the URLs in whatever the model returns.
+"""
+
+import re
+import json
+from typing import Dict, Any, Sequence
+
+from .batch_planner import CHARS_PER_TOKEN
+
+# Tokens of summary kept per article
+SUMMARY_TOKEN_BUDGET = 80
+
+# Short keys of the article fields the LLM tools send
+FIELD_KEYS = {
+    "title": "t",
+    "source": "s",
+    "summary": "d",
+    "published": "p",
+    "url": "u",
+}
+
+# What the keys stand for, as explained to the model
+FIELD_NAMES = {
+    "title": "title",
+    "source": "source",
+    "summary": "summary",
+    "published": "published date",
+    "url": "link",
+}
+
+_HANDLE_RE = re.compile(r"url#(\d+)")
+
+
+def truncate_text(text: str, tokens: int) -> str:
+    """
+    Cut a text to about a number of tokens, at a word boundary.
+
+    Args:
+        text: Text to cut
+        tokens: Token budget
+
+    Returns:
+        The text, or its beginning followed by "..." if it was longer
+    """
+    text = " ".join(text.split())
+    limit = tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > limit // 2 else limit].rstrip(" ,.;:") + "..."
+
+
+class PromptEncoder:
+    """Encodes articles for a prompt and decodes the URL handles in the response."""
+
+    def __init__(self, fields: Sequence[str] = ("title", "source", "summary", "published", "url"),
+                 summary_tokens: int = SUMMARY_TOKEN_BUDGET):
+        """
+        Args:
+            fields: Article fields to send, in order
+            summary_tokens: Tokens of summary kept per article
+        """
+        self.fields = list(fields)
+        self.summary_tokens = summary_tokens
+        self.urls = []
+        self._handles = {}
+
+    def handle(self, url: str) -> str:
+        """
+        Get the handle standing in for a URL.
+
+        Args:
+            url: URL to replace
+
+        Returns:
+            Handle such as "url#3" (the same one for the same URL)
+        """
+        if url not in self._handles:
+            self._handles[url] = f"url#{len(self.urls)}"
+            self.urls.append(url)
+        return self._handles[url]
+
+    def encode_article(self, article: Dict[str, Any], article_id: int = None) -> Dict[str, Any]:
+        """
+        Build the compact representation of one article.
+
+        Args:
+            article: Article dictionary
+            article_id: ID the model refers to the article by (omitted if None)
+
+        Returns:
+            Dictionary with short keys; empty fields are left out
+        """
+        item = {} if article_id is None else {"id": article_id}
+        for field in self.fields:
+            value = article.get(field) or (article.get("link") if field == "url" else None)
+            if not value:
+                continue
+            value = str(value)
+            if field == "summary":
+                value = truncate_text(value, self.summary_tokens)
+            elif field == "published":
+                value = value[:10]
+            elif field == "url":
+                value = self.handle(value)
+            item[FIELD_KEYS[field]] = value
+        return item
+
+    def legend(self, ids: bool = True) -> str:
+        """
+        Explain the field keys to the model.
+
+        Args:
+            ids: Whether the articles carry an "id" field
+
+        Returns:
+            Line listing the keys and the fields they stand for
+        """
+        keys = ", ".join(f"{FIELD_KEYS[field]}={FIELD_NAMES[field]}" for field in self.fields)
+        return f"(fields: {'id, ' if ids else ''}{keys})"
+
+    def encode(self, articles: Sequence[Dict[str, Any]], ids: bool = True) -> str:
+        """
+        Encode articles for a prompt.
+
+        Args:
+            articles: Article dictionaries
+            ids: Number the articles from 0 (as the "id" field)
+
+        Returns:
+            The legend line followed by one JSON object per article
+        """
+        lines = [self.legend(ids)]
+        for n, article in enumerate(articles):
+            lines.append(compact_json(self.encode_article(article, n if ids else None)))
+        return "\n".join(lines)
+
+    def decode(self, value: Any) -> Any:
+        """
+        Replace URL handles with their URLs.
+
+        Args:
+            value: Response text, or a parsed JSON value (lists and dictionaries
+                are decoded recursively)
+
+        Returns:
+            The value with every known handle replaced
+        """
+        if isinstance(value, str):
+            return _HANDLE_RE.sub(
+                lambda match: self.urls[int(match.group(1))] if int(match.group(1)) < len(self.urls) else match.group(0),
+                value)
+        if isinstance(value, list):
+            return [self.decode(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self.decode(item) for key, item in value.items()}
+        return value
+
+
+def compact_json(value: Any) -> str:
+    """
+    Serialize a value as JSON without any optional whitespace.
+
+    Args:
+        value: JSON-serializable value
+
+    Returns:
+        The JSON text (non-ASCII characters are kept as they are)
+    """
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
@@ -7,6 +7,8 @@ import json
 from datetime import datetime
 from google.adk.tools.tool_context import ToolContext
 
+from .article_store import load_articles
+
 def generate_pure_newsletter(tool_context: ToolContext) -> dict:
     """
     Generate a clean newsletter without ratings, just the bullet points.
@@ -91,7 +93,7 @@ def add_sources_to_pure_newsletter(tool_context: ToolContext) -> dict:
     
     # Get all sources used in this newsletter
     used_sources = set()
-    for article in tool_context.state.get("articles", []):
+    for article in load_articles(tool_context.state, "articles"):
         source = article.get("source", "Unknown")
         if source != "Unknown":
             used_sources.add(source)
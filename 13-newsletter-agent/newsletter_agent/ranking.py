@@ -0,0 +1,203 @@
+"""
+BM25 relevance ranking for the AI & Gaming Newsletter
+
+The default curation score adds flat points per keyword hit, so long summaries win
+and every run scores and sorts the whole corpus. This module ranks articles with
+BM25F instead: keyword frequencies are weighted per field (title above summary),
+normalized by field length and by how common the keyword is across the corpus,
+and multiplied by a continuous recency decay. All statistics come from the shared
+article index, so a query only touches the postings of its keywords and selects
+the top articles with a heap.
+
+Curation selects this ranking with criteria["ranking"] = "bm25".
+"""
+
+import heapq
+import math
+from collections import Counter
+from datetime import date
+from typing import List, Dict, Any, Tuple
+
+from .article_index import ArticleIndex, article_key, get_article_index
+from .article_store import DEFAULT_DB_PATH, get_article_store, is_reference
+
+# BM25 term frequency saturation and length normalization
+K1 = 1.2
+# Length normalization per field (title, summary)
+FIELD_B = (0.5, 0.75)
+# Weight of a keyword occurrence per field (title, summary)
+FIELD_WEIGHTS = (2.0, 1.0)
+
+# Relevance halves for every RECENCY_HALF_LIFE days of age, down to 1 - RECENCY_WEIGHT
+RECENCY_HALF_LIFE = 3.0
+RECENCY_WEIGHT = 0.5
+
+
+class BM25Ranker:
+    """BM25F ranking with recency decay over an ArticleIndex."""
+
+    def __init__(self, index: ArticleIndex = None, k1: float = K1, field_b: Tuple[float, float] = FIELD_B,
+                 field_weights: Tuple[float, float] = FIELD_WEIGHTS,
+                 half_life: float = RECENCY_HALF_LIFE, recency_weight: float = RECENCY_WEIGHT):
+        """
+        Args:
+            index: Article index to rank from (defaults to the shared index)
+            k1: Term frequency saturation
+            field_b: Length normalization for the title and summary
+            field_weights: Weight of an occurrence in the title and summary
+            half_life: Days after which the recency factor has decayed halfway
+            recency_weight: Share of the score that depends on recency (0 disables decay)
+        """
+        self.index = index if index is not None else get_article_index()
+        self.k1 = k1
+        self.field_b = field_b
+        self.field_weights = field_weights
+        self.half_life = half_life
+        self.recency_weight = recency_weight
+
+    def recency_factor(self, published: int, today: int) -> float:
+        """
+        Decay factor for an article's age.
+
+        Args:
+            published: Publication date as a day ordinal (None if unknown)
+            today: Current date as a day ordinal
+
+        Returns:
+            1.0 for today, approaching 1 - recency_weight for old or undated articles
+        """
+        if published is None:
+            return 1.0 - self.recency_weight
+        age = max(0, today - published)
+        return 1.0 - self.recency_weight + self.recency_weight * 0.5 ** (age / self.half_life)
+
+    def scores(self, keywords: List[str], keys: set = None, start_date: str = None,
+               today: date = None) -> Dict[str, float]:
+        """
+        Score every article that contains at least one keyword.
+
+        Args:
+            keywords: Query keywords (a keyword listed twice weighs twice)
+            keys: Only score these articles (defaults to every indexed article)
+            start_date: Skip articles published before this date (YYYY-MM-DD)
+            today: Reference date for the recency decay (defaults to today)
+
+        Returns:
+            Dictionary of article key to score
+        """
+        index = self.index
+        today = (today or date.today()).toordinal()
+        start = date.fromisoformat(start_date).toordinal() if start_date else None
+
+        total = len(keys) if keys is not None else len(index)
+        avg_title, avg_summary = index.average_lengths()
+        avg_title, avg_summary = max(avg_title, 1e-9), max(avg_summary, 1e-9)
+        title_weight, summary_weight = self.field_weights
+        title_b, summary_b = self.field_b
+        k1 = self.k1
+
+        relevance = {}
+        for keyword, query_weight in Counter(keyword.lower() for keyword in keywords).items():
+            frequencies = index.term_frequencies(keyword)
+            if keys is not None:
+                frequencies = {key: tf for key, tf in frequencies.items() if key in keys}
+            if not frequencies:
+                continue
+
+            df = len(frequencies)
+            idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+
+            for key, (title_tf, summary_tf) in frequencies.items():
+                title_length, summary_length = index.field_lengths(key)
+                tf = 0.0
+                if title_tf:
+                    tf += title_weight * title_tf / (1 - title_b + title_b * title_length / avg_title)
+                if summary_tf:
+                    tf += summary_weight * summary_tf / (1 - summary_b + summary_b * summary_length / avg_summary)
+                relevance[key] = relevance.get(key, 0.0) + query_weight * idf * tf * (k1 + 1) / (tf + k1)
+
+        scores = {}
+        for key, value in relevance.items():
+            published = index.published_ordinal(key)
+            if start is not None and (published is None or published < start):
+                continue
+            scores[key] = value * self.recency_factor(published, today)
+        return scores
+
+    def top_k(self, keywords: List[str], k: int, keys: set = None, start_date: str = None,
+              min_score: float = 0.0, today: date = None) -> List[Tuple[str, float]]:
+        """
+        Rank articles and return the k best.
+
+        Args:
+            keywords: Query keywords
+            k: Number of articles to return
+            keys: Only rank these articles (defaults to every indexed article)
+            start_date: Skip articles published before this date (YYYY-MM-DD)
+            min_score: Drop articles scoring below this
+            today: Reference date for the recency decay (defaults to today)
+
+        Returns:
+            List of (article key, score), best first
+        """
+        scores = self.scores(keywords, keys, start_date, today)
+        candidates = ((score, key) for key, score in scores.items() if score >= min_score)
+        # Ties are broken by key so the ranking is deterministic
+        best = heapq.nsmallest(k, candidates, key=lambda item: (-item[0], item[1]))
+        return [(key, score) for score, key in best]
+
+
+def rank_articles(state: Dict[str, Any], key: str, keywords: List[str], k: int,
+                  start_date: str = None, min_score: float = 0.0) -> Tuple[List[Tuple[Dict[str, Any], float]], int]:
+    """
+    Rank the articles referenced under a state key with BM25.
+
+    For articles kept in the article store only the best k are loaded; the rest are
+    ranked from the index without being read (articles the index has not seen yet,
+    e.g. after a restart, are indexed once).
+
+    Args:
+        state: Session state (tool_context.state)
+        key: State key holding the articles
+        keywords: Query keywords
+        k: Number of articles to return
+        start_date: Skip articles published before this date (YYYY-MM-DD)
+        min_score: Drop articles scoring below this
+
+    Returns:
+        Tuple of (list of (article, score) best first, number of articles considered)
+    """
+    value = state.get(key)
+    if not value:
+        return [], 0
+
+    if is_reference(value):
+        ids = value["ids"]
+        store = get_article_store(value.get("store", DEFAULT_DB_PATH))
+        index = get_article_index()
+        # Keep the referenced articles indexed while the missing ones are added
+        index.touch(ids)
+        missing = [article_id for article_id in ids if article_id not in index]
+        if missing:
+            index.add_articles(store.get_articles(missing))
+        keys = set(ids)
+        ranked = BM25Ranker(index).top_k(keywords, k, keys, start_date, min_score)
+        articles = {article["id"]: article for article in store.get_articles([key for key, _ in ranked])}
+        considered = _count_since(index, keys, start_date)
+        return [(articles[key], score) for key, score in ranked if key in articles], considered
+
+    # Plain article lists get their own index if their keys collide
+    articles = {article_key(article): article for article in value}
+    index = get_article_index() if len(articles) == len(value) else ArticleIndex()
+    index.add_articles(value)
+    keys = set(articles)
+    ranked = BM25Ranker(index).top_k(keywords, k, keys, start_date, min_score)
+    return [(articles[key], score) for key, score in ranked], _count_since(index, keys, start_date)
+
+
+def _count_since(index: ArticleIndex, keys: set, start_date: str) -> int:
+    if not start_date:
+        return len(keys)
+    start = date.fromisoformat(start_date).toordinal()
+    return sum(1 for key in keys
+               if index.published_ordinal(key) is not None and index.published_ordinal(key) >= start)
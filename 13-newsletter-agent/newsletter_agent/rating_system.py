@@ -1,14 +1,30 @@
-import os
 from typing import List, Dict, Any
 from google.adk.tools.tool_context import ToolContext
-import google.generativeai as genai
+import numpy as np
 
-# Configure the Google Generative AI API
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY", ""))
+from .batch_scorer import parallel_counts, tiers
 
 # Default model to use
 DEFAULT_MODEL = "gemini-1.5-pro"
 
+# Keywords counted for the rating criteria (a keyword counts once whether it is
+# in the title, the summary or both)
+RATING_KEYWORDS = {
+    "ai_gaming": [
+        "ai", "artificial intelligence", "machine learning", "neural network",
+        "game", "gaming", "player", "npc", "character", "gameplay"
+    ],
+    "technical": [
+        "model", "algorithm", "framework", "architecture", "implementation",
+        "diffusion", "transformer", "neural", "deep learning", "training"
+    ],
+    "business": [
+        "funding", "investment", "million", "billion", "startup", "venture",
+        "acquisition", "partnership", "revenue", "growth", "market"
+    ]
+}
+
+
 def rate_article_content(article: Dict[str, Any]) -> Dict[str, Any]:
     """
     Rate an article based on its content quality, relevance, and impact.
@@ -19,102 +35,132 @@ def rate_article_content(article: Dict[str, Any]) -> Dict[str, Any]:
     Returns:
         Dictionary with ratings for the article
     """
-    title = article.get("title", "")
-    summary = article.get("summary", "")
-    keywords = article.get("keywords", [])
+    return rate_articles_content([article])[0]
+
+
+def rate_articles_content(articles: List[Dict[str, Any]], workers: int = None) -> List[Dict[str, Any]]:
+    """
+    Rate many articles at once from a single keyword hit matrix.
     
+    Large inputs are counted across worker processes; small ones in this process.
+    
+    Args:
+        articles: List of article dictionaries
+        workers: Number of worker processes for large inputs (defaults to the number of CPUs)
+        
+    Returns:
+        List of rating dictionaries, in the order of the articles
+    """
     # Simple algorithm to rate articles based on keywords and title
     # This avoids LLM API calls which can be unreliable for structured data
-    
-    # Define rating criteria
-    ai_gaming_keywords = [
-        "ai", "artificial intelligence", "machine learning", "neural network",
-        "game", "gaming", "player", "npc", "character", "gameplay"
-    ]
-    
-    technical_keywords = [
-        "model", "algorithm", "framework", "architecture", "implementation",
-        "diffusion", "transformer", "neural", "deep learning", "training"
-    ]
-    
-    business_keywords = [
-        "funding", "investment", "million", "billion", "startup", "venture",
-        "acquisition", "partnership", "revenue", "growth", "market"
-    ]
-    
-    # Calculate scores
-    title_lower = title.lower()
-    summary_lower = summary.lower()
+    counts = parallel_counts(RATING_KEYWORDS, articles, joined=False, workers=workers)
+    ai_gaming_matches, technical_matches, business_matches = counts.T
     
     # Relevance score (1-5)
-    relevance_score = 3  # Default score
-    ai_gaming_matches = sum(1 for kw in ai_gaming_keywords if kw in title_lower or kw in summary_lower)
-    if ai_gaming_matches >= 4:
-        relevance_score = 5
-    elif ai_gaming_matches >= 2:
-        relevance_score = 4
+    relevance_scores = tiers(ai_gaming_matches, [4, 2], [5, 4], 3)
     
     # Technical depth score (1-5)
-    technical_score = 3  # Default score
-    technical_matches = sum(1 for kw in technical_keywords if kw in title_lower or kw in summary_lower)
-    if technical_matches >= 3:
-        technical_score = 5
-    elif technical_matches >= 1:
-        technical_score = 4
+    technical_scores = tiers(technical_matches, [3, 1], [5, 4], 3)
     
     # Timeliness score (1-5)
     # Assume all articles are recent since we're filtering by date
     timeliness_score = 4
     
     # Educational value score (1-5)
-    educational_score = 3
-    if technical_score >= 4 or relevance_score >= 4:
-        educational_score = 4
+    educational_scores = np.where((technical_scores >= 4) | (relevance_scores >= 4), 4, 3)
     
     # Business relevance score (1-5)
-    business_score = 3
-    business_matches = sum(1 for kw in business_keywords if kw in title_lower or kw in summary_lower)
-    if business_matches >= 2:
-        business_score = 5
-    elif business_matches >= 1:
-        business_score = 4
-    
-    # Overall quality score (1-5)
-    overall_score = (relevance_score + technical_score + timeliness_score + educational_score) / 4
-    overall_score = round(overall_score)
-    
-    # Create ratings dictionary
-    ratings = {
-        "relevance": {
-            "score": relevance_score,
-            "justification": f"Contains {ai_gaming_matches} AI/gaming related keywords"
-        },
-        "technical_depth": {
-            "score": technical_score,
-            "justification": f"Contains {technical_matches} technical keywords"
-        },
-        "timeliness": {
-            "score": timeliness_score,
-            "justification": "Recent article from curated feed"
-        },
-        "educational_value": {
-            "score": educational_score,
-            "justification": "Based on technical depth and relevance scores"
-        },
-        "business_relevance": {
-            "score": business_score,
-            "justification": f"Contains {business_matches} business/funding keywords"
-        },
-        "overall_quality": {
-            "score": overall_score,
-            "justification": "Average of other scores"
-        },
-        "average_score": round((relevance_score + technical_score + timeliness_score + educational_score + business_score) / 5, 1)
-    }
+    business_scores = tiers(business_matches, [2, 1], [5, 4], 3)
+    
+    ratings = []
+    for ai_gaming, technical, business, relevance_score, technical_score, educational_score, business_score in zip(
+            ai_gaming_matches.tolist(), technical_matches.tolist(), business_matches.tolist(),
+            relevance_scores.tolist(), technical_scores.tolist(), educational_scores.tolist(),
+            business_scores.tolist()):
+        # Overall quality score (1-5)
+        overall_score = round((relevance_score + technical_score + timeliness_score + educational_score) / 4)
+        
+        ratings.append({
+            "relevance": {
+                "score": relevance_score,
+                "justification": f"Contains {ai_gaming} AI/gaming related keywords"
+            },
+            "technical_depth": {
+                "score": technical_score,
+                "justification": f"Contains {technical} technical keywords"
+            },
+            "timeliness": {
+                "score": timeliness_score,
+                "justification": "Recent article from curated feed"
+            },
+            "educational_value": {
+                "score": educational_score,
+                "justification": "Based on technical depth and relevance scores"
+            },
+            "business_relevance": {
+                "score": business_score,
+                "justification": f"Contains {business} business/funding keywords"
+            },
+            "overall_quality": {
+                "score": overall_score,
+                "justification": "Average of other scores"
+            },
+            "average_score": round((relevance_score + technical_score + timeliness_score + educational_score + business_score) / 5, 1)
+        })
     
     return ratings
 
 
+def rate_articles_batch(articles: List[Dict[str, Any]], categorized_articles: List[Dict[str, Any]] = None,
+                        workers: int = None) -> Dict[str, Any]:
+    """
+    Rate a batch of articles and average the ratings per category.
+    
+    Works for a handful of curated articles as well as the whole archive: large
+    batches are counted across worker processes (see rate_articles_content).
+    
+    Args:
+        articles: List of article dictionaries (each gets a "ratings" entry)
+        categorized_articles: Articles with a "categories" list; they get the ratings
+            of the rated article with the same URL and are averaged per category
+        workers: Number of worker processes for large batches (defaults to the number of CPUs)
+        
+    Returns:
+        Dictionary with "rated_articles" (best first), "categorized_articles" and
+        "category_ratings" (category to average score)
+    """
+    for article, ratings in zip(articles, rate_articles_content(articles, workers)):
+        article["ratings"] = ratings
+    
+    # Sort articles by average rating
+    rated_articles = sorted(articles, key=lambda x: x.get("ratings", {}).get("average_score", 0), reverse=True)
+    
+    # Create a lookup dictionary for quick access to rated articles by URL
+    rated_lookup = {article.get("url"): article for article in rated_articles if article.get("url")}
+    
+    # Copy the ratings to the categorized articles and sum them per category in the same pass
+    category_totals = {}
+    for article in categorized_articles or []:
+        url = article.get("url")
+        if url and url in rated_lookup:
+            article["ratings"] = rated_lookup[url].get("ratings", {})
+        for category in article.get("categories", []):
+            totals = category_totals.setdefault(category, [0, 0])
+            if "ratings" in article:
+                totals[0] += article["ratings"].get("average_score", 0)
+                totals[1] += 1
+    
+    # Calculate average rating for each category with rated articles
+    category_ratings = {category: round(total / count, 1)
+                        for category, (total, count) in category_totals.items() if count}
+    
+    return {
+        "rated_articles": rated_articles,
+        "categorized_articles": list(categorized_articles or []),
+        "category_ratings": category_ratings
+    }
+
+
 def rate_articles(tool_context: ToolContext) -> dict:
     """
     Rate all curated articles in the tool context.
@@ -137,59 +183,14 @@ def rate_articles(tool_context: ToolContext) -> dict:
             "message": "No curated articles found. Please curate articles first."
         }
     
-    # Rate each article
-    rated_articles = []
-    for article in articles:
-        ratings = rate_article_content(article)
-        article["ratings"] = ratings
-        rated_articles.append(article)
+    result = rate_articles_batch(articles, tool_context.state.get("categorized_articles", []))
+    rated_articles = result["rated_articles"]
+    category_ratings = result["category_ratings"]
     
-    # Sort articles by average rating
-    rated_articles.sort(key=lambda x: x.get("ratings", {}).get("average_score", 0), reverse=True)
-    
-    # Store rated articles in state
+    # Store rated articles, the categorized articles with their ratings and the
+    # category ratings in state
     tool_context.state["rated_articles"] = rated_articles
-    
-    # First, ensure all articles in categorized_articles have ratings
-    # We need to update the articles in the categorized_articles with their ratings
-    categorized_articles = tool_context.state.get("categorized_articles", [])
-    
-    # Create a lookup dictionary for quick access to rated articles by URL
-    rated_lookup = {article.get("url"): article for article in rated_articles if article.get("url")}
-    
-    # Update articles with their ratings
-    updated_articles = []
-    for article in categorized_articles:
-        url = article.get("url")
-        if url and url in rated_lookup:
-            # Copy ratings from the rated article to this article
-            article["ratings"] = rated_lookup[url].get("ratings", {})
-        updated_articles.append(article)
-    
-    # Store the updated articles back
-    tool_context.state["categorized_articles"] = updated_articles
-    
-    # Now calculate average ratings by category
-    category_ratings = {}
-    
-    # Group articles by category
-    articles_by_category = {}
-    for article in updated_articles:
-        for category in article.get("categories", []):
-            if category not in articles_by_category:
-                articles_by_category[category] = []
-            articles_by_category[category].append(article)
-    
-    # Calculate average rating for each category
-    for category, cat_articles in articles_by_category.items():
-        if cat_articles:
-            # Filter articles that have ratings
-            rated_cat_articles = [a for a in cat_articles if "ratings" in a]
-            if rated_cat_articles:
-                avg_scores = [a["ratings"].get("average_score", 0) for a in rated_cat_articles]
-                category_ratings[category] = round(sum(avg_scores) / len(avg_scores), 1)
-    
-    # Store category ratings in state
+    tool_context.state["categorized_articles"] = result["categorized_articles"]
     tool_context.state["category_ratings"] = category_ratings
     
     return {
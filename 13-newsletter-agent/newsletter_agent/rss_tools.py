@@ -1,10 +1,16 @@
-import feedparser
-import requests
 from datetime import datetime, timedelta
-from bs4 import BeautifulSoup
 from typing import List, Dict, Any
 from google.adk.tools.tool_context import ToolContext
 
+from .article_store import save_articles
+from .feed_cache import get_feed_cache
+from .feed_fetcher import fetch_feeds
+from .feed_health import get_feed_health
+from .html_text import html_to_text
+
+# Maximum length of an article summary
+SUMMARY_LENGTH = 500
+
 
 def fetch_rss_articles(feed_urls: List[str], days: int, tool_context: ToolContext) -> dict:
     """Fetch recent articles from RSS feeds.
@@ -19,84 +25,95 @@ def fetch_rss_articles(feed_urls: List[str], days: int, tool_context: ToolContex
     """
     print(f"--- Tool: fetch_rss_articles called for {len(feed_urls)} feeds (last {days} days) ---")
     
-    # Get current articles from state or initialize empty list
-    articles = tool_context.state.get("articles", [])
-    rss_articles = tool_context.state.get("rss_articles", [])
-    
     # Calculate the cutoff date
     cutoff_date = datetime.now() - timedelta(days=days)
     
-    # Fetch and parse each feed
+    # Download all feeds concurrently (unchanged feeds come from the cache and
+    # feeds that keep failing are skipped), then process them in list order
     new_articles = []
-    for feed_url in feed_urls:
+    feeds_skipped = 0
+    for result in fetch_feeds(feed_urls, cache=get_feed_cache(), health=get_feed_health()):
+        feed_url = result["url"]
+        if result["skipped"]:
+            feeds_skipped += 1
+            continue
+        if result["error"]:
+            print(f"Error fetching feed {feed_url}: {result['error']}")
+            continue
+        
         try:
-            # Parse the feed
-            feed = feedparser.parse(feed_url)
+            feed = result["feed"]
             feed_title = feed.get('feed', {}).get('title', 'Unknown Source')
             
             # Process each entry
             for entry in feed.entries:
-                # Get publication date
-                published_date = None
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    published_date = datetime(*entry.published_parsed[:6])
-                elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                    published_date = datetime(*entry.updated_parsed[:6])
-                else:
-                    # If no date, assume it's recent
-                    published_date = datetime.now()
-                
-                # Skip if older than cutoff date
-                if published_date < cutoff_date:
-                    continue
-                
-                # Extract summary/content
-                summary = ""
-                if hasattr(entry, 'summary'):
-                    summary = entry.summary
-                elif hasattr(entry, 'content'):
-                    summary = entry.content[0].value
-                
-                # Clean HTML from summary
-                if summary:
-                    soup = BeautifulSoup(summary, 'html.parser')
-                    summary = soup.get_text(separator=' ', strip=True)
-                
-                # Create article object
-                article = {
-                    "id": entry.get('id', entry.get('link', '')),
-                    "title": entry.get('title', 'Untitled'),
-                    "url": entry.get('link', ''),
-                    "published": published_date.strftime("%Y-%m-%d"),
-                    "source": feed_title,
-                    "summary": summary[:500] + ('...' if len(summary) > 500 else '')
-                }
-                
-                new_articles.append(article)
+                article = entry_to_article(entry, feed_title, cutoff_date)
+                if article:
+                    new_articles.append(article)
         
         except Exception as e:
             print(f"Error fetching feed {feed_url}: {str(e)}")
     
-    # Store the fetched articles in state
-    rss_articles = new_articles
-    tool_context.state["rss_articles"] = rss_articles
-    
-    # Merge with existing articles (avoiding duplicates by ID)
-    existing_ids = {article["id"] for article in articles}
-    for article in rss_articles:
-        if article["id"] not in existing_ids:
-            articles.append(article)
-            existing_ids.add(article["id"])
-    
-    # Update the combined articles in state
-    tool_context.state["articles"] = articles
+    # Store the fetched articles, then merge them into the combined articles
+    # (avoiding duplicates by ID). The state only keeps references to the store.
+    save_articles(tool_context.state, "rss_articles", new_articles)
+    total_articles = save_articles(tool_context.state, "articles", new_articles, merge=True)
     
     return {
         "action": "fetch_rss_articles",
         "feeds_processed": len(feed_urls),
-        "articles_found": len(rss_articles),
-        "total_articles": len(articles),
-        "message": f"Found {len(rss_articles)} articles from {len(feed_urls)} RSS feeds in the last {days} days."
+        "feeds_skipped": feeds_skipped,
+        "articles_found": len(new_articles),
+        "total_articles": total_articles,
+        "message": f"Found {len(new_articles)} articles from {len(feed_urls)} RSS feeds in the last {days} days"
+                   f" ({feeds_skipped} failing feeds skipped)."
+    }
+
+
+def entry_to_article(entry, feed_title: str, cutoff_date: datetime) -> Dict[str, Any]:
+    """Convert a feedparser entry into an article dictionary.
+    
+    Args:
+        entry: Parsed feed entry
+        feed_title: Title of the feed the entry belongs to
+        cutoff_date: Entries published before this date are skipped
+        
+    Returns:
+        An article dictionary, or None if the entry is older than the cutoff
+    """
+    # Get publication date
+    published_date = None
+    if hasattr(entry, 'published_parsed') and entry.published_parsed:
+        published_date = datetime(*entry.published_parsed[:6])
+    elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
+        published_date = datetime(*entry.updated_parsed[:6])
+    else:
+        # If no date, assume it's recent
+        published_date = datetime.now()
+    
+    # Skip if older than cutoff date
+    if published_date < cutoff_date:
+        return None
+    
+    # Extract summary/content
+    summary = ""
+    if hasattr(entry, 'summary'):
+        summary = entry.summary
+    elif hasattr(entry, 'content'):
+        summary = entry.content[0].value
+    
+    # Clean HTML from summary, stopping as soon as we know whether it needs cutting
+    if summary:
+        summary = html_to_text(summary, max_chars=SUMMARY_LENGTH + 1)
+    
+    # Create article object
+    return {
+        "id": entry.get('id', entry.get('link', '')),
+        "title": entry.get('title', 'Untitled'),
+        "url": entry.get('link', ''),
+        "published": published_date.strftime("%Y-%m-%d"),
+        "source": feed_title,
+        "summary": summary[:SUMMARY_LENGTH] + ('...' if len(summary) > SUMMARY_LENGTH else '')
     }
 
 
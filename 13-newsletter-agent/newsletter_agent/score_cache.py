@@ -0,0 +1,175 @@
+"""
+Persistent article score cache for the AI & Gaming Newsletter
+
+Curation runs again and again over the articles referenced by a long-lived session,
+and most of them were already scored by an earlier run. This module keeps the
+keyword part of each article's score in SQLite, keyed on the article ID and on a
+hash of the keyword set and scoring version. A cached score is only used while the
+article's content hash is unchanged; the recency part of the score depends on the
+current date and is added by the caller at query time.
+
+Keyword sets come and go with the conversations, so scores are dropped once they
+were last stored more than SCORE_RETENTION_DAYS ago.
+"""
+
+import os
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import List, Dict, Tuple, Iterable
+
+from .article_store import DEFAULT_DB_PATH, QUERY_CHUNK_SIZE
+
+# Path of the SQLite database holding the scores (the article database by default)
+DEFAULT_SCORE_DB_PATH = os.getenv("NEWSLETTER_SCORE_DB", DEFAULT_DB_PATH)
+
+# Days after which a stored score is dropped (0 keeps scores forever)
+SCORE_RETENTION_DAYS = int(os.getenv("NEWSLETTER_SCORE_RETENTION_DAYS", 30))
+
+
+def scorer_key(keywords: Iterable[str], version: int) -> str:
+    """
+    Identify a keyword set and scoring version.
+
+    Keywords match case-insensitively and regardless of their order, so the same
+    set in another order or case shares its scores (duplicates still count).
+
+    Args:
+        keywords: Keywords the articles are scored against
+        version: Version of the scoring function
+
+    Returns:
+        Hex digest identifying the scorer
+    """
+    content = f"{version}\n" + "\n".join(sorted(keyword.lower() for keyword in keywords))
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+class ScoreCache:
+    """SQLite-backed cache of article scores per scorer."""
+
+    def __init__(self, db_path: str = DEFAULT_SCORE_DB_PATH, retention_days: int = SCORE_RETENTION_DAYS):
+        """
+        Args:
+            db_path: Path of the SQLite database file
+            retention_days: Days after which a stored score is dropped (0 keeps them)
+        """
+        self.db_path = db_path
+        self.retention_days = retention_days
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS article_scores (
+                article_id TEXT NOT NULL,
+                scorer TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                score INTEGER NOT NULL,
+                stored_at REAL NOT NULL DEFAULT 0,
+                PRIMARY KEY (article_id, scorer)
+            )
+        """)
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(article_scores)")]
+        if "stored_at" not in columns:
+            # Tables from before the retention have no timestamps, their scores expire first
+            self._conn.execute("ALTER TABLE article_scores ADD COLUMN stored_at REAL NOT NULL DEFAULT 0")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS article_scores_stored_at ON article_scores (stored_at)")
+        self._conn.commit()
+        self.prune()
+
+    def get_scores(self, scorer: str, ids: List[str]) -> Dict[str, Tuple[str, int]]:
+        """
+        Look up cached scores.
+
+        Args:
+            scorer: Scorer key (see scorer_key)
+            ids: Article IDs
+
+        Returns:
+            Dictionary of article ID to (content hash, score) for the cached ones;
+            callers must check the content hash against the current article
+        """
+        found = {}
+        with self._lock:
+            for i in range(0, len(ids), QUERY_CHUNK_SIZE):
+                chunk = ids[i:i + QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                cursor = self._conn.execute(
+                    f"SELECT article_id, content_hash, score FROM article_scores "
+                    f"WHERE scorer = ? AND article_id IN ({placeholders})",
+                    [scorer] + list(chunk)
+                )
+                for article_id, digest, score in cursor:
+                    found[article_id] = (digest, score)
+        return found
+
+    def put_scores(self, scorer: str, rows: Iterable[Tuple[str, str, int]]) -> None:
+        """
+        Store scores, replacing older ones for the same articles.
+
+        Args:
+            scorer: Scorer key (see scorer_key)
+            rows: (article ID, content hash, score) tuples
+        """
+        now = time.time()
+        rows = [(article_id, scorer, digest, score, now) for article_id, digest, score in rows]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany("""
+                INSERT OR REPLACE INTO article_scores (article_id, scorer, content_hash, score, stored_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, rows)
+            self._conn.commit()
+        # Age out old scores as new ones come in (stored_at is indexed, so this is cheap)
+        self.prune()
+
+    def prune(self) -> int:
+        """
+        Drop the scores stored more than retention_days ago.
+
+        Returns:
+            Number of scores dropped
+        """
+        if not self.retention_days:
+            return 0
+        cutoff = time.time() - self.retention_days * 86400
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM article_scores WHERE stored_at < ?", (cutoff,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def clear(self, scorer: str = None) -> None:
+        """
+        Forget cached scores.
+
+        Args:
+            scorer: Only forget the scores of this scorer (defaults to all)
+        """
+        with self._lock:
+            if scorer:
+                self._conn.execute("DELETE FROM article_scores WHERE scorer = ?", (scorer,))
+            else:
+                self._conn.execute("DELETE FROM article_scores")
+            self._conn.commit()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_score_cache(db_path: str = DEFAULT_SCORE_DB_PATH) -> ScoreCache:
+    """
+    Get the shared score cache for a database file.
+
+    Args:
+        db_path: Path of the SQLite database file
+
+    Returns:
+        The ScoreCache for that file
+    """
+    with _caches_lock:
+        if db_path not in _caches:
+            _caches[db_path] = ScoreCache(db_path)
+        return _caches[db_path]
@@ -1,26 +1,33 @@
 import os
 import json
-import requests
-import feedparser
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Any, Tuple
 from urllib.parse import urlparse
-import google.generativeai as genai
 from bs4 import BeautifulSoup
-import time
+
+from .feed_cache import fetch_feed
+from .html_text import html_to_text, count_date_elements
+from .http_pool import get_session, polite_get
+from .keyword_matcher import get_matcher
+from .llm_cache import generate_text
 
 # Simple tool context class for compatibility
 class SimpleToolContext:
     def __init__(self, initial_state=None):
         self.state = initial_state or {}
 
-# Configure the Google Generative AI API if available
-api_key = os.getenv("GOOGLE_API_KEY", "")
-if api_key:
-    genai.configure(api_key=api_key)
-
 # Default model to use
 DEFAULT_MODEL = "gemini-1.5-pro"
 
+# Website quality tops out at this many characters of text, so there is no need to extract more
+WEBSITE_TEXT_LIMIT = 25000
+
+# Evaluation checks the same feed more than once per run; reuse a feed validated this recently (seconds)
+FEED_CACHE_MAX_AGE = 600
+
+# Sources evaluated at the same time; requests to a single host are still rate limited
+EVALUATION_WORKERS = 8
+
 # List of seed sources to start with
 SEED_SOURCES = [
     # Gaming industry news
@@ -110,9 +117,6 @@ def discover_sources(tool_context: SimpleToolContext) -> dict:
             # Search for related sources
             new_sources = _search_related_sources(domain)
             discovered_sources.extend(new_sources)
-            
-            # Avoid rate limiting
-            time.sleep(1)
         except Exception as e:
             print(f"Error discovering sources from {source}: {str(e)}")
     
@@ -224,44 +228,11 @@ def evaluate_sources(tool_context: SimpleToolContext) -> dict:
             "message": "No discovered sources to evaluate. Run discover_sources first."
         }
     
-    # Evaluate each source
-    evaluated_sources = []
-    
-    for source in discovered_sources[:10]:  # Limit to 10 to avoid too many requests
-        try:
-            # Check if it's an RSS feed
-            is_rss, feed_url = _check_if_rss(source)
-            
-            if is_rss:
-                # If it's an RSS feed, evaluate its content
-                quality_score, relevance_score, frequency_score = _evaluate_rss_feed(feed_url)
-            else:
-                # If it's not an RSS feed, try to find RSS feed for the site
-                feed_url = _find_rss_feed(source)
-                if feed_url:
-                    quality_score, relevance_score, frequency_score = _evaluate_rss_feed(feed_url)
-                else:
-                    # If no RSS feed found, evaluate the website content
-                    quality_score, relevance_score, frequency_score = _evaluate_website(source)
-            
-            # Calculate overall score
-            overall_score = (quality_score + relevance_score + frequency_score) / 3
-            
-            # Add to evaluated sources
-            evaluated_sources.append({
-                "url": source,
-                "feed_url": feed_url if feed_url else None,
-                "is_rss": is_rss,
-                "quality_score": quality_score,
-                "relevance_score": relevance_score,
-                "frequency_score": frequency_score,
-                "overall_score": overall_score
-            })
-            
-            # Avoid rate limiting
-            time.sleep(1)
-        except Exception as e:
-            print(f"Error evaluating source {source}: {str(e)}")
+    # Evaluate sources in parallel; the shared session keeps each host rate limited
+    sources = discovered_sources[:10]  # Limit to 10 to avoid too many requests
+    with ThreadPoolExecutor(max_workers=EVALUATION_WORKERS) as executor:
+        results = list(executor.map(_evaluate_source, sources))
+    evaluated_sources = [result for result in results if result is not None]
     
     # Sort by overall score
     evaluated_sources.sort(key=lambda x: x.get("overall_score", 0), reverse=True)
@@ -276,6 +247,48 @@ def evaluate_sources(tool_context: SimpleToolContext) -> dict:
         "sources": evaluated_sources[:5]  # Return top 5 for preview
     }
 
+def _evaluate_source(source: str) -> Dict[str, Any]:
+    """
+    Evaluate a single source.
+    
+    Args:
+        source: Source URL
+        
+    Returns:
+        Dictionary with the source's scores, or None if evaluation failed
+    """
+    try:
+        # Check if it's an RSS feed
+        is_rss, feed_url = _check_if_rss(source)
+        
+        if is_rss:
+            # If it's an RSS feed, evaluate its content
+            quality_score, relevance_score, frequency_score = _evaluate_rss_feed(feed_url)
+        else:
+            # If it's not an RSS feed, try to find RSS feed for the site
+            feed_url = _find_rss_feed(source)
+            if feed_url:
+                quality_score, relevance_score, frequency_score = _evaluate_rss_feed(feed_url)
+            else:
+                # If no RSS feed found, evaluate the website content
+                quality_score, relevance_score, frequency_score = _evaluate_website(source)
+        
+        # Calculate overall score
+        overall_score = (quality_score + relevance_score + frequency_score) / 3
+        
+        return {
+            "url": source,
+            "feed_url": feed_url if feed_url else None,
+            "is_rss": is_rss,
+            "quality_score": quality_score,
+            "relevance_score": relevance_score,
+            "frequency_score": frequency_score,
+            "overall_score": overall_score
+        }
+    except Exception as e:
+        print(f"Error evaluating source {source}: {str(e)}")
+        return None
+
 def _check_if_rss(url: str) -> Tuple[bool, str]:
     """
     Check if a URL is an RSS feed.
@@ -287,7 +300,7 @@ def _check_if_rss(url: str) -> Tuple[bool, str]:
         Tuple of (is_rss, feed_url)
     """
     try:
-        feed = feedparser.parse(url)
+        feed = fetch_feed(url, max_age=FEED_CACHE_MAX_AGE, session=get_session())
         
         # Check if it's a valid feed
         if feed.get('feed') and feed.get('entries'):
@@ -312,7 +325,7 @@ def _find_rss_feed(url: str) -> str:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
         
-        response = requests.get(url, headers=headers)
+        response = polite_get(url, headers=headers)
         soup = BeautifulSoup(response.text, 'html.parser')
         
         # Look for RSS link
@@ -335,7 +348,7 @@ def _find_rss_feed(url: str) -> str:
             feed_url = f"{parsed_url.scheme}://{parsed_url.netloc}{path}"
             
             try:
-                feed = feedparser.parse(feed_url)
+                feed = fetch_feed(feed_url, max_age=FEED_CACHE_MAX_AGE, session=get_session())
                 if feed.get('feed') and feed.get('entries'):
                     return feed_url
             except Exception:
@@ -357,7 +370,7 @@ def _evaluate_rss_feed(feed_url: str) -> Tuple[float, float, float]:
         Tuple of (quality_score, relevance_score, frequency_score)
     """
     try:
-        feed = feedparser.parse(feed_url)
+        feed = fetch_feed(feed_url, max_age=FEED_CACHE_MAX_AGE, session=get_session())
         
         # Check quality (based on entry length and content)
         entries = feed.get('entries', [])
@@ -371,14 +384,10 @@ def _evaluate_rss_feed(feed_url: str) -> Tuple[float, float, float]:
         
         # Check relevance (based on keywords)
         relevance_count = 0
+        matcher = get_matcher(RELEVANT_KEYWORDS)
         for entry in entries:
-            title = entry.get('title', '').lower()
-            summary = entry.get('summary', '').lower()
-            content = title + " " + summary
-            
-            for keyword in RELEVANT_KEYWORDS:
-                if keyword in content:
-                    relevance_count += 1
+            content = entry.get('title', '') + " " + entry.get('summary', '')
+            relevance_count += matcher.count(content)
         
         relevance_score = min(5.0, relevance_count / (len(entries) * 2))  # Normalize to 0-5 scale
         
@@ -428,28 +437,22 @@ def _evaluate_website(url: str) -> Tuple[float, float, float]:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
         
-        response = requests.get(url, headers=headers)
-        soup = BeautifulSoup(response.text, 'html.parser')
+        response = polite_get(url, headers=headers)
         
-        # Extract text content
-        text_content = soup.get_text()
+        # Extract text content like soup.get_text() did (only as much as the scores can use)
+        text_content = html_to_text(response.text, max_chars=WEBSITE_TEXT_LIMIT, separator="", strip=False)
         
         # Check quality (based on content length)
         quality_score = min(5.0, len(text_content) / 5000)  # Normalize to 0-5 scale
         
         # Check relevance (based on keywords)
-        relevance_count = 0
-        text_content_lower = text_content.lower()
-        
-        for keyword in RELEVANT_KEYWORDS:
-            if keyword in text_content_lower:
-                relevance_count += 1
+        relevance_count = get_matcher(RELEVANT_KEYWORDS).count(text_content)
         
         relevance_score = min(5.0, relevance_count / 5)  # Normalize to 0-5 scale
         
         # Check frequency (based on date elements)
-        date_elements = soup.find_all(['time', 'span', 'div'], class_=lambda c: c and ('date' in c.lower() or 'time' in c.lower()))
-        frequency_score = min(5.0, len(date_elements) / 2)  # Normalize to 0-5 scale
+        date_elements = count_date_elements(response.text, limit=10)
+        frequency_score = min(5.0, date_elements / 2)  # Normalize to 0-5 scale
         
         return quality_score, relevance_score, frequency_score
     except Exception as e:
@@ -529,7 +532,7 @@ def analyze_source_with_llm(url: str) -> Dict[str, Any]:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
         }
         
-        response = requests.get(url, headers=headers)
+        response = polite_get(url, headers=headers)
         soup = BeautifulSoup(response.text, 'html.parser')
         
         # Extract title and description
@@ -573,15 +576,14 @@ def analyze_source_with_llm(url: str) -> Dict[str, Any]:
         """
         
         # Call the Generative AI model
-        model = genai.GenerativeModel(DEFAULT_MODEL)
-        response = model.generate_content(prompt)
+        response_text = generate_text(DEFAULT_MODEL, prompt)
         
         # Parse the response
         import json
         import re
         
         # Look for JSON content in the response
-        json_match = re.search(r'\{[\s\S]*\}', response.text)
+        json_match = re.search(r'\{[\s\S]*\}', response_text)
         if json_match:
             json_str = json_match.group(0)
             try:
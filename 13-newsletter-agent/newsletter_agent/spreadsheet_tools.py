@@ -1,10 +1,11 @@
 import os
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime, timedelta
 from typing import List, Dict, Any
 from google.adk.tools.tool_context import ToolContext
 
+from .article_store import save_articles
+from .client_registry import get_gspread_client
+
 def fetch_spreadsheet_articles(spreadsheet_url: str, days: int, tool_context: ToolContext) -> dict:
     """Fetch recent articles from a Google Spreadsheet.
     
@@ -18,10 +19,6 @@ def fetch_spreadsheet_articles(spreadsheet_url: str, days: int, tool_context: To
     """
     print(f"--- Tool: fetch_spreadsheet_articles called for {spreadsheet_url} (last {days} days) ---")
     
-    # Get current articles from state or initialize empty list
-    articles = tool_context.state.get("articles", [])
-    spreadsheet_articles = tool_context.state.get("spreadsheet_articles", [])
-    
     # Calculate the cutoff date
     cutoff_date = datetime.now() - timedelta(days=days)
     
@@ -38,8 +35,8 @@ def fetch_spreadsheet_articles(spreadsheet_url: str, days: int, tool_context: To
                 "message": f"Credentials file '{creds_file}' not found. Set GOOGLE_CREDENTIALS_FILE environment variable to the path of your Google API credentials file."
             }
         
-        creds = ServiceAccountCredentials.from_json_keyfile_name(creds_file, scope)
-        client = gspread.authorize(creds)
+        # Reuse the authorized client of earlier fetches
+        client = get_gspread_client(creds_file, tuple(scope))
         
         # Extract spreadsheet ID from URL
         # Example URL: https://docs.google.com/spreadsheets/d/103g1TNDIyp1h0kiiZ43ReJWuUnrz_GGTNsFcrjjMxEE/edit?usp=sharing
@@ -90,25 +87,16 @@ def fetch_spreadsheet_articles(spreadsheet_url: str, days: int, tool_context: To
             
             new_articles.append(article)
         
-        # Store the fetched articles in state
-        spreadsheet_articles = new_articles
-        tool_context.state["spreadsheet_articles"] = spreadsheet_articles
-        
-        # Merge with existing articles (avoiding duplicates by ID)
-        existing_ids = {article["id"] for article in articles}
-        for article in spreadsheet_articles:
-            if article["id"] not in existing_ids:
-                articles.append(article)
-                existing_ids.add(article["id"])
-        
-        # Update the combined articles in state
-        tool_context.state["articles"] = articles
+        # Store the fetched articles, then merge them into the combined articles
+        # (avoiding duplicates by ID). The state only keeps references to the store.
+        save_articles(tool_context.state, "spreadsheet_articles", new_articles)
+        total_articles = save_articles(tool_context.state, "articles", new_articles, merge=True)
         
         return {
             "action": "fetch_spreadsheet_articles",
-            "articles_found": len(spreadsheet_articles),
-            "total_articles": len(articles),
-            "message": f"Found {len(spreadsheet_articles)} articles from spreadsheet in the last {days} days."
+            "articles_found": len(new_articles),
+            "total_articles": total_articles,
+            "message": f"Found {len(new_articles)} articles from spreadsheet in the last {days} days."
         }
     
     except Exception as e:
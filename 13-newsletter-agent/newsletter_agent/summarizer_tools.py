@@ -2,6 +2,19 @@ from datetime import datetime
 from typing import List, Dict, Any
 from google.adk.tools.tool_context import ToolContext
 
+from .keyword_matcher import get_matcher
+from .trend_store import TREND_WINDOWS, get_trend_store
+
+# Terms that mark the content type of an article
+GENERATIVE_AI_TERMS = [
+    "generative ai", "gen ai", "llm", "gpt", "diffusion", "text-to-image",
+    "dall-e", "midjourney", "stable diffusion"
+]
+
+GAME_DEV_TERMS = ["game engine", "unity", "unreal", "game development", "game design"]
+
+SECURITY_TERMS = ["security", "privacy", "ethics", "owasp", "risk", "safety"]
+
 
 def summarize_articles(tone: str, tool_context: ToolContext) -> dict:
     """Generate concise summaries for curated articles.
@@ -34,20 +47,12 @@ def summarize_articles(tone: str, tool_context: ToolContext) -> dict:
         original_summary = article.get("summary", "")
         
         # Create a summary based on tone and content type
-        title_lower = title.lower()
-        summary_lower = original_summary.lower()
-        content = title_lower + " " + summary_lower
+        content = title + " " + original_summary
         
         # Detect content type
-        is_generative_ai = any(term in content for term in [
-            "generative ai", "gen ai", "llm", "gpt", "diffusion", "text-to-image", 
-            "dall-e", "midjourney", "stable diffusion"])
-            
-        is_game_dev = any(term in content for term in [
-            "game engine", "unity", "unreal", "game development", "game design"])
-            
-        is_security = any(term in content for term in [
-            "security", "privacy", "ethics", "owasp", "risk", "safety"])
+        is_generative_ai = get_matcher(GENERATIVE_AI_TERMS).contains_any(content)
+        is_game_dev = get_matcher(GAME_DEV_TERMS).contains_any(content)
+        is_security = get_matcher(SECURITY_TERMS).contains_any(content)
         
         # Customize prefix based on content type and tone
         if tone.lower() == 'professional':
@@ -119,8 +124,9 @@ def generate_intro(title: str, tone: str, tool_context: ToolContext) -> dict:
     """
     print(f"--- Tool: generate_intro called with title: {title}, tone: {tone} ---")
     
-    # Get trending topics if available
-    trending_topics = tool_context.state.get("trending_topics", [])
+    # Get this week's trending topics from the rolling counters, or the ones
+    # found for the curated articles if nothing was ingested this week
+    trending_topics = get_trend_store().trends(TREND_WINDOWS) or tool_context.state.get("trending_topics", [])
     topic_mentions = []
     
     for topic_data in trending_topics[:3]:  # Use top 3 topics
@@ -0,0 +1,253 @@
+"""
+Rolling trending-topic store for the AI & Gaming Newsletter
+
+Trending topics used to be counted from the curated articles of a single run and
+forgotten afterwards. This module keeps per-day topic counters in SQLite instead:
+every article is counted once, when it is ingested, under its publication day.
+Trends over a window (e.g. the last 7 or 30 days) and their change against the
+previous window of the same length are then read from the counters, without
+touching the articles again.
+"""
+
+import os
+import sqlite3
+import threading
+from datetime import date, timedelta
+from typing import List, Dict, Any, Iterable
+
+from .batch_scorer import get_batch_scorer
+
+# Path of the SQLite database holding the counters (the article database by default)
+DEFAULT_TREND_DB_PATH = os.getenv("NEWSLETTER_TREND_DB", os.getenv("NEWSLETTER_ARTICLE_DB", "newsletter_articles.db"))
+
+# Window lengths (days) reported by the trending tools; the first one ranks the topics
+TREND_WINDOWS = (7, 30)
+
+# SQLite limits the number of parameters per statement, so large ID lists are chunked
+_QUERY_CHUNK_SIZE = 500
+
+# Comprehensive keyword frequency analysis for generative AI in gaming
+TOPIC_KEYWORDS = {
+    # Generative AI models and technologies
+    "generative_models": ["gpt", "llm", "large language model", "diffusion model", "stable diffusion",
+                          "midjourney", "dall-e", "text-to-image", "text-to-3d", "generative ai", "gen ai"],
+
+    # Cloud AI platforms
+    "ai_platforms": ["vertex ai", "aws bedrock", "azure openai", "hugging face", "replicate",
+                     "anthropic", "claude", "nvidia", "cloud ai"],
+
+    # Game development and engines
+    "game_development": ["game engine", "unity", "unreal", "godot", "game design", "developer",
+                         "asset creation", "game assets", "3d models"],
+
+    # NPC and character AI
+    "npc_behavior": ["npc", "character", "behavior", "pathfinding", "dialogue", "character ai",
+                     "conversation", "agent", "autonomous"],
+
+    # Procedural and content generation
+    "content_generation": ["procedural", "generation", "content", "level design", "world building",
+                           "terrain", "texture", "asset generation"],
+
+    # Player experience and personalization
+    "player_experience": ["player", "experience", "engagement", "personalization", "adaptive",
+                          "dynamic difficulty", "recommendation"],
+
+    # Security and ethics
+    "security_ethics": ["security", "ethics", "privacy", "bias", "fairness", "owasp",
+                        "content moderation", "safety", "ugc", "user-generated"]
+}
+
+
+def article_day(article: Dict[str, Any]) -> str:
+    """
+    Get the day an article is counted under.
+
+    Args:
+        article: Article dictionary
+
+    Returns:
+        Its publication date (YYYY-MM-DD), or today for articles without a valid one
+    """
+    published = article.get("published") or ""
+    try:
+        return date.fromisoformat(published[:10]).isoformat()
+    except ValueError:
+        return date.today().isoformat()
+
+
+class TrendStore:
+    """Append-only per-day topic counters in SQLite."""
+
+    def __init__(self, db_path: str = DEFAULT_TREND_DB_PATH, topics: Dict[str, List[str]] = None):
+        """
+        Args:
+            db_path: Path of the SQLite database file
+            topics: Mapping of topic name to its keywords (defaults to TOPIC_KEYWORDS)
+        """
+        self.db_path = db_path
+        self.topics = topics or TOPIC_KEYWORDS
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS trend_articles (
+                article_id TEXT PRIMARY KEY,
+                day TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS trend_days (
+                day TEXT PRIMARY KEY,
+                articles INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS topic_days (
+                day TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (day, topic)
+            );
+        """)
+        self._conn.commit()
+
+    def record_articles(self, articles: Iterable[Dict[str, Any]]) -> int:
+        """
+        Count the topics of articles that were not counted before.
+
+        A keyword counts once per article that contains it. Articles are counted
+        once per ID, under their publication day; articles without an ID are skipped.
+
+        Args:
+            articles: Article dictionaries
+
+        Returns:
+            Number of newly counted articles
+        """
+        candidates = {}
+        for article in articles:
+            if article.get("id"):
+                candidates.setdefault(article["id"], article)
+        if not candidates:
+            return 0
+
+        with self._lock:
+            ids = list(candidates)
+            for i in range(0, len(ids), _QUERY_CHUNK_SIZE):
+                chunk = ids[i:i + _QUERY_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                for (article_id,) in self._conn.execute(
+                        f"SELECT article_id FROM trend_articles WHERE article_id IN ({placeholders})", chunk):
+                    del candidates[article_id]
+            if not candidates:
+                return 0
+
+            new_articles = list(candidates.values())
+            days = [article_day(article) for article in new_articles]
+            counts = get_batch_scorer(self.topics).counts(new_articles)
+
+            day_articles = {}
+            day_topics = {}
+            for day, row in zip(days, counts.tolist()):
+                day_articles[day] = day_articles.get(day, 0) + 1
+                for topic, count in zip(self.topics, row):
+                    if count:
+                        day_topics[(day, topic)] = day_topics.get((day, topic), 0) + count
+
+            self._conn.executemany("INSERT INTO trend_articles (article_id, day) VALUES (?, ?)",
+                                   zip(candidates, days))
+            self._conn.executemany("""
+                INSERT INTO trend_days (day, articles) VALUES (?, ?)
+                ON CONFLICT(day) DO UPDATE SET articles = articles + excluded.articles
+            """, day_articles.items())
+            self._conn.executemany("""
+                INSERT INTO topic_days (day, topic, count) VALUES (?, ?, ?)
+                ON CONFLICT(day, topic) DO UPDATE SET count = count + excluded.count
+            """, [(day, topic, count) for (day, topic), count in day_topics.items()])
+            self._conn.commit()
+
+        return len(new_articles)
+
+    def window_counts(self, days: int, end: date = None) -> Dict[str, Any]:
+        """
+        Sum the counters over a window and the window before it.
+
+        Args:
+            days: Window length in days
+            end: Last day of the window (defaults to today)
+
+        Returns:
+            Dictionary with "topics" ({topic: (count, previous count)}), "articles"
+            and "previous_articles"
+        """
+        end = end or date.today()
+        start = end - timedelta(days=days - 1)
+        previous_start = start - timedelta(days=days)
+        bounds = (start.isoformat(), previous_start.isoformat(), end.isoformat())
+
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT topic,
+                       SUM(CASE WHEN day >= ?1 THEN count ELSE 0 END),
+                       SUM(CASE WHEN day < ?1 THEN count ELSE 0 END)
+                FROM topic_days WHERE day >= ?2 AND day <= ?3
+                GROUP BY topic
+            """, bounds).fetchall()
+            articles, previous_articles = self._conn.execute("""
+                SELECT COALESCE(SUM(CASE WHEN day >= ?1 THEN articles ELSE 0 END), 0),
+                       COALESCE(SUM(CASE WHEN day < ?1 THEN articles ELSE 0 END), 0)
+                FROM trend_days WHERE day >= ?2 AND day <= ?3
+            """, bounds).fetchone()
+
+        return {
+            "topics": {topic: (count, previous) for topic, count, previous in rows},
+            "articles": articles,
+            "previous_articles": previous_articles
+        }
+
+    def trends(self, windows: Iterable[int] = TREND_WINDOWS, end: date = None) -> List[Dict[str, Any]]:
+        """
+        Report topic trends over one or more windows.
+
+        Args:
+            windows: Window lengths in days; topics are ranked by the first one
+            end: Last day of the windows (defaults to today)
+
+        Returns:
+            List of {"topic", "count", "previous_count", "delta"} (for the first
+            window) plus "count_<N>d" and "delta_<N>d" per window, for the topics
+            seen in the first window, most frequent first
+        """
+        windows = list(windows)
+        counts = [self.window_counts(days, end)["topics"] for days in windows]
+
+        trends = []
+        for topic in self.topics:
+            count, previous = counts[0].get(topic, (0, 0))
+            if not count:
+                continue
+            trend = {"topic": topic, "count": count, "previous_count": previous, "delta": count - previous}
+            for days, window in zip(windows, counts):
+                window_count, window_previous = window.get(topic, (0, 0))
+                trend[f"count_{days}d"] = window_count
+                trend[f"delta_{days}d"] = window_count - window_previous
+            trends.append(trend)
+
+        trends.sort(key=lambda trend: trend["count"], reverse=True)
+        return trends
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_trend_store(db_path: str = DEFAULT_TREND_DB_PATH) -> TrendStore:
+    """
+    Get the shared trend store for a database file.
+
+    Args:
+        db_path: Path of the SQLite database file
+
+    Returns:
+        The TrendStore for that file
+    """
+    with _stores_lock:
+        if db_path not in _stores:
+            _stores[db_path] = TrendStore(db_path)
+        return _stores[db_path]
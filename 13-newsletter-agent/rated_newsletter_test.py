@@ -8,7 +8,11 @@ import requests
 import google.generativeai as genai
 from dotenv import load_dotenv
 from google.adk.tools.tool_context import ToolContext
-from newsletter_agent.rss_tools import fetch_rss_articles
+from newsletter_agent.futuretools_tools import fetch_futuretools_news
+from newsletter_agent.article_store import save_articles, load_articles, count_articles
+from newsletter_agent.pipeline import (
+    stream_feed_articles, iterate_in_thread, merge, normalize, dedupe, score, top_k, run_pipeline
+)
 from newsletter_agent.curator_tools import curate_articles, get_trending_topics
 from newsletter_agent.summarizer_tools import summarize_articles
 from newsletter_agent.category_tools import categorize_articles
@@ -53,140 +57,6 @@ rss_feeds = [
     "https://cloud.google.com/blog/feed/"
 ]
 
-# We'll also add a function to scrape FutureTools.io since they don't have an RSS feed
-def fetch_futuretools_news(days=7):
-    """
-    Scrape news from FutureTools.io
-    
-    Args:
-        days: Number of days to look back
-        
-    Returns:
-        List of article dictionaries
-    """
-    try:
-        import requests
-        from bs4 import BeautifulSoup
-        from datetime import datetime, timedelta
-        import re
-        from urllib.parse import urlparse, parse_qs
-        
-        # Get the current date and the date 'days' days ago
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=days)
-        
-        print(f"  Fetching news from FutureTools.io for the last {days} days...")
-        
-        # Fetch the FutureTools.io news page
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get("https://www.futuretools.io/news", headers=headers)
-        if response.status_code != 200:
-            print(f"  Error fetching FutureTools.io: {response.status_code}")
-            return []
-        
-        # Parse the HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find all news articles - they're typically in card elements
-        articles = []
-        news_cards = soup.find_all('div', class_=re.compile('card|news-item|post'))
-        
-        if not news_cards:
-            # If we can't find cards, fall back to looking for links
-            news_links = soup.find_all('a', href=True)
-            
-            for link in news_links:
-                # Skip navigation links and empty links
-                if not link.text or link.text.strip() in ['Terms Of Use', 'Privacy Policy', 'Built by Matt Wolfe', '']:
-                    continue
-                    
-                # Extract article information
-                title = link.text.strip()
-                url = link['href']
-                
-                # Only process links that look like news articles
-                if not ("utm_source=futuretools.io" in url or "/news/" in url):
-                    continue
-                
-                # Create article object
-                article = create_article_object(title, url, end_date)
-                if article:
-                    articles.append(article)
-        else:
-            # Process card elements
-            for card in news_cards:
-                # Find the title and link
-                link = card.find('a', href=True)
-                if not link:
-                    continue
-                    
-                title = link.text.strip()
-                if not title:
-                    # Try to find a heading element
-                    heading = card.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6'])
-                    if heading:
-                        title = heading.text.strip()
-                
-                url = link['href']
-                
-                # Create article object
-                article = create_article_object(title, url, end_date)
-                if article:
-                    articles.append(article)
-        
-        print(f"  Found {len(articles)} articles from FutureTools.io")
-        return articles
-    except Exception as e:
-        print(f"  Error scraping FutureTools.io: {str(e)}")
-        return []
-
-def create_article_object(title, url, date):
-    """
-    Create an article object from extracted information
-    
-    Args:
-        title: Article title
-        url: Article URL
-        date: Current date
-        
-    Returns:
-        Article dictionary or None if invalid
-    """
-    if not title or not url:
-        return None
-        
-    # Extract source from URL
-    source = "FutureTools.io"
-    if "utm_source=futuretools.io" in url:
-        # Extract the original source URL
-        base_url = url.split("?")[0]
-        # Try to extract domain
-        try:
-            from urllib.parse import urlparse
-            domain = urlparse(base_url).netloc
-            if domain:
-                source = domain
-        except:
-            pass
-    
-    # Generate a unique ID for the article
-    article_id = f"futuretools_{hash(url)}"
-    
-    # Create the article object
-    article = {
-        "id": article_id,
-        "title": title,
-        "url": url,
-        "source": source,
-        "published": date.strftime("%Y-%m-%d"),
-        "summary": f"From FutureTools.io: {title}",
-        "keywords": ["ai", "artificial intelligence", "machine learning", "generative ai"]
-    }
-    
-    return article
-
 def main():
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description="AI in Gaming Newsletter Generator")
@@ -207,6 +77,12 @@ def main():
         default=15,
         help="Maximum number of articles to include in the newsletter (default: 15)"
     )
+    parser.add_argument(
+        "--max-candidates", 
+        type=int, 
+        default=100,
+        help="Maximum number of keyword-ranked articles to send to LLM curation (default: 100)"
+    )
     parser.add_argument(
         "--output-format", 
         choices=["markdown", "html", "json", "all"],
@@ -252,46 +128,26 @@ def main():
                 print(f"  Updated RSS feeds list with {len(recommend_result.get('recommended_feeds', []))} new sources")
     
     # Step 1: Fetch articles from RSS feeds and FutureTools.io
-    print("\nStep 1: Fetching articles from sources (last {args.days} days)...")
+    print(f"\nStep 1: Fetching articles from sources (last {args.days} days)...")
     days_to_fetch = args.days
     
-    # Fetch from RSS feeds
-    result = fetch_rss_articles(context.state.get("rss_feeds", rss_feeds), days_to_fetch, context)
-    rss_article_count = len(context.state.get("rss_articles", []))
-    print(f"  {result['message']}")
-    
-    # Fetch from FutureTools.io
-    print("  Fetching from FutureTools.io...")
-    futuretools_articles = fetch_futuretools_news(days_to_fetch)
-    
-    # Add FutureTools articles to the state
-    if futuretools_articles:
-        # Add to rss_articles
-        all_rss_articles = context.state.get("rss_articles", []) + futuretools_articles
-        context.state["rss_articles"] = all_rss_articles
-        
-        # Also add to the main articles list
-        existing_ids = {article.get("id", article.get("url", "")) for article in context.state.get("articles", [])}
-        for article in futuretools_articles:
-            article_id = article.get("id", article.get("url", ""))
-            if article_id not in existing_ids:
-                context.state.get("articles", []).append(article)
-                existing_ids.add(article_id)
-        
-        print(f"  Added {len(futuretools_articles)} articles from FutureTools.io")
-    
-    total_articles = len(context.state.get("articles", []))
-    print(f"  Total articles fetched: {total_articles}")
+    # Stream articles from both sources through normalize -> dedupe -> score.
+    # Articles are processed as each feed arrives; only the top-k selection
+    # waits for the slowest source.
+    print("  Streaming from RSS feeds and FutureTools.io...")
+    article_stream = score(dedupe(normalize(merge(
+        stream_feed_articles(context.state.get("rss_feeds", rss_feeds), days_to_fetch),
+        iterate_in_thread(fetch_futuretools_news, days_to_fetch)
+    ))))
+    candidates = run_pipeline(top_k(article_stream, args.max_candidates))
+    
+    # Store the candidates for curation (the state only keeps references)
+    save_articles(context.state, "rss_articles", candidates)
+    save_articles(context.state, "articles", candidates)
+    
+    print(f"  Selected {len(candidates)} candidate articles for curation")
     print(f"  Time period: Last {days_to_fetch} days")
     
-    # Limit to max_articles for processing
-    if total_articles > args.max_articles:
-        print(f"  Limiting to {args.max_articles} articles for processing...")
-        all_articles = context.state.get("articles", [])
-        limited_articles = all_articles[:args.max_articles]
-        context.state["articles"] = limited_articles
-        print(f"  Limited to {len(limited_articles)} articles for processing")
-    
     # Step 2: Curate articles using LLM
     print("\nStep 2: Curating articles with LLM...")
     curation_criteria = {
@@ -371,7 +227,7 @@ def main():
     
     # Get all sources used in this newsletter
     used_sources = set()
-    for article in context.state.get("articles", []):
+    for article in load_articles(context.state, "articles"):
         source = article.get("source", "Unknown")
         if source != "Unknown":
             used_sources.add(source)
@@ -506,8 +362,8 @@ def main():
                 "basic": context.state.get("basic_newsletter", "No basic newsletter generated")
             },
             "metadata": {
-                "article_count": len(context.state.get("articles", [])),
-                "sources": list(set([a.get("source", "Unknown") for a in context.state.get("articles", [])])),
+                "article_count": count_articles(context.state, "articles"),
+                "sources": list(set([a.get("source", "Unknown") for a in load_articles(context.state, "articles")])),
                 "trending_topics": context.state.get("trending_topics", []),
                 "categories": context.state.get("categories", {})
             }
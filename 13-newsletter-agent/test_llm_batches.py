@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the streaming JSON parser and the LLM batch runner.
+
+Runs without an API key: the model's responses are simulated. Run directly
+(python test_llm_batches.py) or with pytest.
+"""
+
+import contextvars
+import json
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from types import SimpleNamespace
+
+from newsletter_agent import llm_cache, llm_curator
+from newsletter_agent.batch_planner import run_batches
+from newsletter_agent.json_stream import JsonArrayStream, iter_json_array
+from newsletter_agent.llm_cache import TruncatedResponse
+from newsletter_agent.llm_retry import get_token_budget, run_budget
+from newsletter_agent.prompt_encoder import PromptEncoder
+
+ELEMENTS = [
+    {"id": 0, "text": "commas, [brackets] and {braces}", "tags": ["a", "b"]},
+    {"id": 1, "text": "escaped \"quotes\" and a backslash \\", "nested": {"list": [1, [2, 3]]}},
+    {"id": 2, "text": "unicode é ✓"},
+]
+
+
+def feed_in_chunks(text, size):
+    parser = JsonArrayStream()
+    elements = []
+    for start in range(0, len(text), size):
+        elements.extend(parser.feed(text[start:start + size]))
+    return parser, elements
+
+
+def test_json_stream_any_chunking():
+    text = "Here are the results:\n```json\n" + json.dumps(ELEMENTS, indent=2) + "\n```\nDone."
+    for size in (1, 2, 3, 7, 64, len(text)):
+        parser, elements = feed_in_chunks(text, size)
+        assert elements == ELEMENTS, size
+        assert parser.complete and parser.parsed == 3 and parser.skipped == 0
+
+
+def test_json_stream_skips_malformed_elements():
+    parser, elements = feed_in_chunks('[{"id": 0}, {"id": 1,,}, {"id": 2}, ]', 5)
+    assert elements == [{"id": 0}, {"id": 2}]
+    assert parser.complete and parser.skipped == 1
+
+
+def test_json_stream_keeps_elements_of_a_cut_off_array():
+    parser, elements = feed_in_chunks('[{"id": 0}, {"id": 1}, {"id": 2, "text": "cut o', 4)
+    assert elements == [{"id": 0}, {"id": 1}]
+    assert parser.started and not parser.complete
+
+
+def test_json_stream_without_array():
+    parser, elements = feed_in_chunks("Sorry, I cannot help with that.", 4)
+    assert elements == [] and not parser.started
+
+
+def test_iter_json_array_stops_at_the_end_of_the_array():
+    chunks = ['[1, ', '2]', ' trailing [3]']
+    assert list(iter_json_array(chunks)) == [1, 2]
+
+
+def test_result_ids_are_coerced():
+    assert [llm_curator._result_id({"id": value}) for value in (3, "3", 3.0, " 4 ", "x", None, 2.5)] == \
+        [3, 3, 3, 4, "x", None, 2.5]
+
+
+def ask_llm_with_response(chunks, positions, truncated=False):
+    def fake_stream_text(*args, **kwargs):
+        yield from chunks
+        if truncated:
+            raise TruncatedResponse("response stopped at the output token limit")
+
+    stream_text = llm_curator.stream_text
+    llm_curator.stream_text = fake_stream_text
+    try:
+        return llm_curator._ask_llm("prompt", 100, positions, PromptEncoder())
+    finally:
+        llm_curator.stream_text = stream_text
+
+
+def test_ask_llm_remaining_with_string_ids():
+    try:
+        ask_llm_with_response(['[{"id": "0", "category": "a"}, {"id": "1", "cat'], [10, 11, 12], truncated=True)
+    except TruncatedResponse as e:
+        assert [result["id"] for result in e.partial] == [0]
+        assert e.remaining == [11, 12]
+    else:
+        raise AssertionError("expected TruncatedResponse")
+
+
+def test_ask_llm_complete_response():
+    results = ask_llm_with_response(['[{"id": 0}, ', '{"id": "1"}]'], [10, 11])
+    assert [result["id"] for result in results] == [0, 1]
+
+
+def test_malformed_streamed_response_is_not_cached():
+    responses = ["Sorry, I cannot help with that.", '[{"id": 0}]']
+    prompts = []
+
+    class FakeModel:
+        def generate_content(self, prompt, request_options=None, stream=False):
+            prompts.append(prompt)
+            text = responses[min(len(prompts), len(responses)) - 1]
+            return iter([SimpleNamespace(parts=[text], text=text, candidates=[])])
+
+    originals = (llm_cache.get_generative_model, llm_cache.get_llm_cache, llm_curator.stream_text)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = llm_cache.LLMCache(os.path.join(directory, "cache.db"))
+        llm_cache.get_generative_model = lambda *args, **kwargs: FakeModel()
+        llm_cache.get_llm_cache = lambda *args, **kwargs: cache
+        llm_curator.stream_text = partial(llm_cache.stream_text, use_cache=True)
+        try:
+            try:
+                llm_curator._ask_llm("prompt", 100, [10], PromptEncoder())
+            except ValueError:
+                pass
+            else:
+                raise AssertionError("expected ValueError")
+            # The retry reaches the model again instead of replaying the bad response
+            assert [result["id"] for result in llm_curator._ask_llm("prompt", 100, [10], PromptEncoder())] == [0]
+            assert len(prompts) == 2
+            # The valid response was cached
+            llm_curator._ask_llm("prompt", 100, [10], PromptEncoder())
+            assert len(prompts) == 2
+        finally:
+            llm_cache.get_generative_model, llm_cache.get_llm_cache, llm_curator.stream_text = originals
+
+
+def test_run_batches_gives_up_when_nothing_matches():
+    calls = []
+
+    def evaluate(batch):
+        # The model keeps answering with ids that belong to no article
+        calls.append(batch)
+        raise TruncatedResponse("cut off", partial=[{"id": "x"}], remaining=list(batch))
+
+    assert run_batches([[1, 2, 3]], evaluate, retry_delay=0) == [([1, 2, 3], None)]
+    assert len(calls) == 1
+
+
+def test_run_batches_bounds_remaining_requests():
+    calls = []
+
+    def evaluate(batch):
+        # Every response is cut off after its first item
+        calls.append(batch)
+        raise TruncatedResponse("cut off", partial=[batch[0]], remaining=batch[1:])
+
+    results = run_batches([[1, 2, 3, 4, 5]], evaluate, attempts=3, retry_delay=0)
+    assert calls == [[1, 2, 3, 4, 5], [2, 3, 4, 5], [3, 4, 5]]
+    assert results == [([1, 2, 3, 4, 5], [1]), ([2, 3, 4, 5], [2]), ([3, 4, 5], [3]), ([4, 5], None)]
+
+
+def test_run_batches_splits_batches_without_results():
+    def evaluate(batch):
+        if len(batch) > 1:
+            raise TruncatedResponse("cut off")
+        return batch
+
+    assert run_batches([[1, 2, 3]], evaluate, retry_delay=0) == [([1], [1]), ([2], [2]), ([3], [3])]
+
+
+def test_token_budget_is_scoped_per_run():
+    with run_budget(100) as first:
+        # Threads started through copy_context() charge the budget of their run
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for _ in range(2):
+                executor.submit(contextvars.copy_context().run, lambda: get_token_budget().charge(60)).result()
+        assert get_token_budget() is first and first.exhausted
+        with run_budget(100) as nested:
+            assert nested is first
+    with run_budget(100) as second:
+        assert second is not first and second.used == 0 and not second.exhausted
+    assert not get_token_budget().exhausted
+
+
+def main():
+    tests = [(name, test) for name, test in globals().items() if name.startswith("test_") and callable(test)]
+    failed = 0
+    for name, test in tests:
+        try:
+            test()
+            print(f"ok      {name}")
+        except Exception as e:
+            failed += 1
+            print(f"FAILED  {name}: {e.__class__.__name__}: {e}")
+    print(f"\n{len(tests) - failed}/{len(tests)} passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())